@@ -1,19 +1,40 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler, MinMaxScaler
 import pickle
-from sklearn.feature_selection import f_classif, SelectKBest
 import json
 import os
+from artifact_store import ArtifactStore
+from dedup import drop_duplicate_rows
+from encoders import REGISTRO, encode_column, is_categorical
+from outliers import OutlierClipper
+from headless_plots import render_pair_histograms, render_pairplot
 
-# Definición de variables globales
+# Definición de variables globales (valores por defecto cuando no se pasan como argumento)
 target_column = 'Outcome'
 inferencia = []
 columns_to_drop = []
 categorical_to_numerical = []
 
+def _default(valor, nombre):
+    """Argumento explícito o, si es None, la variable global del módulo."""
+    return globals()[nombre] if valor is None else valor
+
+def _plotting():
+    """matplotlib y seaborn se importan solo al ejecutar una etapa de gráficos."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    return plt, sns
+
+def _show(plt, ruta_salida, nombre):
+    """Muestra la figura o, si se indica `ruta_salida`, la guarda como PNG y la cierra."""
+    if ruta_salida is None:
+        plt.show()
+        return None
+    os.makedirs(ruta_salida, exist_ok=True)
+    path = os.path.join(ruta_salida, f"{nombre}.png")
+    plt.savefig(path)
+    plt.close("all")
+    return path
+
 def explore_data(df):
     """1. Exploración de Datos."""
     print("Información general del dataframe:")
@@ -24,17 +45,19 @@ def explore_data(df):
 
 def clean_duplicates(df):
     """1.1 Quitar Duplicados."""
-    df.drop_duplicates(inplace=True)
-    print(f"Registros duplicados eliminados: {len(df) - len(df.drop_duplicates())}")
+    # Un único hash por fila; el recuento es el de filas realmente eliminadas
+    df, eliminados = drop_duplicate_rows(df, inplace=True)
+    print(f"Registros duplicados eliminados: {eliminados}")
     return df
 
-def clean_irrelevant_data(df):
+def clean_irrelevant_data(df, columns_to_drop=None):
     """1.2 Eliminar información irrelevante."""
-    df.drop(columns=columns_to_drop, axis=1, inplace=True, errors='ignore')
+    columns_to_drop = _default(columns_to_drop, "columns_to_drop")
+    df.drop(columns=columns_to_drop, inplace=True, errors='ignore')
     print(f"Columnas irrelevantes eliminadas: {columns_to_drop}")
     return df
 
-def univariate_categorical_analysis(df):
+def univariate_categorical_analysis(df, ruta_salida=None):
     """Análisis univariante de variables categóricas."""
     categorical_cols = df.select_dtypes(include=['object']).columns
 
@@ -42,6 +65,7 @@ def univariate_categorical_analysis(df):
         print("No hay columnas categóricas en el DataFrame para generar gráficos.")
         return
 
+    plt, sns = _plotting()
     num_categorical = len(categorical_cols)
     num_rows = (num_categorical + 1) // 2
     fig, axes = plt.subplots(num_rows, 2, figsize=(12, 6 * num_rows))
@@ -55,21 +79,26 @@ def univariate_categorical_analysis(df):
         fig.delaxes(axes[i])
 
     plt.tight_layout()
-    plt.show()
+    _show(plt, ruta_salida, "univariate_categorical")
+
+def univariate_numerical_analysis(df, target_column=None, ruta_json="../data/processed/Json", ruta_salida=None):
+    """
+    2.2 Análisis de variables numéricas.
 
-def univariate_numerical_analysis(df):
-    """2.2 Análisis de variables numéricas."""
+    Returns:
+        str: Columna objetivo (con sufijo '_n' si se ha factorizado).
+    """
     # Condición añadida: Factorizar target_column si es categórico y actualizar target_column
-    global target_column
-    if df[target_column].dtype == 'object':
-        df[target_column + '_n'] = pd.factorize(df[target_column])[0]
-        transformation_rules = {row[target_column]: row[target_column + '_n'] for _, row in df[[target_column, target_column + '_n']].drop_duplicates().iterrows()}
-        ruta_json = os.path.join("../data/processed/Json", f"{target_column}_transformation_rules.json")
-        os.makedirs(os.path.dirname(ruta_json), exist_ok=True)
-        with open(ruta_json, "w") as f:
-            json.dump(transformation_rules, f)
+    explicito = target_column is not None
+    target_column = _default(target_column, "target_column")
+    if is_categorical(df[target_column]):
+        ruta_reglas = os.path.join(ruta_json, f"{target_column}_transformation_rules.json")
+        encode_column(df, target_column, target_column + '_n', ruta_reglas, os.path.join(ruta_json, REGISTRO))
         target_column = target_column + '_n'  # Actualizar target_column
+        if not explicito:
+            globals()["target_column"] = target_column
     
+    plt, sns = _plotting()
     numerical_cols = df.select_dtypes(include=['number']).columns.difference([target_column])
     num_numerical = len(numerical_cols)
     num_rows = (num_numerical + 1) // 2
@@ -84,12 +113,23 @@ def univariate_numerical_analysis(df):
     for i in range(num_numerical * 2, len(axes)):
         fig.delaxes(axes[i])
     plt.tight_layout()
-    plt.show()
+    _show(plt, ruta_salida, "univariate_numerical")
+    return target_column
 
-def bivariate_numerical_analysis(df):
-    """3.1 Análisis numérico-numérico."""
-    numerical_cols = df.select_dtypes(include=['number']).columns.difference([target_column])
+def bivariate_numerical_analysis(df, headless=False, target_column=None, ruta_salida=None, **kwargs):
+    """
+    3.1 Análisis numérico-numérico.
+
+    Con `headless=True` no se muestra nada: cada par se agrega en un histograma 2-D y se
+    guarda como PNG (ver `headless_plots.render_pair_histograms` para `**kwargs`).
+    """
+    numerical_cols = df.select_dtypes(include=['number']).columns.difference([_default(target_column, "target_column")])
+    if headless:
+        if ruta_salida is not None:
+            kwargs["ruta_salida"] = ruta_salida
+        return render_pair_histograms(df, numerical_cols, **kwargs)
     if len(numerical_cols) > 1:
+        plt, sns = _plotting()
         num_plots = len(numerical_cols) * (len(numerical_cols) - 1) // 2
         cols = 3
         rows = (num_plots // cols) + (1 if num_plots % cols != 0 else 0)
@@ -105,9 +145,9 @@ def bivariate_numerical_analysis(df):
         for k in range(plot_index, len(axes)):
             fig.delaxes(axes[k])
         plt.tight_layout()
-        plt.show()
+        _show(plt, ruta_salida, "bivariate_numerical")
 
-def bivariate_categorical_analysis(df):
+def bivariate_categorical_analysis(df, ruta_salida=None):
     """Análisis bivariante de variables categóricas."""
     categorical_cols = df.select_dtypes(include=['object']).columns
 
@@ -116,6 +156,7 @@ def bivariate_categorical_analysis(df):
         return
 
     from itertools import combinations
+    plt, sns = _plotting()
     categorical_pairs = list(combinations(categorical_cols, 2))
 
     num_pairs = len(categorical_pairs)
@@ -131,14 +172,15 @@ def bivariate_categorical_analysis(df):
         fig.delaxes(axes[i])
 
     plt.tight_layout()
-    plt.show()
+    _show(plt, ruta_salida, "bivariate_categorical")
 
-def class_predictor_analysis(df):
+def class_predictor_analysis(df, target_column=None, ruta_salida=None):
     """3.3 Combinaciones de la clase con varias predictoras."""
-    numerical_cols = df.select_dtypes(include=['number']).columns.difference([target_column])
+    numerical_cols = df.select_dtypes(include=['number']).columns.difference([_default(target_column, "target_column")])
     categorical_cols = df.select_dtypes(include=['object']).columns
 
     if len(numerical_cols) > 0 and len(categorical_cols) > 0:
+        plt, sns = _plotting()
         categorical_col = categorical_cols[0]
         cols = 3
         rows = len(numerical_cols) // cols + (1 if len(numerical_cols) % cols != 0 else 0)
@@ -154,54 +196,59 @@ def class_predictor_analysis(df):
             fig.delaxes(axes[i])
 
         plt.tight_layout()
-        plt.show()
+        _show(plt, ruta_salida, "class_predictor")
 
     else:
         print("No hay suficientes columnas numéricas y/o categóricas para generar los gráficos.")
 
-def correlation_analysis(df):
+def correlation_analysis(df, categorical_to_numerical=None, ruta_json="../data/processed/Json", ruta_salida=None):
     """3.4 Análisis de correlaciones."""
+    categorical_to_numerical = _default(categorical_to_numerical, "categorical_to_numerical")
     if categorical_to_numerical:
         for conversion in categorical_to_numerical:
             categorical_col = conversion['categorical_col']
             numerical_col = conversion.get('numerical_col', f"{categorical_col}_n")
-            df[numerical_col] = pd.factorize(df[categorical_col])[0]
-            transformation_rules = {row[categorical_col]: row[numerical_col] for _, row in df[[categorical_col, numerical_col]].drop_duplicates().iterrows()}
-            ruta_json = os.path.join("../data/processed/Json", f"{numerical_col}_transformation_rules.json")
-            os.makedirs(os.path.dirname(ruta_json), exist_ok=True) # Crea el directorio si no existe
-            with open(ruta_json, "w") as f:
-                json.dump(transformation_rules, f)
+            ruta_reglas = os.path.join(ruta_json, f"{numerical_col}_transformation_rules.json")
+            encode_column(df, categorical_col, numerical_col, ruta_reglas, os.path.join(ruta_json, REGISTRO))
+    plt, sns = _plotting()
     numerical_df = df.select_dtypes(include='number')
     plt.figure(figsize=(10, 8))
     sns.heatmap(numerical_df.corr(), annot=True, cmap='coolwarm')
     plt.title('Matriz de correlación')
-    plt.show()
+    _show(plt, ruta_salida, "correlation")
 
-def categorical_numerical_correlation(df):
+def categorical_numerical_correlation(df, ruta_salida=None):
     """Correlación entre variables categóricas y numéricas."""
     numerical_cols = df.select_dtypes(include=['number']).columns
     categorical_cols = df.select_dtypes(include=['object']).columns
 
     if len(numerical_cols) > 0 and len(categorical_cols) > 0:
+        plt, sns = _plotting()
         for categorical_col in categorical_cols:
             plt.figure(figsize=(10, 6))
             for numerical_col in numerical_cols:
                 sns.boxplot(x=categorical_col, y=numerical_col, data=df)
                 plt.title(f'{numerical_col} por {categorical_col}')
-                plt.show()
+                _show(plt, ruta_salida, f"{numerical_col}_por_{categorical_col}")
     else:
         print("No hay suficientes columnas numéricas y/o categóricas para generar los gráficos de correlación.")
 
-def pairplot_analysis(df):
+def pairplot_analysis(df, headless=False, ruta_salida=None, **kwargs):
     """4. Análisis de toda la data en una."""
+    if headless:
+        if ruta_salida is not None:
+            kwargs["ruta_salida"] = ruta_salida
+        return render_pairplot(df, df.select_dtypes(include=['number']).columns, **kwargs)
+    plt, sns = _plotting()
     sns.pairplot(df)
-    plt.show()
+    _show(plt, ruta_salida, "pairplot")
 
-def analyze_outliers(df):
+def analyze_outliers(df, target_column=None, ruta_salida=None):
     """5.1 Análisis Outliers."""
+    plt, sns = _plotting()
     df_con_outliers = df.copy()
     df_sin_outliers = df.copy()
-    numerical_cols = df.select_dtypes(include=['number']).columns.difference([target_column])
+    numerical_cols = df.select_dtypes(include=['number']).columns.difference([_default(target_column, "target_column")])
     num_cols = len(numerical_cols)
     rows = (num_cols + 4) // 5
     fig, axes = plt.subplots(rows, 5, figsize=(15, 5 * rows))
@@ -212,37 +259,24 @@ def analyze_outliers(df):
     for j in range(num_cols, len(axes)):
         fig.delaxes(axes[j])
     plt.tight_layout()
-    plt.show()
+    _show(plt, ruta_salida, "outliers")
     return df_sin_outliers, numerical_cols
 
-def replace_outliers(df_sin_outliers, numerical_cols):
+def replace_outliers(df_sin_outliers, numerical_cols, ruta_json="../data/processed/Json"):
     """Reemplazar outliers."""
-    def replace_outliers_column(column, df):
-        colum_stats = df[column].describe()
-        IQR = colum_stats["75%"] - colum_stats["25%"]
-        lower_bound = colum_stats["25%"] - 1.5 * IQR
-        upper_bound = colum_stats["75%"] + 1.5 * IQR
-        if lower_bound < 0: lower_bound = min(df[column])
-        df[column] = df[column].apply(lambda x: upper_bound if x > upper_bound else x)
-        df[column] = df[column].apply(lambda x: lower_bound if x < lower_bound else x)
-        return df.copy(), [lower_bound, upper_bound]
-
-    outliers_dict = {}
-    for column in numerical_cols:
-        df_sin_outliers, limit_list = replace_outliers_column(column, df_sin_outliers)
-        outliers_dict[column] = [float(limit) for limit in limit_list]
-    ruta_json = os.path.join("../data/processed/Json", "outliers_dict.json")
-    os.makedirs(os.path.dirname(ruta_json), exist_ok=True) # Crea el directorio si no existe
-    with open(ruta_json, "w") as f:
-        json.dump(outliers_dict, f)
+    # Límites IQR de todas las columnas en una pasada y recorte vectorizado en el propio DataFrame
+    clipper = OutlierClipper().fit(df_sin_outliers, numerical_cols)
+    df_sin_outliers = clipper.transform(df_sin_outliers, copy=False)
+    outliers_dict = clipper.bounds
+    clipper.to_json(os.path.join(ruta_json, "outliers_dict.json"))
     print(outliers_dict)
     return df_sin_outliers
 
-def handle_missing_values(df_sin_outliers):
+def handle_missing_values(df_sin_outliers, target_column=None):
     """5.2 Análisis de valores faltantes."""
     print("Valores faltantes por columna:")
     print(df_sin_outliers.isnull().sum())
-    numerical_cols = df_sin_outliers.select_dtypes(include=['number']).columns.difference([target_column])
+    numerical_cols = df_sin_outliers.select_dtypes(include=['number']).columns.difference([_default(target_column, "target_column")])
     categorical_cols = df_sin_outliers.select_dtypes(include=['object', 'category']).columns
     for col in numerical_cols:
         df_sin_outliers[col] = df_sin_outliers[col].fillna(df_sin_outliers[col].median())
@@ -252,9 +286,10 @@ def handle_missing_values(df_sin_outliers):
     print(df_sin_outliers.isnull().sum())
     return df_sin_outliers
 
-def infer_new_features(df_sin_outliers):
+def infer_new_features(df_sin_outliers, target_column=None, inferencia=None):
     """5.3 Inferencia de nuevas características."""
-    numerical_cols = df_sin_outliers.select_dtypes(include=['number']).columns.difference([target_column])
+    inferencia = _default(inferencia, "inferencia")
+    numerical_cols = df_sin_outliers.select_dtypes(include=['number']).columns.difference([_default(target_column, "target_column")])
     if len(numerical_cols) >= 2:
         for feature in inferencia:
             try:
@@ -266,25 +301,32 @@ def infer_new_features(df_sin_outliers):
         print("No hay columnas que apliquen para la inferencia.")
     return df_sin_outliers
 
-def feature_scaling(df, df_sin_outliers, ruta_guardado="../data/processed/"):
+def feature_scaling(df, df_sin_outliers, ruta_guardado="../data/processed/", formato="parquet", exportar_excel=False, target_column=None):
     """6. Feature Scalling."""
+    from sklearn.model_selection import train_test_split
+
+    target_column = _default(target_column, "target_column")
     numerical_cols = df.select_dtypes(include=['number']).columns.difference([target_column])
     X_con_outliers = df.drop(target_column, axis=1)[numerical_cols]
     X_sin_outliers = df_sin_outliers.drop(target_column, axis=1)[numerical_cols]
     y = df[target_column]
     X_train_con_outliers, X_test_con_outliers, y_train, y_test = train_test_split(X_con_outliers, y, test_size=0.2, random_state=42)
     X_train_sin_outliers, X_test_sin_outliers = train_test_split(X_sin_outliers, test_size=0.2, random_state=42)
-    X_train_con_outliers.to_excel(os.path.join(ruta_guardado, "X_train_con_outliers.xlsx"), index=False)
-    X_train_sin_outliers.to_excel(os.path.join(ruta_guardado, "X_train_sin_outliers.xlsx"), index=False)
-    X_test_con_outliers.to_excel(os.path.join(ruta_guardado, "X_test_con_outliers.xlsx"), index=False)
-    X_test_sin_outliers.to_excel(os.path.join(ruta_guardado, "X_test_sin_outliers.xlsx"), index=False)
-    y_train.to_excel(os.path.join(ruta_guardado, "y_train.xlsx"), index=False)
-    y_test.to_excel(os.path.join(ruta_guardado, "y_test.xlsx"), index=False)
-    print("Archivos creados: X_train_con_outliers.xlsx, X_train_sin_outliers.xlsx, X_test_con_outliers.xlsx, X_test_sin_outliers.xlsx, y_train.xlsx, y_test.xlsx")
+    store = ArtifactStore(ruta_guardado, formato=formato, exportar_excel=exportar_excel)
+    store.save_split("X_train_con_outliers", X_train_con_outliers)
+    store.save_split("X_train_sin_outliers", X_train_sin_outliers)
+    store.save_split("X_test_con_outliers", X_test_con_outliers)
+    store.save_split("X_test_sin_outliers", X_test_sin_outliers)
+    store.save_split("y_train", y_train)
+    store.save_split("y_test", y_test)
+    print(f"Splits creados ({formato}): X_train_con_outliers, X_train_sin_outliers, X_test_con_outliers, X_test_sin_outliers, y_train, y_test")
     return X_train_con_outliers, X_test_con_outliers, X_train_sin_outliers, X_test_sin_outliers, y_train, y_test, numerical_cols
 
-def normalize_data(X_train_con_outliers, X_test_con_outliers, X_train_sin_outliers, X_test_sin_outliers, numerical_cols, ruta_guardado="../data/processed/", ruta_modelo="../models/"):
+def normalize_data(X_train_con_outliers, X_test_con_outliers, X_train_sin_outliers, X_test_sin_outliers, numerical_cols, ruta_guardado="../data/processed/", ruta_modelo="../models/", formato="parquet", exportar_excel=False):
     """6.1 Normalización."""
+    from sklearn.preprocessing import StandardScaler
+
+    store = ArtifactStore(ruta_guardado, formato=formato, exportar_excel=exportar_excel)
     normalizador_con_outliers = StandardScaler()
     normalizador_con_outliers.fit(X_train_con_outliers)
     with open(os.path.join(ruta_modelo, "normalizador_con_outliers.pkl"), "wb") as file:
@@ -293,8 +335,8 @@ def normalize_data(X_train_con_outliers, X_test_con_outliers, X_train_sin_outlie
     X_train_con_outliers_norm = pd.DataFrame(X_train_con_outliers_norm, index=X_train_con_outliers.index, columns=numerical_cols)
     X_test_con_outliers_norm = normalizador_con_outliers.transform(X_test_con_outliers)
     X_test_con_outliers_norm = pd.DataFrame(X_test_con_outliers_norm, index=X_test_con_outliers.index, columns=numerical_cols)
-    X_train_con_outliers_norm.to_excel(os.path.join(ruta_guardado, "X_train_con_outliers_norm.xlsx"), index=False)
-    X_test_con_outliers_norm.to_excel(os.path.join(ruta_guardado, "X_test_con_outliers_norm.xlsx"), index=False)
+    store.save_split("X_train_con_outliers_norm", X_train_con_outliers_norm)
+    store.save_split("X_test_con_outliers_norm", X_test_con_outliers_norm)
     normalizador_sin_outliers = StandardScaler()
     normalizador_sin_outliers.fit(X_train_sin_outliers)
     with open(os.path.join(ruta_modelo, "normalizador_sin_outliers.pkl"), "wb") as file:
@@ -303,14 +345,14 @@ def normalize_data(X_train_con_outliers, X_test_con_outliers, X_train_sin_outlie
     X_train_sin_outliers_norm = pd.DataFrame(X_train_sin_outliers_norm, index=X_train_sin_outliers.index, columns=numerical_cols)
     X_test_sin_outliers_norm = normalizador_sin_outliers.transform(X_test_sin_outliers)
     X_test_sin_outliers_norm = pd.DataFrame(X_test_sin_outliers_norm, index=X_test_sin_outliers.index, columns=numerical_cols)
-    X_train_sin_outliers_norm.to_excel(os.path.join(ruta_guardado, "X_train_sin_outliers_norm.xlsx"), index=False)
-    X_test_sin_outliers_norm.to_excel(os.path.join(ruta_guardado, "X_test_sin_outliers_norm.xlsx"), index=False)
-    print("Archivos creados: X_train_con_outliers_norm.xlsx, X_test_con_outliers_norm.xlsx, X_train_sin_outliers_norm.xlsx, X_test_sin_outliers_norm.xlsx")
+    store.save_split("X_train_sin_outliers_norm", X_train_sin_outliers_norm)
+    store.save_split("X_test_sin_outliers_norm", X_test_sin_outliers_norm)
+    print(f"Splits creados ({formato}): X_train_con_outliers_norm, X_test_con_outliers_norm, X_train_sin_outliers_norm, X_test_sin_outliers_norm")
     return X_train_con_outliers_norm, X_test_con_outliers_norm, X_train_sin_outliers_norm, X_test_sin_outliers_norm
 
-def scale_min_max_data_1(X_train_con_outliers, X_test_con_outliers, X_train_sin_outliers, X_test_sin_outliers, numerical_cols, ruta_guardado="../data/processed/", ruta_modelo="../models/"):
+def scale_min_max_data_1(X_train_con_outliers, X_test_con_outliers, X_train_sin_outliers, X_test_sin_outliers, numerical_cols, ruta_guardado="../data/processed/", ruta_modelo="../models/", formato="parquet", exportar_excel=False):
     """
-    Escala los DataFrames, guarda los scalers entrenados y los resultados en archivos XLSX.
+    Escala los DataFrames, guarda los scalers entrenados y los resultados en el almacén de artefactos.
 
     Args:
         X_train_con_outliers (pd.DataFrame): DataFrame de entrenamiento con outliers.
@@ -318,12 +360,16 @@ def scale_min_max_data_1(X_train_con_outliers, X_test_con_outliers, X_train_sin_
         X_train_sin_outliers (pd.DataFrame): DataFrame de entrenamiento sin outliers.
         X_test_sin_outliers (pd.DataFrame): DataFrame de prueba sin outliers.
         numerical_cols (list): Lista de columnas numéricas a escalar.
-        ruta_guardado (str): Ruta donde guardar los archivos XLSX.
+        ruta_guardado (str): Ruta donde guardar los splits escalados.
         ruta_modelo (str): Ruta donde guardar los modelos scaler.
+        formato (str): Backend del almacén ('parquet', 'feather', 'npy').
+        exportar_excel (bool): Si es True, también exporta cada split a XLSX.
 
     Returns:
         tuple: Tupla con los cuatro DataFrames escalados.
     """
+    from sklearn.preprocessing import MinMaxScaler, StandardScaler
+
     try:
         # Asegurar que la carpeta del modelo exista
         os.makedirs(ruta_modelo, exist_ok=True)
@@ -355,55 +401,56 @@ def scale_min_max_data_1(X_train_con_outliers, X_test_con_outliers, X_train_sin_
         X_train_sin_outliers_scaled[numerical_cols] = scaler_sin_outliers.transform(X_train_sin_outliers[numerical_cols])
         X_test_sin_outliers_scaled[numerical_cols] = scaler_sin_outliers.transform(X_test_sin_outliers[numerical_cols])
 
-        # Guardar los DataFrames escalados en archivos XLSX
-        X_train_con_outliers_scaled.to_excel(os.path.join(ruta_guardado, "X_train_con_outliers_scal.xlsx"), index=False)
-        X_test_con_outliers_scaled.to_excel(os.path.join(ruta_guardado, "X_test_con_outliers_scal.xlsx"), index=False)
-        X_train_sin_outliers_scaled.to_excel(os.path.join(ruta_guardado, "X_train_sin_outliers_scal.xlsx"), index=False)
-        X_test_sin_outliers_scaled.to_excel(os.path.join(ruta_guardado, "X_test_sin_outliers_scal.xlsx"), index=False)
+        # Guardar los DataFrames escalados en el almacén de artefactos
+        store = ArtifactStore(ruta_guardado, formato=formato, exportar_excel=exportar_excel)
+        store.save_split("X_train_con_outliers_scal", X_train_con_outliers_scaled)
+        store.save_split("X_test_con_outliers_scal", X_test_con_outliers_scaled)
+        store.save_split("X_train_sin_outliers_scal", X_train_sin_outliers_scaled)
+        store.save_split("X_test_sin_outliers_scal", X_test_sin_outliers_scaled)
 
-        print("DataFrames escalados, modelos guardados y archivos XLSX creados.")
+        print(f"DataFrames escalados, modelos guardados y splits creados ({formato}).")
         return X_train_con_outliers_scaled, X_test_con_outliers_scaled, X_train_sin_outliers_scaled, X_test_sin_outliers_scaled
 
     except Exception as e:
         print(f"Error en scale_min_max_data: {e}")
         return None, None, None, None
 
-def feature_selection(X_train_con_outliers, X_test_con_outliers, X_train_sin_outliers, X_test_sin_outliers, X_train_con_outliers_norm, X_test_con_outliers_norm, X_train_sin_outliers_norm, X_test_sin_outliers_norm, X_train_con_outliers_scal, X_test_con_outliers_scal, X_train_sin_outliers_scal, X_test_sin_outliers_scal, y_train, y_test, target_column, ruta_modelo="../models/"):
-    """7. Feature Selection."""
+def feature_selection(X_train_con_outliers, X_test_con_outliers, X_train_sin_outliers, X_test_sin_outliers, X_train_con_outliers_norm, X_test_con_outliers_norm, X_train_sin_outliers_norm, X_test_sin_outliers_norm, X_train_con_outliers_scal, X_test_con_outliers_scal, X_train_sin_outliers_scal, X_test_sin_outliers_scal, y_train, y_test, target_column, ruta_modelo="../models/", formato="parquet", exportar_excel=False, k=None, dataset_name=None, ruta_json="../data/processed/Json"):
+    """
+    7. Feature Selection.
+
+    Si no se indican `k` y `dataset_name` se piden por consola. Para probar todos los k y
+    todas las variantes de una vez, ver `feature_sweep.feature_selection_sweep`.
+    """
+    datasets = {
+        "X_train_con_outliers": X_train_con_outliers,
+        "X_train_sin_outliers": X_train_sin_outliers,
+        "X_test_con_outliers": X_test_con_outliers,
+        "X_test_sin_outliers": X_test_sin_outliers,
+        "X_train_con_outliers_norm": X_train_con_outliers_norm,
+        "X_train_sin_outliers_norm": X_train_sin_outliers_norm,
+        "X_test_con_outliers_norm": X_test_con_outliers_norm,
+        "X_test_sin_outliers_norm": X_test_sin_outliers_norm,
+        "X_train_con_outliers_scal": X_train_con_outliers_scal,
+        "X_train_sin_outliers_scal": X_train_sin_outliers_scal,
+        "X_test_con_outliers_scal": X_test_con_outliers_scal,
+        "X_test_sin_outliers_scal": X_test_sin_outliers_scal,
+    }
     try:
-        feature_selection_k = int(input("Ingrese el valor de k para la selección de características: "))
-        dataset_name = input("Ingrese el nombre del dataset para entrenar el modelo (X_train_con_outliers, X_train_sin_outliers, X_test_con_outliers, X_test_sin_outliers, X_train_con_outliers_norm, X_train_sin_outliers_norm, X_test_con_outliers_norm, X_test_sin_outliers_norm, X_train_con_outliers_scal, X_train_sin_outliers_scal, X_test_con_outliers_scal, X_test_sin_outliers_scal): ")
-        
-        if dataset_name == "X_train_con_outliers":
-            feature_selection_dataset = X_train_con_outliers
-        elif dataset_name == "X_train_sin_outliers":
-            feature_selection_dataset = X_train_sin_outliers
-        elif dataset_name == "X_test_con_outliers":
-            feature_selection_dataset = X_test_con_outliers
-        elif dataset_name == "X_test_sin_outliers":
-            feature_selection_dataset = X_test_sin_outliers
-        elif dataset_name == "X_train_con_outliers_norm":
-            feature_selection_dataset = X_train_con_outliers_norm
-        elif dataset_name == "X_train_sin_outliers_norm":
-            feature_selection_dataset = X_train_sin_outliers_norm
-        elif dataset_name == "X_test_con_outliers_norm":
-            feature_selection_dataset = X_test_con_outliers_norm
-        elif dataset_name == "X_test_sin_outliers_norm":
-            feature_selection_dataset = X_test_sin_outliers_norm
-        elif dataset_name == "X_train_con_outliers_scal":
-            feature_selection_dataset = X_train_con_outliers_scal
-        elif dataset_name == "X_train_sin_outliers_scal":
-            feature_selection_dataset = X_train_sin_outliers_scal
-        elif dataset_name == "X_test_con_outliers_scal":
-            feature_selection_dataset = X_test_con_outliers_scal
-        elif dataset_name == "X_test_sin_outliers_scal":
-            feature_selection_dataset = X_test_sin_outliers_scal
-        else:
+        if k is None:
+            k = input("Ingrese el valor de k para la selección de características: ")
+        feature_selection_k = int(k)
+        if dataset_name is None:
+            dataset_name = input(f"Ingrese el nombre del dataset para entrenar el modelo ({', '.join(datasets)}): ")
+        if dataset_name not in datasets:
             raise ValueError("Nombre de dataset no válido.")
+        feature_selection_dataset = datasets[dataset_name]
     except ValueError as e:
         print(f"Error: {e}")
         return None, None
 
+    from sklearn.feature_selection import SelectKBest, f_classif
+
     modelo_seleccion = SelectKBest(f_classif, k=feature_selection_k)
     modelo_seleccion.fit(feature_selection_dataset, y_train)
     ix = modelo_seleccion.get_support()
@@ -411,28 +458,19 @@ def feature_selection(X_train_con_outliers, X_test_con_outliers, X_train_sin_out
     x_train_sel = pd.DataFrame(modelo_seleccion.transform(feature_selection_dataset), columns=feature_selection_dataset.columns.values[ix])
     
     # Seleccionamos el test dataset a usar dependiendo del dataset de entrenamiento.
-    if dataset_name == "X_train_con_outliers":
-        x_test_sel = pd.DataFrame(modelo_seleccion.transform(X_test_con_outliers), columns=X_test_con_outliers.columns.values[ix])
-    elif dataset_name == "X_train_sin_outliers":
-        x_test_sel = pd.DataFrame(modelo_seleccion.transform(X_test_sin_outliers), columns=X_test_sin_outliers.columns.values[ix])
-    elif dataset_name == "X_train_con_outliers_norm":
-        x_test_sel = pd.DataFrame(modelo_seleccion.transform(X_test_con_outliers_norm), columns=X_test_con_outliers_norm.columns.values[ix])
-    elif dataset_name == "X_train_sin_outliers_norm":
-        x_test_sel = pd.DataFrame(modelo_seleccion.transform(X_test_sin_outliers_norm), columns=X_test_sin_outliers_norm.columns.values[ix])
-    elif dataset_name == "X_train_con_outliers_scal":
-        x_test_sel = pd.DataFrame(modelo_seleccion.transform(X_test_con_outliers_scal), columns=X_test_con_outliers_scal.columns.values[ix])
-    elif dataset_name == "X_train_sin_outliers_scal":
-        x_test_sel = pd.DataFrame(modelo_seleccion.transform(X_test_sin_outliers_scal), columns=X_test_sin_outliers_scal.columns.values[ix])
+    test_dataset = datasets[dataset_name.replace("X_train_", "X_test_")]
+    x_test_sel = pd.DataFrame(modelo_seleccion.transform(test_dataset), columns=test_dataset.columns.values[ix])
     
     x_train_sel[target_column] = list(y_train)
     x_test_sel[target_column] = list(y_test)
-    ruta_json = os.path.join("../data/processed/Json", f"featureselection_k_{feature_selection_k}.json")
-    os.makedirs(os.path.dirname(ruta_json), exist_ok=True)
-    with open(ruta_json, "w") as f:
+    ruta_seleccion = os.path.join(ruta_json, f"featureselection_k_{feature_selection_k}.json")
+    os.makedirs(os.path.dirname(ruta_seleccion), exist_ok=True)
+    with open(ruta_seleccion, "w") as f:
         json.dump(list(x_train_sel.columns), f)
     x_train_sel.to_csv(os.path.join(ruta_modelo, "x_train_sel.csv"), index=False)
     x_test_sel.to_csv(os.path.join(ruta_modelo, "x_test_sel.csv"), index=False)
-    x_train_sel.to_excel(os.path.join(ruta_modelo, "x_train_sel.xlsx"), index=False) # Guarda x_train_sel en XLSX
-    x_test_sel.to_excel(os.path.join(ruta_modelo, "x_test_sel.xlsx"), index=False) # Guarda x_test_sel en XLSX
+    store = ArtifactStore(ruta_modelo, formato=formato, exportar_excel=exportar_excel)
+    store.save_split("x_train_sel", x_train_sel)
+    store.save_split("x_test_sel", x_test_sel)
     print(f"Características seleccionadas: {list(x_train_sel.columns)}")
     return x_train_sel, x_test_sel
\ No newline at end of file
@@ -0,0 +1,310 @@
+"""
+Modo aproximado del EDA para tablas grandes.
+
+Extrae en una sola pasada por bloques una muestra aleatoria estratificada por la columna
+objetivo, ejecuta sobre ella las funciones de análisis de `Auto_EDA` y acompaña los
+estadísticos de intervalos de confianza:
+
+- Medias y proporciones (categorías y faltantes): estimador estratificado con pesos N_h / n_h,
+  corrección por población finita e intervalo t de Student con n - H grados de libertad.
+- Correlaciones de Pearson: intervalo por la transformación z de Fisher.
+- La distribución de la columna objetivo es exacta (se cuentan todas las filas).
+
+Uso (desde Python):
+    from streaming_eda import read_sql_chunks
+    muestra, informe = run_approximate_eda(read_sql_chunks(engine, "diabetes"), target_column="Outcome", ruta_salida="../data/interim/plots")
+"""
+import inspect
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from encoders import is_categorical
+
+# Funciones de Auto_EDA que recorren el DataFrame completo para sus gráficos y resúmenes
+ANALISIS = [
+    "univariate_categorical_analysis",
+    "univariate_numerical_analysis",
+    "bivariate_numerical_analysis",
+    "bivariate_categorical_analysis",
+    "class_predictor_analysis",
+    "correlation_analysis",
+    "categorical_numerical_correlation",
+]
+
+
+def _etiqueta(valor):
+    """Clave de estrato: los faltantes (NaN/None) son todos el mismo estrato."""
+    if pd.isna(valor):
+        return None
+    return valor.item() if isinstance(valor, np.generic) else valor
+
+
+def iter_chunks(datos, chunksize=500_000):
+    """Bloques de un DataFrame (por posición) o de un iterable de DataFrames, tal cual."""
+    if isinstance(datos, pd.DataFrame):
+        for inicio in range(0, len(datos), chunksize):
+            yield datos.iloc[inicio:inicio + chunksize]
+    else:
+        yield from datos
+
+
+class StratifiedReservoir:
+    """
+    Muestra aleatoria estratificada por `target_column` en una sola pasada por bloques.
+
+    Cada fila recibe una clave uniforme y cada estrato conserva las `size` filas de menor clave
+    (una muestra uniforme sin reemplazo de lo visto hasta el momento); de cada bloque solo se
+    copian las filas con clave menor que el umbral actual de su estrato. Al final cada estrato
+    aporta una parte proporcional a su tamaño (con un mínimo por estrato), así que la muestra es
+    casi autoponderada, y los estimadores usan los pesos exactos N_h / n_h.
+
+    Args:
+        target_column (str): Columna de estratificación (los faltantes forman su propio estrato).
+        size (int): Tamaño total de la muestra.
+        min_per_stratum (int): Filas mínimas por estrato (todas, si tiene menos).
+        max_strata (int): Máximo de estratos; una columna continua no sirve para estratificar.
+    """
+
+    def __init__(self, target_column="Outcome", size=100_000, min_per_stratum=30, max_strata=100, seed=42):
+        self.target_column = target_column
+        self.size = size
+        self.min_per_stratum = min_per_stratum
+        self.max_strata = max_strata
+        self.rows = 0
+        self.counts = {}
+        self._filas = {}
+        self._claves = {}
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        if len(chunk) == 0:
+            return self
+        claves = self._rng.random(len(chunk))
+        codigos, estratos = pd.factorize(chunk[self.target_column], use_na_sentinel=False)
+        for i, valor in enumerate(estratos):
+            estrato = _etiqueta(valor)
+            en_estrato = codigos == i
+            if estrato not in self.counts:
+                if len(self.counts) >= self.max_strata:
+                    raise ValueError(f"'{self.target_column}' tiene más de {self.max_strata} valores distintos: no se puede estratificar por ella.")
+                self.counts[estrato] = 0
+                self._filas[estrato] = chunk.iloc[:0]
+                self._claves[estrato] = np.empty(0)
+            self.counts[estrato] += int(en_estrato.sum())
+            actuales = self._claves[estrato]
+            umbral = actuales.max() if len(actuales) >= self.size else 1.0
+            candidatas = np.flatnonzero(en_estrato & (claves < umbral))
+            if not len(candidatas):
+                continue
+            filas = pd.concat([self._filas[estrato], chunk.iloc[candidatas]], ignore_index=True)
+            todas = np.concatenate([actuales, claves[candidatas]])
+            if len(todas) > self.size:
+                quedan = np.sort(np.argpartition(todas, self.size - 1)[:self.size])
+                filas, todas = filas.iloc[quedan].reset_index(drop=True), todas[quedan]
+            self._filas[estrato], self._claves[estrato] = filas, todas
+        return self
+
+    def allocation(self):
+        """Filas de la muestra por estrato: proporcional a su tamaño, con el mínimo por estrato."""
+        return {estrato: min(len(self._claves[estrato]), max(self.min_per_stratum, round(self.size * n / self.rows)))
+                for estrato, n in self.counts.items()}
+
+    def sample(self):
+        """
+        Returns:
+            tuple: (DataFrame con la muestra, array con el índice de estrato de cada fila, en el
+            orden de `counts`).
+        """
+        partes, claves, ids = [], [], []
+        for i, (estrato, n_h) in enumerate(self.allocation().items()):
+            orden = np.argsort(self._claves[estrato], kind="stable")[:n_h]
+            partes.append(self._filas[estrato].iloc[orden])
+            claves.append(self._claves[estrato][orden])
+            ids.append(np.full(n_h, i))
+        if not partes:
+            return pd.DataFrame(), np.empty(0, dtype=np.int64)
+        # Estratos intercalados por clave, como si la muestra se hubiera tomado sin estratificar
+        orden = np.argsort(np.concatenate(claves), kind="stable")
+        return pd.concat(partes, ignore_index=True).iloc[orden].reset_index(drop=True), np.concatenate(ids)[orden]
+
+
+def stratified_sample(datos, target_column="Outcome", size=100_000, chunksize=500_000, **kwargs):
+    """Recorre los datos una vez y devuelve el `StratifiedReservoir` lleno."""
+    reservorio = StratifiedReservoir(target_column, size=size, **kwargs)
+    for chunk in iter_chunks(datos, chunksize):
+        reservorio.update(chunk)
+    return reservorio
+
+
+def stratified_means(X, estratos, N_h, confidence=0.95):
+    """
+    Media estratificada de cada columna con su intervalo: ȳ = Σ W_h ȳ_h y
+    Var(ȳ) = Σ W_h² (1 - n_h/N_h) s_h² / n_h, con W_h = N_h / N. Los faltantes de cada columna
+    se ignoran (la media es la de los valores presentes).
+
+    Returns:
+        pd.DataFrame: estimate, std_error, lower, upper y n por columna.
+    """
+    from scipy import stats
+
+    grupos = X.groupby(estratos)
+    medias, varianzas, n = grupos.mean(), grupos.var(ddof=1).fillna(0.0), grupos.count()
+    N = pd.Series(N_h, dtype=np.float64).reindex(medias.index)
+    W = N / N.sum()
+    estimacion = medias.mul(W, axis=0).sum(skipna=False)
+    fpc = (1 - n.div(N, axis=0)).clip(lower=0)
+    varianza = (varianzas * fpc / n.where(n > 0)).mul(W**2, axis=0).sum()
+    error = np.sqrt(varianza)
+    total = n.sum()
+    critico = stats.t.ppf((1 + confidence) / 2, np.maximum(total - len(N), 1))
+    return pd.DataFrame({
+        "estimate": estimacion,
+        "std_error": error,
+        "lower": estimacion - critico * error,
+        "upper": estimacion + critico * error,
+        "n": total,
+    })
+
+
+def correlation_intervals(X, confidence=0.95):
+    """
+    Correlaciones de Pearson (pares completos) con intervalo por la z de Fisher:
+    tanh(atanh(r) ± z_{α/2} / sqrt(n - 3)).
+
+    Returns:
+        pd.DataFrame: Una fila por par de columnas (col1, col2, r, lower, upper, n).
+    """
+    from scipy import stats
+
+    r = X.corr()
+    presentes = X.notna().to_numpy(dtype=np.float64)
+    n = presentes.T @ presentes
+    superior = np.triu_indices(len(r.columns), k=1)
+    r_par, n_par = r.to_numpy()[superior], n[superior]
+    critico = stats.norm.ppf((1 + confidence) / 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.arctanh(np.clip(r_par, -1 + 1e-15, 1 - 1e-15))
+        margen = critico / np.sqrt(n_par - 3)
+        lower, upper = np.tanh(z - margen), np.tanh(z + margen)
+    validos = n_par > 3
+    return pd.DataFrame({
+        "col1": r.columns[superior[0]],
+        "col2": r.columns[superior[1]],
+        "r": r_par,
+        "lower": np.where(validos, lower, np.nan),
+        "upper": np.where(validos, upper, np.nan),
+        "n": n_par.astype(np.int64),
+    })
+
+
+def confidence_report(reservorio, muestra, estratos, confidence=0.95, top_categories=10):
+    """
+    Estadísticos de la muestra con sus intervalos de confianza.
+
+    Returns:
+        dict: DataFrames 'strata', 'means', 'missing', 'proportions' y 'correlations'.
+    """
+    N_h = dict(enumerate(reservorio.counts.values()))
+    target = reservorio.target_column
+    numericas = [col for col in muestra.select_dtypes(include=["number"]).columns if col != target]
+    categoricas = [col for col in muestra.columns if col != target and is_categorical(muestra[col])]
+
+    asignacion = reservorio.allocation()
+    estratos_df = pd.DataFrame({
+        "stratum": list(reservorio.counts),
+        "rows": list(reservorio.counts.values()),
+        "sampled": [asignacion[e] for e in reservorio.counts],
+    })
+    estratos_df["proportion"] = estratos_df["rows"] / reservorio.rows
+
+    informe = {"strata": estratos_df}
+    informe["means"] = stratified_means(muestra[numericas], estratos, N_h, confidence)
+    faltantes = stratified_means(muestra.drop(columns=[target]).isna().astype(np.float64), estratos, N_h, confidence)
+    informe["missing"] = faltantes.assign(lower=faltantes["lower"].clip(0, 1), upper=faltantes["upper"].clip(0, 1))
+
+    proporciones = []
+    for col in categoricas:
+        principales = muestra[col].value_counts().index[:top_categories]
+        indicadores = pd.DataFrame({valor: (muestra[col] == valor).astype(np.float64) for valor in principales})
+        if indicadores.empty:
+            continue
+        tabla = stratified_means(indicadores, estratos, N_h, confidence)
+        tabla["lower"], tabla["upper"] = tabla["lower"].clip(0, 1), tabla["upper"].clip(0, 1)
+        proporciones.append(tabla.rename_axis("value").reset_index().assign(column=col))
+    columnas = ["column", "value", "estimate", "std_error", "lower", "upper", "n"]
+    informe["proportions"] = pd.concat(proporciones, ignore_index=True)[columnas] if proporciones else pd.DataFrame(columns=columnas)
+
+    correlacionables = numericas + ([target] if pd.api.types.is_numeric_dtype(muestra[target]) else [])
+    informe["correlations"] = correlation_intervals(muestra[correlacionables], confidence)
+    return informe
+
+
+def print_report(informe, confidence=0.95):
+    nivel = f"{confidence:.0%}"
+    print("Muestra estratificada por la columna objetivo (distribución exacta):")
+    print(informe["strata"].to_string(index=False))
+    print(f"\nMedias estimadas (IC {nivel}):")
+    print(informe["means"].to_string())
+    print(f"\nFracción de faltantes (IC {nivel}):")
+    print(informe["missing"].to_string())
+    if not informe["proportions"].empty:
+        print(f"\nProporciones de las categorías más frecuentes (IC {nivel}):")
+        print(informe["proportions"].to_string(index=False))
+    print(f"\nCorrelaciones (IC {nivel}, z de Fisher):")
+    print(informe["correlations"].to_string(index=False))
+
+
+def save_report(informe, ruta_json):
+    os.makedirs(os.path.dirname(ruta_json) or ".", exist_ok=True)
+    contenido = {nombre: json.loads(tabla.reset_index().to_json(orient="records")) if nombre in ("means", "missing") else json.loads(tabla.to_json(orient="records"))
+                 for nombre, tabla in informe.items()}
+    with open(ruta_json, "w") as f:
+        json.dump(contenido, f, indent=2)
+
+
+def run_analyses(Auto_EDA, muestra, analyses=None, **argumentos):
+    """
+    Ejecuta las funciones de análisis de Auto_EDA sobre la muestra, pasando a cada una solo los
+    argumentos que acepta. Devuelve la columna objetivo (factorizada si univariate_numerical_analysis lo hace).
+    """
+    target_column = argumentos.get("target_column")
+    for nombre in analyses or ANALISIS:
+        funcion = getattr(Auto_EDA, nombre)
+        parametros = inspect.signature(funcion).parameters
+        argumentos["target_column"] = target_column
+        salida = funcion(muestra, **{clave: valor for clave, valor in argumentos.items() if clave in parametros})
+        if nombre == "univariate_numerical_analysis":
+            target_column = salida
+    return target_column
+
+
+def run_approximate_eda(datos, target_column="Outcome", sample_size=100_000, analyses=None, confidence=0.95, chunksize=500_000, seed=42,
+                        ruta_salida=None, ruta_json="../data/processed/Json", categorical_to_numerical=None, ruta_informe=None):
+    """
+    EDA aproximado: una pasada para la muestra, informe con intervalos y análisis sobre la muestra.
+
+    Args:
+        datos: DataFrame o iterable de DataFrames (p. ej. `streaming_eda.read_sql_chunks`).
+        analyses (list): Funciones de Auto_EDA a ejecutar (por defecto, ANALISIS).
+        ruta_salida (str): Carpeta de los PNG; si es None los gráficos se muestran.
+        ruta_informe (str): JSON donde guardar el informe.
+
+    Returns:
+        tuple: (muestra, informe)
+    """
+    import Auto_EDA
+
+    reservorio = stratified_sample(datos, target_column, size=sample_size, chunksize=chunksize, seed=seed)
+    muestra, estratos = reservorio.sample()
+    print(f"Muestra de {len(muestra)} de {reservorio.rows} filas ({len(reservorio.counts)} estratos de '{target_column}').")
+    informe = confidence_report(reservorio, muestra, estratos, confidence)
+    print_report(informe, confidence)
+    if ruta_informe:
+        save_report(informe, ruta_informe)
+    run_analyses(Auto_EDA, muestra.copy(), analyses, target_column=target_column, categorical_to_numerical=categorical_to_numerical,
+                 ruta_json=ruta_json, ruta_salida=ruta_salida, headless=ruta_salida is not None)
+    return muestra, informe
@@ -0,0 +1,229 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Extensiones reconocidas al buscar un split ya guardado (en orden de preferencia)
+EXTENSIONES = {
+    "parquet": ".parquet",
+    "feather": ".feather",
+    "npy": ".npy.d",
+    "excel": ".xlsx",
+}
+
+
+def _nombre_base(name):
+    """Quita la extensión conocida del nombre del split ('X_train.xlsx' -> 'X_train')."""
+    for extension in EXTENSIONES.values():
+        if name.endswith(extension):
+            return name[: -len(extension)]
+    return name
+
+
+def _como_dataframe(data, name):
+    """Convierte Series/arrays a DataFrame para guardarlos con un esquema uniforme."""
+    if isinstance(data, pd.Series):
+        # Una Series sin nombre toma el del split: Parquet no admite nombres de columna que no sean texto
+        return data.to_frame(name=data.name if data.name is not None else _nombre_base(name))
+    if isinstance(data, pd.DataFrame):
+        return data
+    return pd.DataFrame(data)
+
+
+class ParquetBackend:
+    """Backend columnar en Parquet (pyarrow). Conserva dtypes y permite leer solo algunas columnas."""
+
+    extension = EXTENSIONES["parquet"]
+
+    def write(self, path, df):
+        df.to_parquet(path, index=False, engine="pyarrow")
+
+    def read(self, path, columns=None):
+        return pd.read_parquet(path, columns=columns, engine="pyarrow")
+
+
+class FeatherBackend:
+    """Backend Arrow IPC (Feather v2). Lectura muy rápida y con proyección de columnas."""
+
+    extension = EXTENSIONES["feather"]
+
+    def write(self, path, df):
+        df.reset_index(drop=True).to_feather(path)
+
+    def read(self, path, columns=None):
+        return pd.read_feather(path, columns=columns)
+
+
+class NpyBackend:
+    """
+    Backend de arrays .npy crudos, uno por columna, leídos con memory-map.
+
+    Cada split es un directorio con un `schema.json` (orden de columnas y dtypes) y un
+    `.npy` por columna. Las columnas de texto se guardan como unicode de ancho fijo y
+    se devuelven con su dtype original. Los faltantes que el array no puede representar
+    (texto, dtypes nullable como Int64 o boolean) se guardan en un `.npy` de máscara aparte.
+    Las columnas que no se pueden guardar sin cambiar sus valores (objetos que no son texto,
+    categorías no textuales, otros dtypes de extensión) se rechazan con TypeError.
+    """
+
+    extension = EXTENSIONES["npy"]
+
+    @staticmethod
+    def _valores(col, serie, faltan):
+        """Array NumPy sin objetos de la columna (los faltantes quedan a '' o 0, según la máscara)."""
+        if serie.dtype == object or isinstance(serie.dtype, (pd.StringDtype, pd.CategoricalDtype)):
+            objetos = serie.astype(object)
+            tipo = pd.api.types.infer_dtype(objetos, skipna=True)
+            if tipo not in ("string", "empty"):
+                raise TypeError(f"NpyBackend solo guarda columnas de texto; '{col}' tiene valores '{tipo}' (usa formato='parquet')")
+            return objetos.where(~faltan, "").to_numpy(dtype=np.str_)
+        if isinstance(serie.dtype, pd.api.extensions.ExtensionDtype):
+            if not hasattr(serie.dtype, "numpy_dtype"):
+                raise TypeError(f"NpyBackend no admite el dtype {serie.dtype} de '{col}' (usa formato='parquet')")
+            return serie.to_numpy(dtype=serie.dtype.numpy_dtype, na_value=0)
+        return serie.to_numpy()
+
+    def write(self, path, df):
+        # Se convierten todas las columnas antes de escribir, para no dejar un split a medias si se rechaza alguna
+        columnas = []
+        for col in df.columns:
+            faltan = df[col].isna().to_numpy()
+            columnas.append((col, df[col].dtype, faltan, self._valores(col, df[col], faltan)))
+        os.makedirs(path, exist_ok=True)
+        schema = []
+        for i, (col, dtype, faltan, valores) in enumerate(columnas):
+            np.save(os.path.join(path, f"{i}.npy"), np.ascontiguousarray(valores), allow_pickle=False)
+            entrada = {"name": col, "file": f"{i}.npy", "dtype": str(dtype)}
+            # Los float y fechas ya guardan NaN/NaT en el propio array
+            if faltan.any() and valores.dtype.kind not in "fmM":
+                entrada["mask"] = f"{i}.mask.npy"
+                np.save(os.path.join(path, entrada["mask"]), faltan, allow_pickle=False)
+            schema.append(entrada)
+        with open(os.path.join(path, "schema.json"), "w") as f:
+            json.dump({"columns": schema, "rows": len(df)}, f)
+
+    def read(self, path, columns=None, mmap=True):
+        with open(os.path.join(path, "schema.json")) as f:
+            guardado = json.load(f)
+        schema = guardado["columns"]
+        if columns is not None:
+            por_nombre = {entrada["name"]: entrada for entrada in schema}
+            faltantes = [col for col in columns if col not in por_nombre]
+            if faltantes:
+                raise KeyError(f"Columnas no encontradas en {path}: {faltantes}")
+            schema = [por_nombre[col] for col in columns]
+        data = {}
+        for entrada in schema:
+            valores = np.load(os.path.join(path, entrada["file"]), mmap_mode="r" if mmap else None, allow_pickle=False)
+            if "mask" in entrada:
+                faltan = np.load(os.path.join(path, entrada["mask"]), allow_pickle=False)
+                if valores.dtype.kind == "U":
+                    # Los faltantes se quitan antes de convertir, para que '' no sea una categoría
+                    objetos = valores.astype(object)
+                    objetos[faltan] = None
+                    data[entrada["name"]] = pd.Series(objetos, dtype=object).astype(entrada["dtype"])
+                else:
+                    data[entrada["name"]] = pd.Series(np.asarray(valores)).astype(entrada["dtype"]).mask(faltan)
+            elif valores.dtype.kind == "U":
+                data[entrada["name"]] = pd.Series(valores.astype(object)).astype(entrada["dtype"])
+            elif entrada["dtype"] != str(valores.dtype):
+                # dtypes nullable sin faltantes (Int64, boolean...)
+                data[entrada["name"]] = pd.Series(np.asarray(valores)).astype(entrada["dtype"])
+            else:
+                data[entrada["name"]] = valores
+        if not data:
+            return pd.DataFrame(index=pd.RangeIndex(guardado["rows"]))
+        # Un DataFrame por columna y concat: construir desde el dict consolidaría las columnas
+        # del mismo dtype en un único bloque, copiando los arrays mapeados en memoria
+        return pd.concat([pd.DataFrame({nombre: valores}, copy=False) for nombre, valores in data.items()], axis=1)
+
+
+class ExcelBackend:
+    """Backend Excel (openpyxl). Solo se mantiene como exportación opcional y para leer artefactos antiguos."""
+
+    extension = EXTENSIONES["excel"]
+
+    def write(self, path, df):
+        df.to_excel(path, index=False)
+
+    def read(self, path, columns=None):
+        return pd.read_excel(path, usecols=columns)
+
+
+BACKENDS = {
+    "parquet": ParquetBackend,
+    "feather": FeatherBackend,
+    "npy": NpyBackend,
+    "excel": ExcelBackend,
+}
+
+
+def register_backend(name, backend_cls):
+    """Registra un backend adicional (debe exponer `extension`, `write` y `read`)."""
+    BACKENDS[name] = backend_cls
+    EXTENSIONES[name] = backend_cls.extension
+
+
+class ArtifactStore:
+    """
+    Almacén de splits (X_train, X_test, y_train...) con backends intercambiables.
+
+    Args:
+        ruta (str): Directorio donde se guardan los splits.
+        formato (str): Backend principal ('parquet', 'feather', 'npy').
+        exportar_excel (bool): Si es True, además escribe una copia .xlsx de cada split.
+    """
+
+    def __init__(self, ruta="../data/processed/", formato="parquet", exportar_excel=False):
+        if formato not in BACKENDS:
+            raise ValueError(f"Formato no soportado: {formato}. Opciones: {list(BACKENDS)}")
+        self.ruta = ruta
+        self.formato = formato
+        self.exportar_excel = exportar_excel
+
+    def path(self, name, formato=None):
+        formato = formato or self.formato
+        return os.path.join(self.ruta, _nombre_base(name) + EXTENSIONES[formato])
+
+    def save_split(self, name, data):
+        """Guarda un split con el backend principal (y en Excel si está activada la exportación)."""
+        os.makedirs(self.ruta, exist_ok=True)
+        df = _como_dataframe(data, name)
+        BACKENDS[self.formato]().write(self.path(name), df)
+        if self.exportar_excel and self.formato != "excel":
+            ExcelBackend().write(self.path(name, "excel"), df)
+        return self.path(name)
+
+    def find(self, name):
+        """Devuelve (formato, ruta) del split guardado, probando primero el backend principal."""
+        formatos = [self.formato] + [formato for formato in BACKENDS if formato != self.formato]
+        for formato in formatos:
+            path = self.path(name, formato)
+            if os.path.exists(path):
+                return formato, path
+        return None, None
+
+    def exists(self, name):
+        return self.find(name)[0] is not None
+
+    def load_split(self, name, columns=None):
+        """
+        Carga un split por nombre (con o sin extensión), leyendo solo `columns` si se indican.
+
+        Si no existe en el backend principal, recurre a los demás formatos, incluido el .xlsx
+        de ejecuciones antiguas.
+        """
+        formato, path = self.find(name)
+        if formato is None:
+            raise FileNotFoundError(f"Split no encontrado en {self.ruta}: {_nombre_base(name)}")
+        return BACKENDS[formato]().read(path, columns=columns)
+
+
+def load_split(name, rutas=("../data/processed/", "../models/"), columns=None, formato="parquet"):
+    """Busca un split en varias rutas base y lo carga con el primer almacén que lo tenga."""
+    for ruta in rutas:
+        store = ArtifactStore(ruta, formato=formato)
+        if store.exists(name):
+            return store.load_split(name, columns=columns)
+    raise FileNotFoundError(f"Split no encontrado en ninguna ruta: {_nombre_base(name)}")
@@ -0,0 +1,221 @@
+"""
+Benchmark de las etapas de Auto_EDA con datos sintéticos con la forma del dataset de diabetes.
+
+Genera DataFrames con las columnas de `outliers_dict.json` (más variantes anchas con columnas
+extra derivadas de ellas) y ejecuta el pipeline completo midiendo cada función con
+`profiling.Profiler`. Cada ejecución guarda su informe JSON/CSV y añade sus filas a
+`history.csv`, con el commit, para seguir las regresiones en el tiempo.
+
+Uso (desde `src/`):
+    python bench_auto_eda.py --sizes 10k,1m,10m --widths 8,64
+    python bench_auto_eda.py --sizes 1m --plots --excel
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np
+import pandas as pd
+
+import Auto_EDA
+from profiling import Profiler
+
+# Decimales de las columnas no enteras del dataset original (el resto son enteros)
+DECIMALES = {"BMI": 1, "DiabetesPedigreeFunction": 3}
+# Límite de filas de una hoja de Excel
+MAX_FILAS_EXCEL = 1_048_575
+
+
+def parse_size(texto):
+    """'10k' -> 10000, '1m' -> 1000000."""
+    texto = texto.strip().lower()
+    factor = {"k": 1_000, "m": 1_000_000}.get(texto[-1], 1)
+    return int(float(texto.rstrip("km")) * factor)
+
+
+def synthetic_diabetes(rows, bounds, width=None, prevalence=0.35, zeros=0.3, outliers=0.01, missing=0.0, duplicates=0.01, seed=42):
+    """
+    DataFrame sintético con la forma del dataset de diabetes.
+
+    Cada columna es normal, con mediana y dispersión deducidas de sus límites IQR
+    (límites = Q1 - 1.5 IQR, Q3 + 1.5 IQR), desplazada media desviación en la clase positiva,
+    sin negativos y con una fracción de outliers por encima del límite superior. Las columnas
+    con límite inferior 0 (p. ej. Insulin, SkinThickness) tienen además una fracción de ceros,
+    como el original.
+
+    Args:
+        rows (int): Número de filas.
+        bounds (dict): {columna: [inferior, superior]} (contenido de `outliers_dict.json`).
+        width (int): Número total de features; si es mayor que len(bounds) se añaden copias
+            con ruido de las columnas base (`Glucose_1`, `BMI_1`, ...).
+        missing (float): Fracción de valores faltantes en las features.
+        duplicates (float): Fracción de filas que son copia de otra.
+
+    Returns:
+        pd.DataFrame: Features más la columna 'Outcome'.
+    """
+    rng = np.random.default_rng(seed)
+    outcome = (rng.random(rows) < prevalence).astype(np.int64)
+    base = list(bounds)
+    width = width or len(base)
+    columnas = base + [f"{base[i % len(base)]}_{i // len(base)}" for i in range(len(base), width)]
+    datos = {}
+    for i, col in enumerate(columnas):
+        origen = base[i % len(base)]
+        lo, hi = bounds[origen]
+        iqr = (hi - lo) / 4
+        sigma = iqr / 1.349 or 1.0
+        valores = rng.normal((lo + hi) / 2, sigma, rows)
+        valores += 0.5 * sigma * outcome
+        extremos = rng.random(rows) < outliers
+        valores[extremos] = hi + rng.random(int(extremos.sum())) * (hi - lo)
+        np.maximum(valores, 0, out=valores)
+        if lo == 0:
+            valores[rng.random(rows) < zeros] = 0
+        if origen in DECIMALES:
+            valores = np.round(valores, DECIMALES[origen])
+            if missing:
+                valores[rng.random(rows) < missing] = np.nan
+        elif missing:
+            valores = np.round(valores)
+            valores[rng.random(rows) < missing] = np.nan
+        else:
+            valores = np.round(valores).astype(np.int64)
+        datos[col] = valores
+    datos["Outcome"] = outcome
+    n_duplicados = int(rows * duplicates)
+    if n_duplicados:
+        destino = rng.choice(rows, n_duplicados, replace=False)
+        fuente = rng.choice(rows, n_duplicados, replace=True)
+        for valores in datos.values():
+            valores[destino] = valores[fuente]
+    return pd.DataFrame(datos)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_auto_eda(df, profiler, formato="parquet", exportar_excel=False, plots=False, seaborn_max_rows=100_000, k=7, dataset_name="X_train_sin_outliers_norm"):
+    """
+    Ejecuta las etapas de Auto_EDA en el orden del notebook con todas las funciones
+    instrumentadas. Escribe en las rutas relativas habituales (../data, ../models).
+    """
+    with profiler.instrument(Auto_EDA):
+        df = Auto_EDA.explore_data(df)
+        df = Auto_EDA.clean_duplicates(df)
+        df = Auto_EDA.clean_irrelevant_data(df)
+        if plots:
+            if len(df) <= seaborn_max_rows:
+                Auto_EDA.univariate_numerical_analysis(df)
+                Auto_EDA.correlation_analysis(df)
+            Auto_EDA.bivariate_numerical_analysis(df, headless=True, ruta_salida="../data/interim/plots")
+            Auto_EDA.pairplot_analysis(df, headless=True, ruta_salida="../data/interim/plots")
+        numerical_cols = df.select_dtypes(include=['number']).columns.difference([Auto_EDA.target_column])
+        df_sin_outliers = Auto_EDA.replace_outliers(df.copy(), numerical_cols)
+        df_sin_outliers = Auto_EDA.handle_missing_values(df_sin_outliers)
+        df_sin_outliers = Auto_EDA.infer_new_features(df_sin_outliers)
+        *splits, y_train, y_test, numerical_cols = Auto_EDA.feature_scaling(df, df_sin_outliers, formato=formato, exportar_excel=exportar_excel)
+        norm = Auto_EDA.normalize_data(*splits, numerical_cols, formato=formato, exportar_excel=exportar_excel)
+        scal = Auto_EDA.scale_min_max_data_1(*splits, numerical_cols, formato=formato, exportar_excel=exportar_excel)
+        Auto_EDA.feature_selection(*splits, *norm, *scal, y_train, y_test, Auto_EDA.target_column, formato=formato, exportar_excel=exportar_excel, k=min(k, len(numerical_cols)), dataset_name=dataset_name)
+
+
+def run_case(rows, width, bounds, args):
+    """Genera un caso, lo ejecuta en un directorio temporal y devuelve el informe por etapa."""
+    df = synthetic_diabetes(rows, bounds, width=width, missing=args.missing, seed=args.seed)
+    profiler = Profiler(trace_memory=args.trace, reset_rss_peak=args.reset_rss_peak)
+    exportar_excel = args.excel and rows <= MAX_FILAS_EXCEL
+    if args.excel and not exportar_excel:
+        print(f"  {rows} filas superan el límite de Excel: se omite la exportación XLSX.")
+    origen = os.getcwd()
+    trabajo = tempfile.mkdtemp(prefix="bench_auto_eda_")
+    for carpeta in ("src", "models", "data/processed/Json", "data/interim"):
+        os.makedirs(os.path.join(trabajo, carpeta), exist_ok=True)
+    salida = io.StringIO()
+    try:
+        os.chdir(os.path.join(trabajo, "src"))
+        with contextlib.redirect_stdout(salida) if not args.verbose else contextlib.nullcontext():
+            run_auto_eda(df, profiler, formato=args.formato, exportar_excel=exportar_excel, plots=args.plots, seaborn_max_rows=args.seaborn_max_rows)
+    finally:
+        os.chdir(origen)
+        shutil.rmtree(trabajo, ignore_errors=True)
+    tabla = profiler.to_frame()
+    tabla.insert(0, "case_rows", rows)
+    tabla.insert(1, "case_width", width)
+    return profiler, tabla
+
+
+def compare_with_previous(history, run_id, threshold=1.2):
+    """Etapas cuyo tiempo supera en `threshold` veces al de la ejecución anterior del mismo caso."""
+    actual = history[history["run_id"] == run_id]
+    anteriores = history[history["run_id"] < run_id]
+    if anteriores.empty:
+        return pd.DataFrame()
+    clave = ["case_rows", "case_width", "stage"]
+    previo = anteriores.sort_values("run_id").groupby(clave, as_index=False).last()[clave + ["wall_s", "run_id"]]
+    tabla = actual[clave + ["wall_s"]].merge(previo, on=clave, suffixes=("", "_previous"))
+    tabla["ratio"] = tabla["wall_s"] / tabla["wall_s_previous"]
+    return tabla[tabla["ratio"] > threshold].sort_values("ratio", ascending=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark por etapa de Auto_EDA con datos sintéticos.")
+    parser.add_argument("--sizes", default="10k,1m,10m", help="Filas por caso, p. ej. 10k,1m,10m")
+    parser.add_argument("--widths", default="8,64", help="Número de features por caso (8 = columnas originales)")
+    parser.add_argument("--bounds", default="../data/processed/Json/outliers_dict.json", help="JSON con las columnas y sus límites IQR")
+    parser.add_argument("--formato", default="parquet", choices=["parquet", "feather", "npy"])
+    parser.add_argument("--excel", action="store_true", help="Exportar además a XLSX (solo casos que caben en una hoja)")
+    parser.add_argument("--plots", action="store_true", help="Incluir las etapas de gráficos (con backend Agg)")
+    parser.add_argument("--seaborn-max-rows", type=int, default=100_000, help="Máximo de filas para los gráficos seaborn sin agregar")
+    parser.add_argument("--missing", type=float, default=0.0, help="Fracción de valores faltantes")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--trace", action="store_true", help="Medir también con tracemalloc (ralentiza mucho el código Python puro, p. ej. openpyxl)")
+    parser.add_argument("--reset-rss-peak", action="store_true", help="Pico de RSS por etapa (reinicia VmHWM del proceso en Linux)")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Ratio de tiempo a partir del cual se avisa de una regresión")
+    parser.add_argument("--out", default="../data/interim/benchmarks")
+    parser.add_argument("--verbose", action="store_true", help="Mostrar la salida de las funciones de Auto_EDA")
+    args = parser.parse_args()
+
+    with open(args.bounds) as f:
+        bounds = json.load(f)
+    run_id = time.strftime("%Y%m%dT%H%M%S")
+    metadata = {"run_id": run_id, "commit": git_commit(), "args": vars(args)}
+    tablas = []
+    for rows in map(parse_size, args.sizes.split(",")):
+        for width in map(int, args.widths.split(",")):
+            print(f"Caso: {rows} filas x {width} features")
+            profiler, tabla = run_case(rows, width, bounds, args)
+            profiler.save(args.out, nombre=f"profile_{run_id}_{rows}x{width}", metadata={**metadata, "rows": rows, "width": width})
+            tablas.append(tabla)
+            print(profiler.summary().head(8).to_string(index=False))
+
+    resultado = pd.concat(tablas, ignore_index=True)
+    resultado.insert(0, "run_id", run_id)
+    resultado.insert(1, "commit", metadata["commit"])
+    ruta_historial = os.path.join(args.out, "history.csv")
+    existe = os.path.exists(ruta_historial)
+    resultado.to_csv(ruta_historial, mode="a", header=not existe, index=False)
+    history = pd.read_csv(ruta_historial, dtype={"run_id": str})
+    regresiones = compare_with_previous(history, run_id, threshold=args.threshold)
+    if not regresiones.empty:
+        print(f"Aviso: etapas más de {args.threshold}x más lentas que en la ejecución anterior:")
+        print(regresiones.to_string(index=False))
+    print(f"Informes guardados en {args.out} (historial: {ruta_historial}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Índice de los tramos guardados por `StreamingDeduplicator.save`
+MANIFIESTO = "runs.json"
+
+
+# Tipo de cada clave numérica: entero con signo, coma flotante (no entera, NaN, inf), entero >= 2**63
+_ENTERO, _FLOTANTE, _SIN_SIGNO = 0, 1, 2
+_NAN = np.array([np.nan]).view(np.uint64)[0]
+
+
+def _numeric_key(serie):
+    """
+    Clave exacta de una columna numérica: (uint64, tipo uint8).
+
+    Los enteros se codifican sin pasar por float64, y un float con valor entero representable
+    da la misma clave que ese entero (1 y 1.0 hashean igual, p. ej. un int64 que en otro bloque
+    llega como float64 por un NULL); el resto de floats usan sus bits, con otro tipo para que
+    nunca coincidan con un entero. Todos los faltantes dan la misma clave.
+    """
+    if pd.api.types.is_unsigned_integer_dtype(serie.dtype):
+        faltan = serie.isna().to_numpy()
+        clave = serie.to_numpy(dtype=np.uint64, na_value=0)
+        tipo = np.where(clave >= 2**63, _SIN_SIGNO, _ENTERO).astype(np.uint8)
+    elif pd.api.types.is_integer_dtype(serie.dtype):
+        faltan = serie.isna().to_numpy()
+        clave = serie.to_numpy(dtype=np.int64, na_value=0).view(np.uint64)
+        tipo = np.full(len(serie), _ENTERO, dtype=np.uint8)
+    else:
+        valores = serie.to_numpy(dtype=np.float64, na_value=np.nan)
+        faltan = np.isnan(valores)
+        with np.errstate(invalid="ignore"):
+            # NaN, inf y los valores fuera de rango no vuelven al mismo valor al convertirlos
+            enteros = valores.astype(np.int64)
+            entero = enteros == valores
+        if entero.all():
+            # Caso habitual (enteros leídos como float): ni NaN ni valores >= 2**63
+            return enteros.view(np.uint64), np.zeros(len(valores), dtype=np.uint8)
+        clave = np.where(entero, enteros.view(np.uint64), valores.view(np.uint64))
+        tipo = np.where(entero, _ENTERO, _FLOTANTE).astype(np.uint8)
+        grandes = valores >= 2.0**63
+        if grandes.any():
+            sin_signo = grandes & (valores < 2.0**64) & (valores == np.floor(valores))
+            clave[sin_signo] = valores[sin_signo].astype(np.uint64)
+            tipo[sin_signo] = _SIN_SIGNO
+    if faltan.any():
+        # `to_numpy` puede devolver una vista de solo lectura de la columna
+        clave = clave.copy()
+        clave[faltan] = _NAN
+        tipo[faltan] = _FLOTANTE
+    return clave, tipo
+
+
+def _column_hash(serie):
+    """
+    Hash uint64 de una columna. Las numéricas hashean su clave exacta (`_numeric_key`) y, solo
+    en las posiciones cuyo tipo no es entero, se vuelve a hashear con el tipo, de modo que un
+    entero hashea igual venga de una columna int o float y nunca coincide con los bits de un float.
+    """
+    if (pd.api.types.is_integer_dtype(serie.dtype) or pd.api.types.is_float_dtype(serie.dtype)) and not pd.api.types.is_bool_dtype(serie.dtype):
+        clave, tipo = _numeric_key(serie)
+        h = pd.util.hash_array(clave)
+        otros = tipo != _ENTERO
+        if otros.any():
+            h[otros] = pd.util.hash_array(h[otros] ^ tipo[otros].astype(np.uint64))
+        return h
+    return pd.util.hash_pandas_object(serie, index=False).to_numpy()
+
+
+def row_hashes(df, subset=None):
+    """
+    Hash de 64 bits de cada fila (uint64), vectorizado y sin depender del índice.
+
+    Se hashea una vez cada columna y los hashes se combinan como en `hash_pandas_object`.
+    """
+    if subset is not None:
+        df = df[list(subset)]
+    n_columnas = len(df.columns)
+    with np.errstate(over="ignore"):
+        multiplicador = np.uint64(1000003)
+        resultado = np.full(len(df), 0x345678, dtype=np.uint64)
+        for i in range(n_columnas):
+            resultado ^= _column_hash(df.iloc[:, i])
+            resultado *= multiplicador
+            multiplicador += np.uint64(82520 + 2 * (n_columnas - i))
+        resultado += np.uint64(97531)
+    return resultado
+
+
+def _first_occurrence(hashes):
+    """
+    Para cada fila, la posición de la primera fila con el mismo hash, con un único `factorize`.
+
+    `factorize` numera los valores en orden de aparición, así que las primeras apariciones son
+    las filas cuyo código supera al máximo de los anteriores y su posición se indexa por código.
+    """
+    codes, _ = pd.factorize(hashes)
+    anterior = np.maximum.accumulate(np.concatenate(([-1], codes[:-1])))
+    primera = codes > anterior
+    return np.flatnonzero(primera)[codes], primera
+
+
+def _same_rows(df, filas, otras):
+    """Compara columna a columna las filas `filas` con `otras` (NaN == NaN, como drop_duplicates)."""
+    iguales = np.ones(len(filas), dtype=bool)
+    for col in df.columns:
+        valores = df[col].to_numpy()
+        a, b = valores[filas], valores[otras]
+        coincide = a == b
+        if coincide.dtype != bool:
+            coincide = np.asarray(coincide, dtype=bool)
+        iguales &= coincide | (pd.isna(a) & pd.isna(b))
+    return iguales
+
+
+def duplicated_rows(df, subset=None, verify=True):
+    """
+    Máscara de filas repetidas (se conserva la primera aparición), como `df.duplicated()`, a
+    partir de un único hash por fila.
+
+    Args:
+        subset (list): Columnas que definen el duplicado (por defecto, todas).
+        verify (bool): Compara los valores de las filas marcadas con su primera aparición, de
+            modo que una colisión de hash nunca elimina una fila distinta.
+
+    Returns:
+        np.ndarray: Máscara booleana de longitud len(df).
+    """
+    if len(df) == 0:
+        return np.zeros(0, dtype=bool)
+    primera_pos, primera = _first_occurrence(row_hashes(df, subset))
+    duplicados = ~primera
+    if verify and duplicados.any():
+        filas = np.flatnonzero(duplicados)
+        datos = df if subset is None else df[list(subset)]
+        duplicados[filas[~_same_rows(datos, filas, primera_pos[filas])]] = False
+    return duplicados
+
+
+def drop_duplicate_rows(df, subset=None, inplace=False, verify=True):
+    """
+    Elimina las filas repetidas en una sola pasada de hash.
+
+    Returns:
+        tuple: (DataFrame sin duplicados, número de filas eliminadas). Con `inplace=True` el
+        DataFrame devuelto es el mismo objeto.
+    """
+    duplicados = duplicated_rows(df, subset=subset, verify=verify)
+    eliminados = int(duplicados.sum())
+    if not inplace:
+        return df[~duplicados], eliminados
+    if eliminados:
+        if df.index.is_unique:
+            df.drop(index=df.index[duplicados], inplace=True)
+        else:
+            # Con etiquetas repetidas no se puede borrar por etiqueta; drop_duplicates borra por posición
+            df.drop_duplicates(subset=subset, inplace=True)
+    return df, eliminados
+
+
+class StreamingDeduplicator:
+    """
+    Deduplicación por bloques (p. ej. una extracción de base de datos) guardando solo los hashes.
+
+    Los hashes vistos se guardan en arrays uint64 ordenados (8 bytes por fila única), agrupados
+    en tramos de tamaño geométrico que se fusionan al crecer, de modo que insertar un bloque
+    no obliga a reordenar todo lo anterior. En disco (`save`/`load`) cada tramo es un .npy que
+    no se reescribe: guardar solo escribe los tramos nuevos o fusionados desde la última vez, y
+    al cargar los tramos se mapean sin leerlos enteros.
+
+    Sin las filas no se puede verificar una coincidencia de hash. Como las claves numéricas son
+    exactas (`_numeric_key`), dos filas distintas solo se confunden por una colisión aleatoria
+    del hash de 64 bits: probabilidad ~n²/2^65, del orden de 3e-6 para 10 millones de filas únicas.
+
+    Args:
+        subset (list): Columnas que definen el duplicado (por defecto, todas).
+    """
+
+    def __init__(self, subset=None):
+        self.subset = subset
+        self.rows_in = 0
+        self.rows_out = 0
+        self._tramos = []
+        # Fichero de cada tramo en disco (None si todavía no se ha guardado)
+        self._ficheros = []
+
+    def _seen(self, hashes):
+        vistos = np.zeros(len(hashes), dtype=bool)
+        for tramo in self._tramos:
+            pos = np.minimum(np.searchsorted(tramo, hashes), len(tramo) - 1)
+            vistos |= tramo[pos] == hashes
+        return vistos
+
+    def _add(self, hashes):
+        if len(hashes) == 0:
+            return
+        self._tramos.append(np.sort(hashes))
+        self._ficheros.append(None)
+        while len(self._tramos) > 1 and len(self._tramos[-2]) <= 2 * len(self._tramos[-1]):
+            ultimo = self._tramos.pop()
+            self._ficheros.pop()
+            self._tramos[-1] = np.sort(np.concatenate((self._tramos[-1], ultimo)), kind="stable")
+            self._ficheros[-1] = None
+
+    def filter(self, chunk):
+        """Devuelve las filas del bloque que no han aparecido antes (en este bloque o en anteriores)."""
+        self.rows_in += len(chunk)
+        if len(chunk) == 0:
+            return chunk
+        hashes = row_hashes(chunk, self.subset)
+        _, nuevas = _first_occurrence(hashes)
+        nuevas &= ~self._seen(hashes)
+        self._add(hashes[nuevas])
+        self.rows_out += int(nuevas.sum())
+        return chunk[nuevas]
+
+    def __call__(self, chunks):
+        """Generador: aplica `filter` a cada bloque y omite los bloques que quedan vacíos."""
+        for chunk in chunks:
+            filtrado = self.filter(chunk)
+            if len(filtrado):
+                yield filtrado
+
+    @property
+    def removed(self):
+        return self.rows_in - self.rows_out
+
+    @property
+    def nbytes(self):
+        """Memoria de los hashes guardados."""
+        return sum(tramo.nbytes for tramo in self._tramos)
+
+    def hashes(self):
+        """Todos los hashes vistos, en un único array ordenado (para guardarlos con `np.save`)."""
+        if not self._tramos:
+            return np.empty(0, dtype=np.uint64)
+        if len(self._tramos) > 1:
+            self._tramos = [np.sort(np.concatenate(self._tramos), kind="stable")]
+            self._ficheros = [None]
+        return self._tramos[0]
+
+    @classmethod
+    def from_hashes(cls, hashes, subset=None, rows=0):
+        """Reconstruye el deduplicador a partir de los hashes guardados."""
+        deduplicador = cls(subset=subset)
+        hashes = np.sort(np.asarray(hashes, dtype=np.uint64))
+        if len(hashes):
+            deduplicador._tramos = [hashes]
+            deduplicador._ficheros = [None]
+        deduplicador.rows_in = deduplicador.rows_out = rows or len(hashes)
+        return deduplicador
+
+    def save(self, ruta):
+        """
+        Guarda los tramos en la carpeta `ruta`, un .npy por tramo: solo escribe los que no están
+        ya en disco y borra los que se han fusionado desde el último guardado.
+        """
+        os.makedirs(ruta, exist_ok=True)
+        anterior = _leer_manifiesto(ruta)
+        siguiente = anterior.get("next", 0)
+        for i, fichero in enumerate(self._ficheros):
+            if fichero is None:
+                fichero = f"run_{siguiente:08d}.npy"
+                siguiente += 1
+                np.save(os.path.join(ruta, fichero), self._tramos[i])
+                self._ficheros[i] = fichero
+        manifiesto = {"subset": self.subset, "rows_in": self.rows_in, "rows_out": self.rows_out, "runs": self._ficheros, "next": siguiente}
+        temporal = os.path.join(ruta, f"{MANIFIESTO}.tmp")
+        with open(temporal, "w") as f:
+            json.dump(manifiesto, f)
+        os.replace(temporal, os.path.join(ruta, MANIFIESTO))
+        for fichero in set(anterior.get("runs", [])) - set(self._ficheros):
+            os.remove(os.path.join(ruta, fichero))
+
+    @classmethod
+    def load(cls, ruta, mmap=True):
+        """Abre los tramos guardados con `save` (mapeados en memoria, de solo lectura, con `mmap=True`)."""
+        manifiesto = _leer_manifiesto(ruta)
+        deduplicador = cls(subset=manifiesto.get("subset"))
+        deduplicador.rows_in, deduplicador.rows_out = manifiesto.get("rows_in", 0), manifiesto.get("rows_out", 0)
+        for fichero in manifiesto.get("runs", []):
+            deduplicador._tramos.append(np.load(os.path.join(ruta, fichero), mmap_mode="r" if mmap else None))
+            deduplicador._ficheros.append(fichero)
+        return deduplicador
+
+
+def _leer_manifiesto(ruta):
+    try:
+        with open(os.path.join(ruta, MANIFIESTO)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def dedup_sql_table(engine, tabla=None, chunksize=100_000, columns=None, subset=None, query=None, params=None):
+    """
+    Lee una tabla (o consulta) por bloques y devuelve sus filas sin duplicados, bloque a bloque.
+
+    Returns:
+        tuple: (generador de DataFrames, StreamingDeduplicator con los contadores).
+    """
+    from streaming_eda import read_sql_chunks
+
+    deduplicador = StreamingDeduplicator(subset=subset)
+    return deduplicador(read_sql_chunks(engine, tabla, chunksize=chunksize, columns=columns, query=query, params=params)), deduplicador
@@ -0,0 +1,186 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Código de las categorías no vistas al ajustar y de los valores faltantes (el mismo que usa pd.factorize para NaN)
+UNSEEN = -1
+# Registro de encoders que escriben las etapas de Auto_EDA junto a las reglas
+REGISTRO = "encoders.json"
+
+
+def is_categorical(serie):
+    """Columnas de texto u objeto (incluido el dtype `str` de pandas) o categóricas."""
+    return (
+        pd.api.types.is_object_dtype(serie)
+        or pd.api.types.is_string_dtype(serie)
+        or isinstance(serie.dtype, pd.CategoricalDtype)
+    )
+
+
+def _compact_dtype(n):
+    """Entero con signo más pequeño que admite los códigos 0..n-1 y UNSEEN."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if n <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def _python(valor):
+    return valor.item() if isinstance(valor, np.generic) else valor
+
+
+def _json_scalar(clave):
+    """Valor de una clave de reglas: JSON escribe como texto las claves int/float/bool (1 -> "1", True -> "true")."""
+    try:
+        valor = json.loads(clave)
+    except ValueError:
+        return clave
+    return valor if isinstance(valor, (bool, int, float)) else clave
+
+
+class CategoryEncoder:
+    """
+    Tabla de códigos de una columna categórica: la categoría i tiene el código i (el orden de
+    aparición de `pd.factorize`). Las categorías no vistas y los faltantes reciben `unseen`.
+
+    Args:
+        categories: Categorías en el orden de sus códigos.
+        name (str): Columna en la que se escriben los códigos (p. ej. 'Outcome_n').
+        missing (bool): Si la columna tenía faltantes al ajustar (las reglas incluyen NaN: -1).
+    """
+
+    def __init__(self, categories, name=None, unseen=UNSEEN, missing=False):
+        self.categories = pd.Index(categories)
+        self.name = name
+        self.unseen = unseen
+        self.missing = missing
+        self.dtype = _compact_dtype(len(self.categories))
+
+    @classmethod
+    def fit(cls, serie, name=None, unseen=UNSEEN):
+        codigos, uniques = pd.factorize(serie)
+        return cls(uniques, name=name if name is not None else f"{serie.name}_n", unseen=unseen, missing=bool((codigos < 0).any()))
+
+    def transform(self, values, dtype=None):
+        """
+        Códigos de un lote (por defecto en el entero más pequeño que los admite).
+
+        Solo se buscan las categorías distintas del lote (las de su dtype categórico o las de un
+        `pd.factorize`) y sus códigos se traducen con una tabla NumPy indexada por posición.
+        """
+        if isinstance(getattr(values, "dtype", None), pd.CategoricalDtype):
+            codigos, distintos = values.cat.codes.to_numpy(), values.cat.categories
+        else:
+            codigos, distintos = pd.factorize(values)
+        tabla = self.categories.get_indexer(distintos)
+        # Última posición para los faltantes (código -1 del lote)
+        tabla = np.append(np.where(tabla < 0, self.unseen, tabla), self.unseen).astype(dtype or self.dtype)
+        return tabla[codigos]
+
+    def inverse_transform(self, codes):
+        """Categorías de unos códigos (None para `unseen`)."""
+        codes = np.asarray(codes)
+        tabla = np.append(np.asarray(self.categories, dtype=object), None)
+        return tabla[np.where((codes < 0) | (codes == self.unseen), -1, codes)]
+
+    def rules(self):
+        """{categoría: código}, el contenido de los `*_transformation_rules.json`."""
+        reglas = {_python(categoria): codigo for codigo, categoria in enumerate(self.categories)}
+        if self.missing:
+            reglas[float("nan")] = -1
+        return reglas
+
+    def save_rules(self, ruta_json):
+        os.makedirs(os.path.dirname(ruta_json) or ".", exist_ok=True)
+        with open(ruta_json, "w") as f:
+            json.dump(self.rules(), f)
+
+    @classmethod
+    def from_rules(cls, ruta_json, name=None, unseen=UNSEEN):
+        """
+        Reconstruye el encoder desde un `*_transformation_rules.json`.
+
+        Las claves JSON son texto: si todas las categorías son escalares JSON numéricos o todas
+        booleanos (las de una columna int/float/bool), se recuperan con su tipo; si no, se quedan
+        como texto. Una columna de texto cuyos valores parecen todos números se leería como
+        numérica: para conservar los tipos sin ambigüedad, usar `EncoderRegistry`.
+        """
+        with open(ruta_json) as f:
+            reglas = json.load(f)
+        categorias = [categoria for categoria, codigo in sorted(reglas.items(), key=lambda item: item[1]) if codigo >= 0]
+        valores = [_json_scalar(categoria) for categoria in categorias]
+        tipos = {type(valor) for valor in valores}
+        if valores and (tipos == {bool} or tipos <= {int, float}):
+            categorias = valores
+        return cls(categorias, name=name, unseen=unseen, missing=len(categorias) < len(reglas))
+
+    def to_dict(self):
+        return {"categories": [_python(c) for c in self.categories], "name": self.name, "unseen": self.unseen, "missing": self.missing}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["categories"], name=data["name"], unseen=data["unseen"], missing=data["missing"])
+
+
+class EncoderRegistry:
+    """
+    Encoders por columna de origen, guardados juntos en un JSON compacto (la lista de categorías
+    de cada columna, que conserva sus tipos) para aplicarlos en inferencia.
+    """
+
+    def __init__(self, encoders=None):
+        self.encoders = dict(encoders or {})
+
+    def fit(self, df, columns, unseen=UNSEEN):
+        """`columns`: lista de columnas o {columna: columna de códigos}."""
+        nombres = columns if isinstance(columns, dict) else {col: None for col in columns}
+        for col, nombre in nombres.items():
+            self.encoders[col] = CategoryEncoder.fit(df[col], name=nombre, unseen=unseen)
+        return self
+
+    def transform(self, df, inplace=False, dtype=None):
+        """Columnas de códigos de las columnas registradas presentes en `df` (añadidas a `df` con `inplace`)."""
+        codigos = {encoder.name: encoder.transform(df[col], dtype=dtype) for col, encoder in self.encoders.items() if col in df.columns}
+        if inplace:
+            for nombre, valores in codigos.items():
+                df[nombre] = valores
+            return df
+        return pd.DataFrame(codigos, index=df.index)
+
+    def save(self, ruta_json):
+        os.makedirs(os.path.dirname(ruta_json) or ".", exist_ok=True)
+        with open(ruta_json, "w") as f:
+            json.dump({col: encoder.to_dict() for col, encoder in self.encoders.items()}, f)
+
+    @classmethod
+    def load(cls, ruta_json, missing_ok=False):
+        if missing_ok and not os.path.exists(ruta_json):
+            return cls()
+        with open(ruta_json) as f:
+            data = json.load(f)
+        return cls({col: CategoryEncoder.from_dict(datos) for col, datos in data.items()})
+
+    def update(self, ruta_json):
+        """Añade estos encoders al registro guardado en `ruta_json` (creándolo si no existe)."""
+        registro = EncoderRegistry.load(ruta_json, missing_ok=True)
+        registro.encoders.update(self.encoders)
+        registro.save(ruta_json)
+        return registro
+
+
+def encode_column(df, col, name, ruta_reglas, ruta_registro=None):
+    """
+    Factoriza `col` en la columna `name` (int64, como `pd.factorize`), guarda sus reglas
+    {categoría: código} en `ruta_reglas` y, si se indica, añade el encoder a `ruta_registro`.
+
+    Returns:
+        CategoryEncoder
+    """
+    encoder = CategoryEncoder.fit(df[col], name=name)
+    df[name] = encoder.transform(df[col], dtype=np.int64)
+    encoder.save_rules(ruta_reglas)
+    if ruta_registro:
+        EncoderRegistry({col: encoder}).update(ruta_registro)
+    return encoder
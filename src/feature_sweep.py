@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_selection import f_classif
+
+from artifact_store import ArtifactStore
+
+# Puntuaciones ANOVA ya calculadas: blake2b(datos, y, columnas) -> DataFrame con score y pvalue
+_SCORES_CACHE = {}
+
+
+def _content_hash(valores, y, columnas):
+    """Huella estable del contenido: bytes, forma y dtype de los datos y del objetivo, más los nombres de columna."""
+    h = hashlib.blake2b(digest_size=16)
+    for array in (valores, y.astype(str) if y.dtype == object else y):
+        array = np.ascontiguousarray(array)
+        h.update(repr((array.shape, array.dtype.str)).encode())
+        h.update(array.tobytes())
+    h.update(json.dumps([str(col) for col in columnas]).encode())
+    return h.hexdigest()
+
+
+def _anova_scores(tarea):
+    """
+    Calcula F y p-valores de `f_classif` para una variante (se ejecuta en el pool).
+
+    Las columnas con faltantes (las variantes con outliers conservan los NaN) se puntúan
+    solo con sus filas presentes, igual que `incremental.ClassMoments`.
+    """
+    nombre, X, y = tarea
+    scores = np.full(X.shape[1], np.nan)
+    pvalues = np.full(X.shape[1], np.nan)
+    faltantes = np.isnan(X)
+    completas = ~faltantes.any(axis=0)
+    if completas.any():
+        scores[completas], pvalues[completas] = f_classif(X[:, completas], y)
+    for j in np.flatnonzero(~completas):
+        presentes = ~faltantes[:, j]
+        if len(np.unique(y[presentes])) > 1:
+            scores[j], pvalues[j] = (v[0] for v in f_classif(X[presentes, j:j + 1], y[presentes]))
+    return nombre, scores, pvalues
+
+
+def top_k_mask(scores, k):
+    """Misma selección que `SelectKBest`: los k mayores con desempate estable y NaN al final."""
+    scores = np.where(np.isnan(scores), np.finfo(scores.dtype).min, scores)
+    mask = np.zeros(scores.shape, dtype=bool)
+    if k > 0:
+        mask[np.argsort(scores, kind="mergesort")[-k:]] = True
+    return mask
+
+
+def anova_scores(datasets, y_train, max_workers=None):
+    """
+    F-scores ANOVA de cada variante, calculados una sola vez y cacheados por contenido.
+
+    Args:
+        datasets (dict): {nombre: DataFrame de entrenamiento}.
+        y_train: Variable objetivo de entrenamiento.
+        max_workers (int): Procesos del pool; con 1 se calcula en el proceso actual.
+
+    Returns:
+        dict: {nombre: pd.DataFrame con columnas 'score' y 'pvalue' indexado por feature}.
+    """
+    y = np.asarray(y_train).ravel()
+    resultados, pendientes, tareas = {}, [], []
+    for nombre, X in datasets.items():
+        valores = X.to_numpy(dtype=np.float64, na_value=np.nan)
+        clave = _content_hash(valores, y, X.columns)
+        if clave in _SCORES_CACHE:
+            resultados[nombre] = _SCORES_CACHE[clave]
+        else:
+            pendientes.append((nombre, clave, X))
+            tareas.append((nombre, valores, y))
+    if max_workers == 1 or len(tareas) <= 1:
+        calculados = list(map(_anova_scores, tareas))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers or min(len(tareas), os.cpu_count() or 1)) as pool:
+            calculados = list(pool.map(_anova_scores, tareas))
+    for (nombre, clave, X), (_, scores, pvalues) in zip(pendientes, calculados):
+        tabla = pd.DataFrame({"score": scores, "pvalue": pvalues}, index=X.columns)
+        _SCORES_CACHE[clave] = tabla
+        resultados[nombre] = tabla
+    return {nombre: resultados[nombre] for nombre in datasets}
+
+
+def feature_selection_sweep(datasets, y_train, ks=(7, 8, 9), test_datasets=None, y_test=None, target_column="Outcome", ruta_json="../data/processed/Json", ruta_modelo="../models/", guardar=True, formato="parquet", max_workers=None):
+    """
+    7. Feature Selection para todas las variantes y todos los k en una sola llamada.
+
+    Args:
+        datasets (dict): {nombre: X_train}, p. ej. {"X_train_con_outliers": ..., "X_train_sin_outliers_norm": ...}.
+        y_train: Objetivo de entrenamiento.
+        ks (iterable): Valores de k a evaluar.
+        test_datasets (dict): {nombre: X_test} con las mismas claves que `datasets`; sin él
+            solo se guardan los splits de entrenamiento.
+        y_test: Objetivo de prueba (necesario para guardar los splits de test).
+        guardar (bool): Si es True escribe en lote los JSON de columnas, el resumen y los splits.
+
+    Returns:
+        dict: {nombre: {"scores": DataFrame, "ranking": [...], "selections": {k: [columnas]}}}.
+    """
+    scores = anova_scores(datasets, y_train, max_workers=max_workers)
+    test_datasets = test_datasets or {}
+    resultados = {}
+    for nombre, X in datasets.items():
+        tabla = scores[nombre]
+        valores = tabla["score"].to_numpy()
+        ranking = list(tabla.index[np.argsort(np.where(np.isnan(valores), -np.inf, valores), kind="mergesort")[::-1]])
+        selecciones = {}
+        for k in ks:
+            mask = top_k_mask(valores, min(k, len(valores)))
+            # En el orden original de las columnas, igual que `get_support()`
+            selecciones[k] = list(X.columns[mask])
+        resultados[nombre] = {"scores": tabla, "ranking": ranking, "selections": selecciones}
+
+    if guardar:
+        _guardar_sweep(resultados, datasets, test_datasets, y_train, y_test, target_column, ruta_json, ruta_modelo, formato)
+    for nombre, resultado in resultados.items():
+        print(f"{nombre}: ranking ANOVA {resultado['ranking']}")
+    return resultados
+
+
+def _guardar_sweep(resultados, datasets, test_datasets, y_train, y_test, target_column, ruta_json, ruta_modelo, formato):
+    os.makedirs(ruta_json, exist_ok=True)
+    store = ArtifactStore(ruta_modelo, formato=formato)
+    resumen = {}
+    for nombre, resultado in resultados.items():
+        X_train = datasets[nombre]
+        X_test = test_datasets.get(nombre)
+        resumen[nombre] = {
+            "scores": {col: (None if np.isnan(v) else float(v)) for col, v in resultado["scores"]["score"].items()},
+            "ranking": resultado["ranking"],
+            "selections": {str(k): cols for k, cols in resultado["selections"].items()},
+        }
+        for k, cols in resultado["selections"].items():
+            with open(os.path.join(ruta_json, f"featureselection_{nombre}_k_{k}.json"), "w") as f:
+                json.dump(cols + [target_column], f)
+            x_train_sel = X_train[cols].reset_index(drop=True)
+            x_train_sel[target_column] = list(np.asarray(y_train).ravel())
+            store.save_split(f"x_train_sel_{nombre}_k_{k}", x_train_sel)
+            if X_test is not None and y_test is not None:
+                x_test_sel = X_test[cols].reset_index(drop=True)
+                x_test_sel[target_column] = list(np.asarray(y_test).ravel())
+                store.save_split(f"x_test_sel_{nombre}_k_{k}", x_test_sel)
+    with open(os.path.join(ruta_json, "featureselection_sweep.json"), "w") as f:
+        json.dump(resumen, f)
+    print(f"Selecciones guardadas en {ruta_json} y splits en {ruta_modelo} ({formato}).")
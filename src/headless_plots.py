@@ -0,0 +1,231 @@
+import json
+import os
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import combinations
+
+import numpy as np
+
+
+def _bin_indices(values, bins):
+    """Asigna cada valor a un bin (0..bins-1) del rango [min, max] de la columna; -1 si es NaN."""
+    values = np.asarray(values, dtype=np.float64)
+    finitos = np.isfinite(values)
+    if not finitos.any():
+        return np.full(values.shape, -1, dtype=np.int32), (0.0, 1.0)
+    lo, hi = float(values[finitos].min()), float(values[finitos].max())
+    ancho = (hi - lo) or 1.0
+    idx = np.full(values.shape, -1, dtype=np.int32)
+    idx[finitos] = np.minimum(((values[finitos] - lo) / ancho * bins).astype(np.int32), bins - 1)
+    return idx, (lo, lo + ancho)
+
+
+def aggregate_columns(df, numerical_cols, bins=100, max_points=1_000_000, seed=42):
+    """
+    Discretiza cada columna una sola vez; con eso cualquier par se agrega con un `bincount`.
+
+    Si el DataFrame tiene más de `max_points` filas se usa una muestra uniforme de ese
+    tamaño, común a todos los paneles.
+    """
+    n = len(df)
+    filas = None
+    if n > max_points:
+        filas = np.sort(np.random.default_rng(seed).choice(n, size=max_points, replace=False))
+    indices, extents = {}, {}
+    for col in numerical_cols:
+        valores = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        if filas is not None:
+            valores = valores[filas]
+        indices[col], extents[col] = _bin_indices(valores, bins)
+    return indices, extents, (n if filas is None else max_points)
+
+
+def pair_grid(ix, iy, bins):
+    """Histograma 2-D (bins x bins) de un par de columnas ya discretizadas."""
+    validos = (ix >= 0) & (iy >= 0)
+    return np.bincount(ix[validos] * bins + iy[validos], minlength=bins * bins).reshape(bins, bins)
+
+
+def _render_pair(tarea):
+    """Dibuja un panel (ejecutado en un proceso del pool, con backend Agg)."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import LogNorm
+
+    fig, ax = plt.subplots(figsize=(5, 5))
+    (x0, x1), (y0, y1) = tarea["extent_x"], tarea["extent_y"]
+    grid = np.ma.masked_equal(tarea["grid"].T, 0)
+    imagen = ax.imshow(grid, origin="lower", extent=[x0, x1, y0, y1], aspect="auto", cmap="viridis", norm=LogNorm())
+    fig.colorbar(imagen, ax=ax, label="Registros")
+    ax.set_xlabel(tarea["x"])
+    ax.set_ylabel(tarea["y"])
+    ax.set_title(f'{tarea["x"]} vs {tarea["y"]}')
+    fig.tight_layout()
+    fig.savefig(tarea["path"], dpi=tarea["dpi"])
+    plt.close(fig)
+    return tarea["path"]
+
+
+def _render_pairplot(tarea):
+    """Dibuja la matriz completa de paneles (equivalente a `sns.pairplot`) a partir de las rejillas."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import LogNorm
+
+    cols = tarea["columns"]
+    p = len(cols)
+    fig, axes = plt.subplots(p, p, figsize=(2.2 * p, 2.2 * p), squeeze=False)
+    for i, col_y in enumerate(cols):
+        for j, col_x in enumerate(cols):
+            ax = axes[i][j]
+            (x0, x1) = tarea["extents"][col_x]
+            if i == j:
+                conteos = tarea["diagonal"][col_x]
+                ax.stairs(conteos, np.linspace(x0, x1, len(conteos) + 1), fill=True)
+            else:
+                (y0, y1) = tarea["extents"][col_y]
+                grid = tarea["grids"][(col_x, col_y)] if (col_x, col_y) in tarea["grids"] else tarea["grids"][(col_y, col_x)].T
+                ax.imshow(np.ma.masked_equal(grid.T, 0), origin="lower", extent=[x0, x1, y0, y1], aspect="auto", cmap="viridis", norm=LogNorm())
+            if i == p - 1:
+                ax.set_xlabel(col_x)
+            else:
+                ax.set_xticklabels([])
+            if j == 0:
+                ax.set_ylabel(col_y)
+            else:
+                ax.set_yticklabels([])
+    fig.tight_layout()
+    fig.savefig(tarea["path"], dpi=tarea["dpi"])
+    plt.close(fig)
+    return tarea["path"]
+
+
+@contextmanager
+def _traced_peak():
+    """
+    Pico de memoria de Python/numpy del bloque (`medida["peak"]`, en bytes).
+
+    Si tracemalloc no estaba activo se arranca y se detiene al salir, antes de crear el pool (los
+    hijos de un fork heredarían el trazado). Si ya lo estaba (p. ej. `profiling.PipelineProfiler`),
+    se deja activo: solo se reinicia el pico y se descuenta la memoria ya trazada al entrar.
+    """
+    propio = not tracemalloc.is_tracing()
+    if propio:
+        tracemalloc.start()
+    else:
+        tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    medida = {"peak": 0}
+    try:
+        yield medida
+    finally:
+        medida["peak"] = max(0, tracemalloc.get_traced_memory()[1] - base)
+        if propio:
+            tracemalloc.stop()
+
+
+def _budget_report(report, inicio, pico, time_budget_s, memory_budget_mb):
+    report["total_s"] = time.perf_counter() - inicio
+    # Pico de memoria del proceso principal durante la agregación
+    report["peak_memory_mb"] = pico / 2**20
+    from profiling import max_rss_mb
+
+    # Máximo de toda la vida del proceso sobre todos los hijos ya terminados, no solo los workers
+    # de esta llamada: una cota superior de su pico (None sin el módulo `resource`)
+    report["workers_max_rss_mb"] = max_rss_mb(children=True)
+    report["time_budget_s"] = time_budget_s
+    report["memory_budget_mb"] = memory_budget_mb
+    report["within_time_budget"] = None if time_budget_s is None else report["total_s"] <= time_budget_s
+    report["within_memory_budget"] = None if memory_budget_mb is None else report["peak_memory_mb"] <= memory_budget_mb
+    with open(os.path.join(report["output_dir"], f'{report["kind"]}_report.json'), "w") as f:
+        json.dump(report, f, indent=2)
+    print(f'Gráficos guardados en {report["output_dir"]}: {report["panels"]} paneles, {report["total_s"]:.2f} s, pico de memoria {report["peak_memory_mb"]:.1f} MB')
+    for limite, dentro in (("tiempo", report["within_time_budget"]), ("memoria", report["within_memory_budget"])):
+        if dentro is False:
+            print(f"Aviso: se superó el presupuesto de {limite}.")
+    return report
+
+
+def render_pair_histograms(df, numerical_cols, ruta_salida="../data/interim/plots", bins=100, max_points=1_000_000, max_workers=None, dpi=100, time_budget_s=None, memory_budget_mb=None):
+    """
+    3.1 Análisis numérico-numérico sin pantalla: un PNG por par con su histograma 2-D.
+
+    Returns:
+        dict: Informe con tiempos, memoria y presupuestos (también se guarda como JSON).
+    """
+    inicio = time.perf_counter()
+    os.makedirs(ruta_salida, exist_ok=True)
+    numerical_cols = list(numerical_cols)
+    with _traced_peak() as memoria:
+        indices, extents, filas_usadas = aggregate_columns(df, numerical_cols, bins=bins, max_points=max_points)
+        tareas = []
+        for col_x, col_y in combinations(numerical_cols, 2):
+            tareas.append({
+                "x": col_x,
+                "y": col_y,
+                "grid": pair_grid(indices[col_x], indices[col_y], bins),
+                "extent_x": extents[col_x],
+                "extent_y": extents[col_y],
+                "path": os.path.join(ruta_salida, f"{col_x}_vs_{col_y}.png"),
+                "dpi": dpi,
+            })
+        del indices
+    pico = memoria["peak"]
+    agregado = time.perf_counter()
+    paths = []
+    if tareas:
+        with ProcessPoolExecutor(max_workers=max_workers or min(len(tareas), os.cpu_count() or 1)) as pool:
+            paths = list(pool.map(_render_pair, tareas))
+    report = {
+        "kind": "bivariate_numerical",
+        "output_dir": ruta_salida,
+        "panels": len(tareas),
+        "rows": len(df),
+        "rows_used": filas_usadas,
+        "bins": bins,
+        "aggregation_s": agregado - inicio,
+        "render_s": time.perf_counter() - agregado,
+        "files": paths,
+    }
+    return _budget_report(report, inicio, pico, time_budget_s, memory_budget_mb)
+
+
+def render_pairplot(df, numerical_cols, ruta_salida="../data/interim/plots", bins=60, max_points=1_000_000, dpi=100, time_budget_s=None, memory_budget_mb=None):
+    """4. Pairplot sin pantalla: matriz de histogramas 2-D (diagonal: histogramas 1-D) en un PNG."""
+    inicio = time.perf_counter()
+    os.makedirs(ruta_salida, exist_ok=True)
+    numerical_cols = list(numerical_cols)
+    with _traced_peak() as memoria:
+        indices, extents, filas_usadas = aggregate_columns(df, numerical_cols, bins=bins, max_points=max_points)
+        grids = {(col_x, col_y): pair_grid(indices[col_x], indices[col_y], bins) for col_x, col_y in combinations(numerical_cols, 2)}
+        diagonal = {col: np.bincount(idx[idx >= 0], minlength=bins) for col, idx in indices.items()}
+        del indices
+    pico = memoria["peak"]
+    agregado = time.perf_counter()
+    tarea = {
+        "columns": numerical_cols,
+        "grids": grids,
+        "diagonal": diagonal,
+        "extents": extents,
+        "path": os.path.join(ruta_salida, "pairplot.png"),
+        "dpi": dpi,
+    }
+    # Se dibuja en un proceso aparte para no cargar matplotlib en el proceso principal
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        path = pool.submit(_render_pairplot, tarea).result()
+    report = {
+        "kind": "pairplot",
+        "output_dir": ruta_salida,
+        "panels": len(numerical_cols) ** 2,
+        "rows": len(df),
+        "rows_used": filas_usadas,
+        "bins": bins,
+        "aggregation_s": agregado - inicio,
+        "render_s": time.perf_counter() - agregado,
+        "files": [path],
+    }
+    return _budget_report(report, inicio, pico, time_budget_s, memory_budget_mb)
@@ -0,0 +1,160 @@
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import ParameterGrid, ParameterSampler, StratifiedKFold
+from sklearn.tree import DecisionTreeClassifier
+
+# Datos compartidos por los procesos del pool (se cargan una vez por worker en el initializer)
+_FOLDS = None
+
+
+def _init_worker(folds):
+    global _FOLDS
+    _FOLDS = folds
+
+
+def prepare_folds(datasets, y_train, cv=3, random_state=77):
+    """
+    Parte cada variante en los mismos `cv` folds estratificados y los deja listos para ajustar.
+
+    Los arrays se guardan como float32 C-contiguos, el formato interno del árbol de sklearn,
+    para que ningún `fit` tenga que volver a convertirlos. El orden de entrenamiento de cada
+    fold se baraja una vez, de modo que los primeros n registros son siempre una submuestra
+    estratificada reutilizable en las rondas con menos recursos.
+    """
+    y = np.asarray(y_train).ravel()
+    splitter = StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state)
+    rng = np.random.default_rng(random_state)
+    indices = []
+    for train_idx, val_idx in splitter.split(np.zeros(len(y)), y):
+        # Barajado estratificado: se intercalan las clases para que cualquier prefijo conserve la proporción
+        orden = rng.permutation(train_idx)
+        rangos = np.empty(len(orden))
+        for clase in np.unique(y[orden]):
+            posiciones = np.flatnonzero(y[orden] == clase)
+            rangos[posiciones] = (np.arange(len(posiciones)) + 0.5) / len(posiciones)
+        indices.append((orden[np.argsort(rangos, kind="mergesort")], val_idx))
+    folds = {}
+    for nombre, X in datasets.items():
+        valores = np.ascontiguousarray(np.asarray(X, dtype=np.float32))
+        folds[nombre] = [
+            (np.ascontiguousarray(valores[train_idx]), y[train_idx], np.ascontiguousarray(valores[val_idx]), y[val_idx])
+            for train_idx, val_idx in indices
+        ]
+    return folds
+
+
+def _evaluate(tarea):
+    """Ajusta un candidato en todos los folds de su variante con `n_resources` registros por fold."""
+    nombre, params, n_resources, random_state = tarea
+    inicio = time.perf_counter()
+    scores = []
+    for X_tr, y_tr, X_val, y_val in _FOLDS[nombre]:
+        model = DecisionTreeClassifier(random_state=random_state, **params)
+        model.fit(X_tr[:n_resources], y_tr[:n_resources])
+        scores.append(accuracy_score(y_val, model.predict(X_val)))
+    return float(np.mean(scores)), float(np.std(scores)), time.perf_counter() - inicio
+
+
+def _candidates(hyperparams, n_iter, random_state):
+    if n_iter is None:
+        return list(ParameterGrid(hyperparams))
+    return list(ParameterSampler(hyperparams, n_iter=n_iter, random_state=random_state))
+
+
+def _rounds_between(minimo, n_max, factor):
+    """Veces que se puede multiplicar `minimo` por `factor` sin pasar de `n_max` (floor(log_factor(n_max / minimo)))."""
+    veces = 0
+    while minimo * factor ** (veces + 1) <= n_max:
+        veces += 1
+    return veces
+
+
+def halving_search(datasets, y_train, hyperparams, n_iter=50, cv=3, factor=3, min_resources=None, random_state=77, max_workers=None):
+    """
+    Búsqueda de hiperparámetros del árbol sobre todas las variantes a la vez con successive halving.
+
+    Cada pareja (variante, candidato) empieza con pocos registros por fold; en cada ronda
+    solo sigue el mejor 1/`factor` de las parejas y se multiplica por `factor` el número de
+    registros, hasta usar el fold completo.
+
+    Args:
+        datasets (dict): {nombre: X_train} (p. ej. las entradas de TRAIN_DATASETS).
+        y_train: Objetivo de entrenamiento.
+        hyperparams (dict): Rejilla de hiperparámetros, como en `RandomizedSearchCV`.
+        n_iter (int): Candidatos muestreados por variante (None = rejilla completa).
+        cv (int): Número de folds estratificados, compartidos por todos los candidatos.
+        factor (int): Proporción de descarte por ronda.
+        min_resources (int): Registros por fold en la primera ronda (por defecto se calcula
+            para que la última ronda use el fold completo). Nunca baja de 2 registros por clase
+            y fold, y las rondas se limitan a 1 + log_factor(n_max / min_resources), de modo
+            que cada ronda usa más registros que la anterior.
+        max_workers (int): Procesos del pool compartido (1 = en el proceso actual).
+
+    Returns:
+        dict: 'best_dataset', 'best_params', 'best_score', 'best_estimator' (reentrenado con
+        todo el train), 'results' (DataFrame con una fila por evaluación y su tiempo) y 'wall_time_s'.
+    """
+    inicio = time.perf_counter()
+    folds = prepare_folds(datasets, y_train, cv=cv, random_state=random_state)
+    n_max = min(len(fold[0]) for variante in folds.values() for fold in variante)
+    candidatos = _candidates(hyperparams, n_iter, random_state)
+    vivos = [(nombre, params) for nombre in datasets for params in candidatos]
+    n_rondas = max(1, int(math.ceil(math.log(len(vivos), factor))) + 1) if len(vivos) > 1 else 1
+    # Mínimo por ronda, como el 'smallest' de sklearn: 2 registros por clase y fold
+    n_clases = len(np.unique(np.asarray(y_train).ravel()))
+    minimo = min(n_max, max(min_resources or 0, 2 * cv * n_clases))
+    # No hay más rondas que multiplicaciones por `factor` caben entre el mínimo y el fold completo
+    n_rondas = min(n_rondas, 1 + _rounds_between(minimo, n_max, factor))
+    min_resources = max(minimo, n_max // factor ** (n_rondas - 1)) if min_resources is None else minimo
+
+    filas = []
+    pool = None
+    n_workers = max_workers or os.cpu_count() or 1
+    if max_workers != 1:
+        pool = ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker, initargs=(folds,))
+    else:
+        _init_worker(folds)
+    try:
+        ronda = 0
+        while True:
+            n_resources = n_max if ronda == n_rondas - 1 or len(vivos) <= 1 else min(n_max, min_resources * factor**ronda)
+            tareas = [(nombre, params, n_resources, random_state) for nombre, params in vivos]
+            if pool is not None:
+                chunksize = max(1, len(tareas) // (4 * n_workers))
+                resultados = list(pool.map(_evaluate, tareas, chunksize=chunksize))
+            else:
+                resultados = list(map(_evaluate, tareas))
+            for (nombre, params), (media, std, segundos) in zip(vivos, resultados):
+                filas.append({"round": ronda, "dataset": nombre, "params": params, "n_resources": n_resources, "mean_score": media, "std_score": std, "fit_time_s": segundos})
+            if n_resources >= n_max:
+                break
+            # Se conservan las mejores parejas (orden estable ante empates)
+            orden = np.argsort([-media for media, _, _ in resultados], kind="mergesort")
+            vivos = [vivos[i] for i in orden[: max(1, int(math.ceil(len(vivos) / factor)))]]
+            ronda += 1
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    results = pd.DataFrame(filas)
+    final = results[results["round"] == results["round"].max()].sort_values("mean_score", ascending=False, kind="mergesort")
+    mejor = final.iloc[0]
+    best_estimator = DecisionTreeClassifier(random_state=random_state, **mejor["params"])
+    best_estimator.fit(datasets[mejor["dataset"]], np.asarray(y_train).ravel())
+    wall_time = time.perf_counter() - inicio
+    print(f"Mejor variante: {mejor['dataset']} | accuracy CV: {mejor['mean_score']:.4f} | {len(results)} evaluaciones en {wall_time:.2f} s")
+    print("Mejores hiperparámetros:", mejor["params"])
+    return {
+        "best_dataset": mejor["dataset"],
+        "best_params": mejor["params"],
+        "best_score": float(mejor["mean_score"]),
+        "best_estimator": best_estimator,
+        "results": results,
+        "wall_time_s": wall_time,
+    }
@@ -0,0 +1,302 @@
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+from dedup import StreamingDeduplicator
+from feature_sweep import top_k_mask
+from outliers import OutlierClipper
+from streaming_eda import StreamingProfile, streaming_outlier_bounds
+
+# Scalers de normalize_data y scale_min_max_data_1: fichero -> sabor cuyo train los ajusta
+SCALERS = {
+    "normalizador_con_outliers.pkl": "con",
+    "normalizador_sin_outliers.pkl": "sin",
+    "scaler_con_outliers.pkl": "con",
+    "scaler_sin_outliers.pkl": "sin",
+}
+FLAVORS = ("con", "sin")
+ESTADO = "incremental_state.json"
+# Carpeta con los tramos de hashes de StreamingDeduplicator (solo se añaden ficheros)
+HASHES = "incremental_hashes"
+OUTLIERS = "outliers_dict.json"
+
+
+class ClassMoments:
+    """
+    Recuento, media y M2 (suma de cuadrados centrada) por clase y columna: los estadísticos
+    suficientes del F de ANOVA de `f_classif`. Se fusionan por lotes con la fórmula de Chan.
+
+    Los faltantes se ignoran columna a columna (cada columna lleva su propio recuento), así que
+    el F de cada columna es el de `f_classif` sobre las filas en las que esa columna no falta.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.classes = {}
+
+    def update(self, X, y):
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y).ravel()
+        for clase in np.unique(y):
+            filas = X[y == clase]
+            presentes = ~np.isnan(filas)
+            n_b = presentes.sum(axis=0).astype(np.float64)
+            media_b = np.divide(np.where(presentes, filas, 0.0).sum(axis=0), n_b, out=np.zeros_like(n_b), where=n_b > 0)
+            m2_b = np.where(presentes, (filas - media_b) ** 2, 0.0).sum(axis=0)
+            clave = clase.item() if hasattr(clase, "item") else clase
+            if clave not in self.classes:
+                self.classes[clave] = [n_b, media_b, m2_b]
+                continue
+            n_a, media_a, m2_a = self.classes[clave]
+            n = n_a + n_b
+            delta = media_b - media_a
+            peso_b = np.divide(n_b, n, out=np.zeros_like(n), where=n > 0)
+            self.classes[clave] = [n, media_a + delta * peso_b, m2_a + m2_b + delta**2 * n_a * peso_b]
+        return self
+
+    def f_scores(self):
+        """(F, p-valor) por columna, los mismos que `f_classif` sobre las filas acumuladas sin faltantes en la columna."""
+        from scipy import special
+
+        n_c = np.array([n for n, _, _ in self.classes.values()], dtype=np.float64)
+        medias = np.array([media for _, media, _ in self.classes.values()])
+        m2 = np.array([m2 for _, _, m2 in self.classes.values()])
+        # Por columna: filas presentes y clases con alguna fila
+        n, k = n_c.sum(axis=0), (n_c > 0).sum(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            media_total = (n_c * medias).sum(axis=0) / n
+            entre = (n_c * (medias - media_total) ** 2).sum(axis=0) / (k - 1)
+            dentro = m2.sum(axis=0) / (n - k)
+            f = entre / dentro
+        return f, special.fdtrc(k - 1, n - k, f)
+
+    def to_dict(self):
+        return {"columns": self.columns, "classes": [[clase, n.tolist(), media.tolist(), m2.tolist()] for clase, (n, media, m2) in self.classes.items()]}
+
+    @classmethod
+    def from_dict(cls, data):
+        momentos = cls(data["columns"])
+        for clase, n, media, m2 in data["classes"]:
+            momentos.classes[clase] = [np.asarray(n, dtype=np.float64), np.asarray(media, dtype=np.float64), np.asarray(m2, dtype=np.float64)]
+        return momentos
+
+
+class IncrementalState:
+    """
+    Estadísticos suficientes de los artefactos del pipeline, para actualizarlos por lotes.
+
+    - Perfil por columna (sketch KLL y mínimo): desplazamiento de los límites IQR de
+      `outliers_dict.json` y medianas de imputación (la mediana de la columna recortada es la
+      mediana recortada).
+    - Límites vigentes (`bounds`): los exactos del histórico, movidos solo lo que se mueven los
+      del sketch con cada lote.
+    - Momentos por clase de cada sabor (con/sin outliers) sobre el train: F de ANOVA.
+    - Hashes de las filas ya vistas, para descartar duplicados como `clean_duplicates`.
+
+    Los scalers guardan sus propios estadísticos (n_samples_seen_, mean_, var_, data_min_,
+    data_max_) y se actualizan con `partial_fit`.
+    """
+
+    def __init__(self, columns, numerical_cols, target_column="Outcome", k=200, test_size=0.2, random_state=42):
+        self.columns = list(columns)
+        self.numerical_cols = list(numerical_cols)
+        self.target_column = target_column
+        self.k = k
+        self.test_size = test_size
+        self.random_state = random_state
+        self.batches = 0
+        self.profile = StreamingProfile(k=k)
+        self.moments = {flavor: ClassMoments(self.numerical_cols) for flavor in FLAVORS}
+        self.dedup = StreamingDeduplicator()
+        self.bounds = {}
+
+    def clipper(self):
+        return streaming_outlier_bounds(self.profile, self.numerical_cols, self.target_column)
+
+    def medians(self, clipper):
+        """Medianas de handle_missing_values sobre los datos ya recortados."""
+        return {col: float(np.clip(self.profile.columns[col].sketch.quantile(0.5), *clipper.bounds[col])) for col in self.numerical_cols}
+
+    def flavors(self, df, clipper, medians):
+        """Features "con outliers" (tal cual) y "sin outliers" (recortadas e imputadas) de un lote."""
+        con = df[self.numerical_cols]
+        sin = clipper.transform(con, copy=True).fillna(medians)
+        return {"con": con, "sin": sin}
+
+    def split(self, df):
+        """Reparto train/test del lote, con el mismo `test_size` que feature_scaling."""
+        from sklearn.model_selection import train_test_split
+
+        if len(df) < 2:
+            return df, df.iloc[:0]
+        return train_test_split(df, test_size=self.test_size, random_state=self.random_state + self.batches)
+
+    def save(self, ruta_json):
+        """Guarda los hashes y después, de forma atómica, el JSON del estado (el que marca el lote como incorporado)."""
+        os.makedirs(ruta_json, exist_ok=True)
+        self.dedup.save(os.path.join(ruta_json, HASHES))
+        estado = {
+            "columns": self.columns,
+            "numerical_cols": self.numerical_cols,
+            "target_column": self.target_column,
+            "k": self.k,
+            "test_size": self.test_size,
+            "random_state": self.random_state,
+            "batches": self.batches,
+            "rows": self.profile.rows,
+            "sketches": {col: {"min": self.profile.columns[col].min, "count": self.profile.columns[col].count,
+                               "missing": self.profile.columns[col].missing, "sketch": self.profile.columns[col].sketch.to_dict()}
+                         for col in self.numerical_cols},
+            "moments": {flavor: momentos.to_dict() for flavor, momentos in self.moments.items()},
+            "bounds": self.bounds,
+        }
+        ruta = os.path.join(ruta_json, ESTADO)
+        with open(f"{ruta}.tmp", "w") as f:
+            json.dump(estado, f)
+        os.replace(f"{ruta}.tmp", ruta)
+
+    @classmethod
+    def load(cls, ruta_json):
+        from streaming_eda import KLLSketch, NumericAccumulator
+
+        with open(os.path.join(ruta_json, ESTADO)) as f:
+            estado = json.load(f)
+        state = cls(estado["columns"], estado["numerical_cols"], estado["target_column"], estado["k"], estado["test_size"], estado["random_state"])
+        state.batches = estado["batches"]
+        state.profile.rows = estado["rows"]
+        for col, datos in estado["sketches"].items():
+            acumulador = NumericAccumulator(k=state.k)
+            acumulador.min, acumulador.count, acumulador.missing = datos["min"], datos["count"], datos["missing"]
+            acumulador.sketch = KLLSketch.from_dict(datos["sketch"])
+            state.profile.columns[col] = acumulador
+        state.moments = {flavor: ClassMoments.from_dict(datos) for flavor, datos in estado["moments"].items()}
+        state.bounds = estado["bounds"]
+        state.dedup = StreamingDeduplicator.load(os.path.join(ruta_json, HASHES))
+        return state
+
+
+def bootstrap_state(df, ruta_json="../data/processed/Json", target_column="Outcome", k=200, test_size=0.2, random_state=42):
+    """
+    Construye el estado a partir del histórico ya limpio (el `df` de feature_scaling); se hace
+    una vez, después de una ejecución completa del pipeline, y no reescribe ningún artefacto.
+    """
+    numerical_cols = df.select_dtypes(include=['number']).columns.difference([target_column])
+    state = IncrementalState(df.columns, numerical_cols, target_column, k, test_size, random_state)
+    state.profile.update(df[state.numerical_cols])
+    state.dedup.filter(df)
+    # Límites y medianas exactos, los mismos de replace_outliers y handle_missing_values
+    clipper = OutlierClipper().fit(df, state.numerical_cols)
+    state.bounds = clipper.bounds
+    medianas = clipper.transform(df[state.numerical_cols]).median().to_dict()
+    sabores = state.flavors(df, clipper, medianas)
+    # Mismo split que feature_scaling sobre el histórico completo
+    train, _ = state.split(df)
+    for flavor, X in sabores.items():
+        state.moments[flavor].update(X.loc[train.index], train[target_column])
+    state.batches = 1
+    state.save(ruta_json)
+    return state
+
+
+def _replace_later(ruta, pendientes):
+    """Ruta temporal donde escribir `ruta`; se mueve a su sitio con `os.replace` al final del lote."""
+    temporal = f"{ruta}.tmp"
+    pendientes.append((temporal, ruta))
+    return temporal
+
+
+def _write_selections(state, ruta_json, ks, pendientes):
+    """featureselection_{variante}_k_{k}.json y el resumen, en el formato de `feature_selection_sweep`."""
+    resumen = {}
+    for flavor, momentos in state.moments.items():
+        scores, _ = momentos.f_scores()
+        columnas = pd.Index(momentos.columns)
+        ranking = list(columnas[np.argsort(np.where(np.isnan(scores), -np.inf, scores), kind="mergesort")[::-1]])
+        selecciones = {k: list(columnas[top_k_mask(scores, min(k, len(scores)))]) for k in ks}
+        # F es invariante a transformaciones afines por columna: las variantes _norm y _scal
+        # (reescaladas con su scaler) tienen las mismas puntuaciones que su sabor sin escalar
+        for sufijo in ("", "_norm", "_scal"):
+            nombre = f"X_train_{flavor}_outliers{sufijo}"
+            resumen[nombre] = {
+                "scores": {col: (None if np.isnan(v) else float(v)) for col, v in zip(columnas, scores)},
+                "ranking": ranking,
+                "selections": {str(k): cols for k, cols in selecciones.items()},
+            }
+            for k, cols in selecciones.items():
+                with open(_replace_later(os.path.join(ruta_json, f"featureselection_{nombre}_k_{k}.json"), pendientes), "w") as f:
+                    json.dump(cols + [state.target_column], f)
+    with open(_replace_later(os.path.join(ruta_json, "featureselection_sweep.json"), pendientes), "w") as f:
+        json.dump(resumen, f)
+    return resumen
+
+
+def _shifted_bounds(previos, anterior, nuevo):
+    """Límites `previos` (exactos) desplazados lo que se han movido los del sketch entre `anterior` y `nuevo`."""
+    return {col: [lo + nuevo.bounds[col][0] - anterior.bounds[col][0], hi + nuevo.bounds[col][1] - anterior.bounds[col][1]]
+            for col, (lo, hi) in previos.items()}
+
+
+def refresh_artifacts(batch, ruta_json="../data/processed/Json", ruta_modelo="../models/", ks=(7, 8, 9), dedup=True):
+    """
+    Incorpora un lote de filas nuevas a los artefactos sin recorrer el histórico.
+
+    Actualiza `outliers_dict.json`, los cuatro scalers (`partial_fit` con la parte de train del
+    lote, recortada e imputada en el sabor "sin") y las selecciones de features, y guarda el
+    nuevo estado. Los límites exactos del histórico solo se desplazan lo que se mueven los
+    estimados con el sketch, y un lote vacío (p. ej. todo duplicado) no reescribe nada. Las filas
+    históricas ya recortadas no se vuelven a recortar con los nuevos límites; el informe devuelve
+    cuánto se han movido respecto a los de `outliers_dict.json` para decidir cuándo rehacer el
+    pipeline.
+
+    Los artefactos se escriben en ficheros temporales que solo se mueven a su sitio después de
+    guardar el estado, de modo que un fallo a mitad no deja scalers con el lote aplicado y un
+    estado que no lo tiene (al reintentarlo se aplicaría dos veces).
+
+    Returns:
+        dict: Filas nuevas y duplicadas, desplazamiento de los límites y tiempo.
+    """
+    inicio = time.perf_counter()
+    state = IncrementalState.load(ruta_json)
+    batch = batch[state.columns]
+    filas = len(batch)
+    if dedup:
+        batch = state.dedup.filter(batch)
+    ruta_outliers = os.path.join(ruta_json, OUTLIERS)
+    en_disco = OutlierClipper.from_json(ruta_outliers) if os.path.exists(ruta_outliers) else OutlierClipper(state.bounds)
+    clipper = en_disco
+    train = batch.iloc[:0]
+    pendientes = []
+    if len(batch):
+        anterior = state.clipper()
+        state.profile.update(batch[state.numerical_cols])
+        clipper = OutlierClipper(_shifted_bounds({col: en_disco.bounds.get(col, anterior.bounds[col]) for col in state.numerical_cols}, anterior, state.clipper()))
+        state.bounds = clipper.bounds
+        clipper.to_json(_replace_later(ruta_outliers, pendientes))
+
+        train, _ = state.split(batch)
+        sabores = state.flavors(train, clipper, state.medians(clipper))
+        if len(train):
+            for nombre, flavor in SCALERS.items():
+                ruta = os.path.join(ruta_modelo, nombre)
+                with open(ruta, "rb") as file:
+                    scaler = pickle.load(file)
+                scaler.partial_fit(sabores[flavor])
+                with open(_replace_later(ruta, pendientes), "wb") as file:
+                    pickle.dump(scaler, file)
+            for flavor, X in sabores.items():
+                state.moments[flavor].update(X, train[state.target_column])
+        _write_selections(state, ruta_json, ks, pendientes)
+        state.batches += 1
+        state.save(ruta_json)
+        for temporal, ruta in pendientes:
+            os.replace(temporal, ruta)
+
+    desplazamiento = {col: float(np.max(np.abs(np.subtract(clipper.bounds[col], en_disco.bounds.get(col, clipper.bounds[col])))))
+                      for col in state.numerical_cols}
+    informe = {"rows": filas, "new_rows": len(batch), "duplicates": filas - len(batch), "train_rows": len(train), "bounds_shift": desplazamiento, "seconds": time.perf_counter() - inicio}
+    print(f"Lote incorporado: {len(batch)} filas nuevas ({informe['duplicates']} duplicadas) en {informe['seconds']:.3f} s")
+    return informe
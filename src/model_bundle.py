@@ -0,0 +1,395 @@
+"""
+Bundle del modelo en un único fichero versionado para workers de predicción.
+
+Contiene el árbol compilado, los parámetros de los scalers, los límites de recorte y las
+listas de columnas seleccionadas. Los arrays están alineados a 64 bytes tras una cabecera
+JSON, y los workers abren el fichero con `np.memmap` (solo lectura): todos los procesos
+comparten las mismas páginas de la caché del sistema en lugar de una copia deserializada
+cada uno, y no hace falta importar sklearn para predecir.
+
+Formato (little-endian):
+    0   MAGIC (8 bytes)
+    8   versión (uint32)
+    12  longitud de la cabecera JSON (uint32)
+    16  inicio de la sección de datos (uint64, múltiplo de ALINEACION)
+    24  cabecera JSON (utf-8), con espacios de relleno hasta el inicio de los datos
+    ... arrays, cada uno en su desplazamiento (relativo a la sección de datos) alineado
+
+Uso (desde `src/`):
+    python model_bundle.py build --scaler normalizador_sin_outliers.pkl --clip
+    python model_bundle.py bench --workers 8
+"""
+import argparse
+import glob
+import json
+import os
+import struct
+import subprocess
+import sys
+import time
+import zlib
+
+import numpy as np
+
+from outliers import OutlierClipper
+from tree_engine import CompiledTree, InferenceEngine
+
+MAGIC = b"AEDABNDL"
+FORMAT = "auto_eda_model_bundle"
+FORMAT_VERSION = 1
+ALINEACION = 64
+_PREFIJO = struct.Struct("<8sIIQ")
+# dtypes admitidos en los arrays (sin objetos: todo se puede mapear)
+DTYPES = {"<i8", "<i4", "<i2", "|i1", "<f8", "<f4", "|b1"}
+SCALER_FILES = ("normalizador_con_outliers.pkl", "normalizador_sin_outliers.pkl", "scaler_con_outliers.pkl", "scaler_sin_outliers.pkl")
+# Atributos que se guardan de cada tipo de scaler
+_ATRIBUTOS = {"standard": ("mean_", "var_", "scale_"), "minmax": ("min_", "scale_", "data_min_", "data_max_", "data_range_")}
+
+
+class BundledScaler:
+    """
+    Parámetros de un StandardScaler/MinMaxScaler leídos del bundle, con los mismos atributos
+    que usa `InferenceEngine` y un `transform` con las operaciones de sklearn.
+    """
+
+    def __init__(self, kind, feature_names, arrays, with_mean=True, with_std=True):
+        self.kind = kind
+        self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        self.n_features_in_ = len(feature_names)
+        self.with_mean = with_mean
+        self.with_std = with_std
+        for nombre in _ATRIBUTOS[kind]:
+            setattr(self, nombre, arrays.get(nombre))
+
+    def transform(self, X):
+        X = np.array(X, dtype=np.float64)
+        if self.kind == "minmax":
+            X *= self.scale_
+            X += self.min_
+            return X
+        if self.with_mean and self.mean_ is not None:
+            X -= self.mean_
+        if self.with_std and self.scale_ is not None:
+            X /= self.scale_
+        return X
+
+
+def _scaler_kind(scaler):
+    return "minmax" if hasattr(scaler, "data_range_") else "standard"
+
+
+def write_bundle(ruta, tree, feature_names, scalers=None, clipper=None, selections=None, engine=None, metadata=None):
+    """
+    Escribe el bundle en `ruta` (de forma atómica: un worker nunca ve un fichero a medias).
+
+    Args:
+        tree (CompiledTree): Árbol compilado.
+        feature_names (list): Columnas que espera el árbol, en orden.
+        scalers (dict): {nombre: StandardScaler/MinMaxScaler entrenado}.
+        clipper (OutlierClipper): Límites de `outliers_dict.json`.
+        selections (dict): {nombre: lista de columnas}, p. ej. los `featureselection_k_*.json`.
+        engine (dict): Preprocesado por defecto de `ModelBundle.engine`: {"scaler": nombre, "clip": bool}.
+    """
+    arrays = {}
+    cabecera = {"format": FORMAT, "version": FORMAT_VERSION, "feature_names": list(feature_names), "arrays": {}}
+
+    arbol = tree.to_arrays()
+    clases = arbol.pop("classes")
+    cabecera["tree"] = {"depth": int(tree.depth), "node_count": int(tree.node_count)}
+    if clases.dtype.kind in "OUS":
+        # Etiquetas de texto: en la cabecera (no se pueden mapear)
+        cabecera["tree"]["classes"] = [c.item() if isinstance(c, np.generic) else c for c in clases]
+    else:
+        arbol["classes"] = clases
+    for nombre, valores in arbol.items():
+        arrays[f"tree/{nombre}"] = valores
+
+    cabecera["scalers"] = {}
+    for nombre, scaler in (scalers or {}).items():
+        kind = _scaler_kind(scaler)
+        cabecera["scalers"][nombre] = {
+            "kind": kind,
+            "columns": [str(c) for c in getattr(scaler, "feature_names_in_", feature_names)],
+            "with_mean": bool(getattr(scaler, "with_mean", True)),
+            "with_std": bool(getattr(scaler, "with_std", True)),
+        }
+        for atributo in _ATRIBUTOS[kind]:
+            valor = getattr(scaler, atributo, None)
+            if valor is not None:
+                arrays[f"scalers/{nombre}/{atributo}"] = valor
+
+    if clipper is not None:
+        cabecera["clip"] = {"columns": list(clipper.bounds)}
+        arrays["clip/bounds"] = np.array([clipper.bounds[col] for col in clipper.bounds], dtype=np.float64).reshape(-1, 2)
+    cabecera["selections"] = {nombre: list(cols) for nombre, cols in (selections or {}).items()}
+    cabecera["engine"] = engine or {}
+    cabecera["metadata"] = metadata or {}
+
+    desplazamiento = 0
+    datos = []
+    for nombre, valores in arrays.items():
+        valores = np.ascontiguousarray(valores)
+        if valores.dtype == np.intp:
+            valores = valores.astype(np.int64)
+        if valores.dtype.str not in DTYPES:
+            raise ValueError(f"dtype no admitido en el bundle para '{nombre}': {valores.dtype}")
+        cabecera["arrays"][nombre] = {
+            "dtype": valores.dtype.str,
+            "shape": list(valores.shape),
+            "offset": desplazamiento,
+            "nbytes": valores.nbytes,
+            "crc32": zlib.crc32(valores.tobytes()),
+        }
+        datos.append((desplazamiento, valores))
+        desplazamiento += -(-valores.nbytes // ALINEACION) * ALINEACION
+
+    texto = json.dumps(cabecera).encode("utf-8")
+    inicio_datos = -(-(_PREFIJO.size + len(texto)) // ALINEACION) * ALINEACION
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, "wb") as f:
+        f.write(_PREFIJO.pack(MAGIC, FORMAT_VERSION, len(texto), inicio_datos))
+        f.write(texto.ljust(inicio_datos - _PREFIJO.size, b" "))
+        for posicion, valores in datos:
+            f.seek(inicio_datos + posicion)
+            f.write(valores.tobytes())
+        f.truncate(inicio_datos + desplazamiento)
+    os.replace(temporal, ruta)
+    return ruta
+
+
+def build_bundle(ruta_salida="../models/model_bundle.bin", ruta_modelo="../models/", model_file="Decision_tree_model.sav", scaler_files=SCALER_FILES, outliers_json="../data/processed/Json/outliers_dict.json", ruta_json="../data/processed/Json", scaler=None, clip=False):
+    """
+    Empaqueta los artefactos del pipeline (modelo, scalers, límites y selecciones de features).
+
+    Args:
+        scaler (str): Fichero del scaler con el que se entrenó el modelo (p. ej. 'normalizador_sin_outliers.pkl').
+        clip (bool): Si el modelo se entrenó con datos sin outliers (recortados).
+    """
+    import pickle
+
+    with open(os.path.join(ruta_modelo, model_file), "rb") as file:
+        model = pickle.load(file)
+    scalers = {}
+    for nombre in scaler_files:
+        ruta = os.path.join(ruta_modelo, nombre)
+        if os.path.exists(ruta):
+            with open(ruta, "rb") as file:
+                scalers[os.path.splitext(nombre)[0]] = pickle.load(file)
+    clipper = OutlierClipper.from_json(outliers_json) if outliers_json and os.path.exists(outliers_json) else None
+    selections = {}
+    for ruta in sorted(glob.glob(os.path.join(ruta_json, "featureselection_*.json"))):
+        if ruta.endswith("featureselection_sweep.json"):
+            continue
+        with open(ruta) as f:
+            selections[os.path.splitext(os.path.basename(ruta))[0]] = json.load(f)
+    feature_names = [str(c) for c in model.feature_names_in_]
+    engine = {"scaler": os.path.splitext(scaler)[0] if scaler else None, "clip": bool(clip)}
+    metadata = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "model_file": model_file,
+        "model": type(model).__name__,
+        "sklearn_version": sys.modules["sklearn"].__version__ if "sklearn" in sys.modules else None,
+        "numpy_version": np.__version__,
+    }
+    return write_bundle(ruta_salida, CompiledTree.from_estimator(model), feature_names, scalers, clipper, selections, engine, metadata)
+
+
+class ModelBundle:
+    """
+    Bundle abierto. Con `mmap=True` los arrays son vistas de solo lectura del fichero mapeado,
+    compartidas entre procesos; con `mmap=False` se leen a memoria privada.
+
+    Raises:
+        ValueError: Si el fichero no es un bundle, su versión es más nueva que la soportada o
+            la cabecera/los arrays no son coherentes.
+    """
+
+    def __init__(self, ruta, mmap=True, verify=True):
+        self.ruta = ruta
+        tamano = os.path.getsize(ruta)
+        with open(ruta, "rb") as f:
+            prefijo = f.read(_PREFIJO.size)
+            if len(prefijo) < _PREFIJO.size:
+                raise ValueError(f"{ruta} no es un bundle de modelo (fichero demasiado corto).")
+            magic, version, longitud, inicio_datos = _PREFIJO.unpack(prefijo)
+            if magic != MAGIC:
+                raise ValueError(f"{ruta} no es un bundle de modelo.")
+            if version > FORMAT_VERSION:
+                raise ValueError(f"{ruta} tiene la versión {version} del formato; esta versión solo lee hasta la {FORMAT_VERSION}.")
+            if inicio_datos % ALINEACION or inicio_datos < _PREFIJO.size + longitud or inicio_datos > tamano:
+                raise ValueError(f"Cabecera de {ruta} inválida (inicio de datos {inicio_datos}).")
+            self.header = json.loads(f.read(longitud).decode("utf-8"))
+        self.version = version
+        self._validar_cabecera(tamano - inicio_datos)
+        if mmap:
+            buffer = np.memmap(ruta, dtype=np.uint8, mode="r")
+        else:
+            buffer = np.fromfile(ruta, dtype=np.uint8)
+        self.arrays = {}
+        for nombre, info in self.header["arrays"].items():
+            inicio = inicio_datos + info["offset"]
+            valores = np.asarray(buffer[inicio:inicio + info["nbytes"]]).view(np.dtype(info["dtype"])).reshape(info["shape"])
+            if verify and zlib.crc32(valores) != info["crc32"]:
+                raise ValueError(f"El array '{nombre}' de {ruta} está dañado (crc32 distinto).")
+            self.arrays[nombre] = valores
+        self.feature_names = self.header["feature_names"]
+        self.selections = self.header["selections"]
+        self.metadata = self.header["metadata"]
+
+    def _validar_cabecera(self, tamano_datos):
+        cabecera = self.header
+        if cabecera.get("format") != FORMAT:
+            raise ValueError(f"Formato desconocido en {self.ruta}: {cabecera.get('format')!r}")
+        for clave in ("feature_names", "arrays", "tree", "scalers", "selections", "engine", "metadata"):
+            if clave not in cabecera:
+                raise ValueError(f"A la cabecera de {self.ruta} le falta '{clave}'.")
+        for nombre, info in cabecera["arrays"].items():
+            dtype = np.dtype(info["dtype"]) if info["dtype"] in DTYPES else None
+            if dtype is None:
+                raise ValueError(f"dtype no admitido en '{nombre}': {info['dtype']}")
+            if info["offset"] % ALINEACION or info["offset"] + info["nbytes"] > tamano_datos:
+                raise ValueError(f"Array '{nombre}' fuera de la sección de datos o desalineado.")
+            if int(np.prod(info["shape"], dtype=np.int64)) * dtype.itemsize != info["nbytes"]:
+                raise ValueError(f"Forma y tamaño de '{nombre}' no coinciden.")
+        faltan = [f"tree/{n}" for n in CompiledTree.ARRAYS if n != "classes" and f"tree/{n}" not in cabecera["arrays"]]
+        if faltan:
+            raise ValueError(f"Faltan arrays del árbol: {faltan}")
+
+    @classmethod
+    def open(cls, ruta="../models/model_bundle.bin", mmap=True, verify=True):
+        return cls(ruta, mmap=mmap, verify=verify)
+
+    def _grupo(self, prefijo):
+        return {nombre[len(prefijo):]: valores for nombre, valores in self.arrays.items() if nombre.startswith(prefijo)}
+
+    @property
+    def tree(self):
+        arrays = self._grupo("tree/")
+        if "classes" not in arrays:
+            arrays["classes"] = np.asarray(self.header["tree"]["classes"], dtype=object)
+        return CompiledTree.from_arrays(arrays, self.header["tree"]["depth"])
+
+    @property
+    def scalers(self):
+        return {nombre: BundledScaler(info["kind"], info["columns"], self._grupo(f"scalers/{nombre}/"), info["with_mean"], info["with_std"])
+                for nombre, info in self.header["scalers"].items()}
+
+    @property
+    def clipper(self):
+        if "clip" not in self.header:
+            return None
+        bounds = self.arrays["clip/bounds"]
+        return OutlierClipper({col: [float(lo), float(hi)] for col, (lo, hi) in zip(self.header["clip"]["columns"], bounds)})
+
+    def engine(self, scaler=None, clip=None, **kwargs):
+        """
+        `InferenceEngine` sobre el árbol mapeado. Por defecto, con el preprocesado guardado al
+        construir el bundle.
+        """
+        scaler = self.header["engine"].get("scaler") if scaler is None else scaler
+        clip = self.header["engine"].get("clip", False) if clip is None else clip
+        return InferenceEngine(self.tree, self.feature_names, clipper=self.clipper if clip else None,
+                               scaler=self.scalers[scaler] if scaler else None, **kwargs)
+
+
+def _rss_pss_mb(pid):
+    """Rss y Pss (memoria proporcional: las páginas compartidas se reparten entre los procesos) en MB."""
+    memoria = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for linea in f:
+            campo, _, valor = linea.partition(":")
+            if campo in ("Rss", "Pss"):
+                memoria[campo.lower() + "_mb"] = int(valor.split()[0]) / 1024
+    return memoria
+
+
+def _worker(modo, ruta_bundle, ruta_modelo, outliers_json, scaler, rows):
+    """Arranque de un worker de predicción: carga los artefactos, predice un lote y espera."""
+    inicio = time.perf_counter()
+    if modo == "pickle":
+        import pickle
+
+        for nombre in SCALER_FILES:
+            with open(os.path.join(ruta_modelo, nombre), "rb") as file:
+                pickle.load(file)
+        engine = InferenceEngine.from_artifacts(ruta_modelo, scaler_file=scaler, outliers_json=outliers_json)
+    else:
+        engine = ModelBundle.open(ruta_bundle).engine(scaler=os.path.splitext(scaler)[0], clip=True)
+    carga_s = time.perf_counter() - inicio
+    X = np.random.default_rng(0).normal(100, 30, (rows, len(engine.feature_names)))
+    prediccion = engine.predict(X)
+    print(json.dumps({"load_s": carga_s, "checksum": int(prediccion.astype(np.int64).sum())}), flush=True)
+    sys.stdin.readline()
+
+
+def benchmark(ruta_bundle="../models/model_bundle.bin", ruta_modelo="../models/", outliers_json="../data/processed/Json/outliers_dict.json", scaler="normalizador_sin_outliers.pkl", workers=4, rows=10_000):
+    """
+    Arranca `workers` procesos a la vez con cada forma de carga y, con todos vivos, mide su
+    tiempo de arranque (hasta tener el modelo listo y un lote predicho) y su memoria. Los dos
+    modos predicen con el mismo scaler y con recorte de outliers.
+
+    Returns:
+        dict: Por modo, mediana de arranque y de carga, Rss medio y Pss total.
+    """
+    import warnings
+
+    import pandas as pd
+
+    resultados = {}
+    for modo in ("pickle", "bundle"):
+        codigo = f"import sys, warnings; warnings.simplefilter('ignore'); sys.path.insert(0, {os.getcwd()!r}); import model_bundle; model_bundle._worker({modo!r}, {ruta_bundle!r}, {ruta_modelo!r}, {outliers_json!r}, {scaler!r}, {rows})"
+        inicio = time.perf_counter()
+        procesos = [subprocess.Popen([sys.executable, "-c", codigo], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True) for _ in range(workers)]
+        filas = []
+        for proceso in procesos:
+            salida = json.loads(proceso.stdout.readline())
+            filas.append({"startup_s": time.perf_counter() - inicio, **salida, **_rss_pss_mb(proceso.pid)})
+        for proceso in procesos:
+            proceso.communicate("\n")
+        tabla = pd.DataFrame(filas)
+        if tabla["checksum"].nunique() != 1:
+            warnings.warn(f"Los workers '{modo}' no predicen lo mismo.")
+        resultados[modo] = {
+            "workers": workers,
+            "startup_s_median": float(tabla["startup_s"].median()),
+            "load_s_median": float(tabla["load_s"].median()),
+            "rss_mb_mean": float(tabla["rss_mb"].mean()),
+            "pss_mb_total": float(tabla["pss_mb"].sum()),
+            "checksum": int(tabla["checksum"].iloc[0]),
+        }
+        print(f"{modo:<7} arranque {resultados[modo]['startup_s_median']:.3f} s, carga {resultados[modo]['load_s_median'] * 1000:.1f} ms, "
+              f"RSS medio {resultados[modo]['rss_mb_mean']:.1f} MB, PSS total ({workers} workers) {resultados[modo]['pss_mb_total']:.1f} MB")
+    if resultados["pickle"]["checksum"] != resultados["bundle"]["checksum"]:
+        warnings.warn("El bundle y los pickles dan predicciones distintas.")
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bundle del modelo para workers de predicción.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    build = sub.add_parser("build", help="Empaqueta los artefactos de models/ y Json/")
+    build.add_argument("--out", default="../models/model_bundle.bin")
+    build.add_argument("--ruta-modelo", default="../models/")
+    build.add_argument("--model-file", default="Decision_tree_model.sav")
+    build.add_argument("--ruta-json", default="../data/processed/Json")
+    build.add_argument("--scaler", default=None, help="Scaler con el que se entrenó el modelo, p. ej. normalizador_sin_outliers.pkl")
+    build.add_argument("--clip", action="store_true", help="El modelo se entrenó con datos recortados (sin outliers)")
+    bench = sub.add_parser("bench", help="Compara arranque y memoria de los workers con pickles y con el bundle")
+    bench.add_argument("--bundle", default="../models/model_bundle.bin")
+    bench.add_argument("--ruta-modelo", default="../models/")
+    bench.add_argument("--scaler", default="normalizador_sin_outliers.pkl")
+    bench.add_argument("--workers", type=int, default=4)
+    bench.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    if args.comando == "build":
+        ruta = build_bundle(args.out, args.ruta_modelo, args.model_file, ruta_json=args.ruta_json,
+                            outliers_json=os.path.join(args.ruta_json, "outliers_dict.json"), scaler=args.scaler, clip=args.clip)
+        print(f"Bundle guardado en {ruta} ({os.path.getsize(ruta)} bytes)")
+    else:
+        benchmark(args.bundle, args.ruta_modelo, scaler=args.scaler, workers=args.workers, rows=args.rows)
+
+
+if __name__ == "__main__":
+    main()
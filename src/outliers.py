@@ -0,0 +1,96 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+def compute_outlier_bounds(df, numerical_cols):
+    """
+    Calcula los límites IQR de todas las columnas con una sola llamada a `quantile`.
+
+    Usa la misma regla que `replace_outliers`: [Q1 - 1.5·IQR, Q3 + 1.5·IQR] y, si el
+    límite inferior es negativo, se sustituye por el mínimo de la columna.
+
+    Returns:
+        dict: {columna: [límite_inferior, límite_superior]} en el orden de `numerical_cols`.
+    """
+    numerical_cols = list(numerical_cols)
+    cuartiles = df[numerical_cols].quantile([0.25, 0.75]).to_numpy(dtype=np.float64)
+    q1, q3 = cuartiles[0], cuartiles[1]
+    iqr = q3 - q1
+    lower = q1 - 1.5 * iqr
+    upper = q3 + 1.5 * iqr
+    negativos = lower < 0
+    if negativos.any():
+        minimos = df[numerical_cols].min().to_numpy(dtype=np.float64)
+        lower = np.where(negativos, minimos, lower)
+    return {col: [float(lo), float(hi)] for col, lo, hi in zip(numerical_cols, lower, upper)}
+
+
+class OutlierClipper:
+    """
+    Recorta valores a los límites IQR guardados, para aplicarlos igual en inferencia.
+
+    Args:
+        bounds (dict): {columna: [límite_inferior, límite_superior]}, el formato de `outliers_dict.json`.
+    """
+
+    def __init__(self, bounds=None):
+        self.bounds = {}
+        if bounds is not None:
+            self._set_bounds(bounds)
+
+    def _set_bounds(self, bounds):
+        self.bounds = {col: [float(lo), float(hi)] for col, (lo, hi) in bounds.items()}
+        self.columns_ = list(self.bounds)
+        self.lower_ = np.array([lo for lo, _ in self.bounds.values()], dtype=np.float64)
+        self.upper_ = np.array([hi for _, hi in self.bounds.values()], dtype=np.float64)
+
+    def fit(self, df, numerical_cols):
+        self._set_bounds(compute_outlier_bounds(df, numerical_cols))
+        return self
+
+    def clip_array(self, X, out=None):
+        """Recorta un array 2-D (columnas en el orden de `columns_`) en una sola operación NumPy."""
+        return np.clip(X, self.lower_, self.upper_, out=out)
+
+    def transform(self, X, copy=True):
+        """
+        Aplica los límites a un DataFrame (por nombre de columna) o a un array con las columnas en orden.
+
+        Con `copy=False` los DataFrames se modifican en su sitio. Solo se reescriben las columnas
+        con algún valor recortado; una columna entera conserva su dtype si no se recorta nada o
+        si los límites que se le aplican son enteros.
+        """
+        if not isinstance(X, pd.DataFrame):
+            X = np.asarray(X, dtype=np.float64)
+            return self.clip_array(X, out=None if copy else X)
+        df = X.copy() if copy else X
+        valores = df[self.columns_].to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+        recortadas = ((valores < self.lower_) | (valores > self.upper_)).any(axis=0)
+        if not recortadas.any():
+            return df
+        self.clip_array(valores, out=valores)
+        for j in np.flatnonzero(recortadas):
+            col = self.columns_[j]
+            columna = valores[:, j]
+            presentes = columna[~np.isnan(columna)]
+            if pd.api.types.is_integer_dtype(df[col].dtype) and np.array_equal(presentes, np.round(presentes)):
+                df[col] = pd.Series(columna, index=df.index).astype(df[col].dtype)
+            else:
+                df[col] = columna
+        return df
+
+    def fit_transform(self, df, numerical_cols, copy=True):
+        return self.fit(df, numerical_cols).transform(df, copy=copy)
+
+    def to_json(self, ruta_json):
+        os.makedirs(os.path.dirname(ruta_json), exist_ok=True) # Crea el directorio si no existe
+        with open(ruta_json, "w") as f:
+            json.dump(self.bounds, f)
+
+    @classmethod
+    def from_json(cls, ruta_json):
+        with open(ruta_json) as f:
+            return cls(json.load(f))
@@ -0,0 +1,331 @@
+import ast
+import copy
+import glob
+import hashlib
+import inspect
+import os
+import pickle
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+
+def hash_data(obj):
+    """Hash estable del contenido de un dato (DataFrame, Series, array, tupla/lista/dict o cualquier objeto picklable)."""
+    h = hashlib.sha256()
+    if isinstance(obj, pd.DataFrame):
+        h.update(b"DataFrame")
+        h.update(repr(list(obj.columns)).encode())
+        h.update(repr([str(dtype) for dtype in obj.dtypes]).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, pd.Series):
+        h.update(b"Series")
+        h.update(repr((obj.name, str(obj.dtype))).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, pd.Index):
+        h.update(b"Index")
+        h.update(pickle.dumps(list(obj)))
+    elif isinstance(obj, np.ndarray):
+        h.update(b"ndarray")
+        h.update(repr((obj.dtype.str, obj.shape)).encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, (tuple, list)):
+        h.update(type(obj).__name__.encode())
+        for item in obj:
+            h.update(hash_data(item).encode())
+    elif isinstance(obj, dict):
+        h.update(b"dict")
+        for clave in sorted(obj, key=repr):
+            h.update(repr(clave).encode())
+            h.update(hash_data(obj[clave]).encode())
+    else:
+        h.update(pickle.dumps(obj))
+    return h.hexdigest()
+
+
+def _project_modules(ruta):
+    """
+    Ficheros .py del proyecto de los que depende `ruta`: él mismo y, recursivamente, los módulos
+    que importa (también dentro de funciones) y que están en su misma carpeta.
+    """
+    carpeta = os.path.dirname(ruta)
+    vistos, pendientes = set(), [ruta]
+    while pendientes:
+        actual = pendientes.pop()
+        if actual in vistos:
+            continue
+        vistos.add(actual)
+        with open(actual, encoding="utf-8") as f:
+            arbol = ast.parse(f.read())
+        for nodo in ast.walk(arbol):
+            if isinstance(nodo, ast.Import):
+                nombres = [alias.name for alias in nodo.names]
+            elif isinstance(nodo, ast.ImportFrom) and nodo.module and not nodo.level:
+                nombres = [nodo.module]
+            else:
+                continue
+            for nombre in nombres:
+                candidato = os.path.join(carpeta, nombre.split(".")[0] + ".py")
+                if os.path.exists(candidato):
+                    pendientes.append(candidato)
+    return sorted(vistos)
+
+
+def code_version(func):
+    """
+    Hash del código de la etapa: el fuente de su módulo y de los módulos del proyecto que este
+    importa (si cambia un auxiliar, p. ej. outliers.py, la etapa también se recalcula).
+    """
+    try:
+        ruta = inspect.getsourcefile(func)
+    except TypeError:
+        ruta = None
+    if ruta is None or not os.path.exists(ruta):
+        return hashlib.sha256(f"{func.__module__}.{func.__qualname__}".encode()).hexdigest()
+    h = hashlib.sha256(f"{func.__module__}.{func.__qualname__}".encode())
+    for modulo in _project_modules(os.path.abspath(ruta)):
+        h.update(os.path.basename(modulo).encode())
+        with open(modulo, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def file_digest(ruta):
+    """Hash del contenido de un fichero o, si es un directorio (p. ej. un split .npy.d), de todos sus ficheros."""
+    h = hashlib.blake2b(digest_size=16)
+    if os.path.isdir(ruta):
+        for raiz, carpetas, ficheros in os.walk(ruta):
+            carpetas.sort()
+            for nombre in sorted(ficheros):
+                completo = os.path.join(raiz, nombre)
+                h.update(os.path.relpath(completo, ruta).encode())
+                h.update(bytes.fromhex(file_digest(completo)))
+        return h.hexdigest()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def _defensive_copy(obj):
+    """Las etapas de Auto_EDA modifican sus entradas en el sitio; se les pasa una copia."""
+    if isinstance(obj, (pd.DataFrame, pd.Series, np.ndarray)):
+        return obj.copy()
+    if isinstance(obj, (tuple, list, dict)):
+        return copy.deepcopy(obj)
+    return obj
+
+
+class Stage:
+    """
+    Nodo del pipeline.
+
+    Args:
+        name (str): Nombre único de la etapa.
+        func (callable): Función a ejecutar.
+        inputs (list): Referencias a otras etapas o fuentes: "nombre" usa su salida completa
+            y ("nombre", i) el elemento i de una salida en tupla.
+        params (dict): Argumentos con nombre fijos de la función (forman parte de la clave).
+        version (str): Versión manual para invalidar la caché cuando cambia algo que la clave
+            no ve (el código de fuera del proyecto, p. ej. una librería instalada).
+        outputs (list): Patrones glob de los ficheros que escribe la etapa. Los que existen al
+            terminar se guardan con el hash de su contenido en su entrada de caché, que deja de
+            valer si alguno falta o ha cambiado.
+    """
+
+    def __init__(self, name, func, inputs=(), params=None, version="", outputs=()):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.params = params or {}
+        self.version = version
+        self.outputs = list(outputs)
+
+    @property
+    def dependencies(self):
+        return [ref[0] if isinstance(ref, tuple) else ref for ref in self.inputs]
+
+
+class Pipeline:
+    """
+    DAG de etapas con caché en disco indexada por contenido.
+
+    La clave de cada etapa es el hash de: su código, sus parámetros y las claves de sus
+    entradas (para las fuentes, el hash de los datos). Si la clave ya está en la caché y los
+    ficheros que la etapa escribió siguen existiendo con el mismo contenido (otra ejecución con
+    otros datos puede haberlos sobrescrito) se carga el resultado sin ejecutarla;
+    las etapas cuyas dependencias ya están resueltas se ejecutan en paralelo con hilos.
+    """
+
+    def __init__(self, stages, ruta_cache="../data/interim/pipeline_cache", max_workers=4):
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Hay etapas con nombre repetido.")
+        self.ruta_cache = ruta_cache
+        self.max_workers = max_workers
+
+    def _resolve(self, ref, resultados):
+        if isinstance(ref, tuple):
+            nombre, indice = ref
+            return resultados[nombre][indice]
+        return resultados[ref]
+
+    def _key(self, stage, claves):
+        h = hashlib.sha256()
+        h.update(stage.name.encode())
+        h.update(code_version(stage.func).encode())
+        h.update(stage.version.encode())
+        h.update(hash_data(stage.params).encode())
+        for ref in stage.inputs:
+            h.update(repr(ref).encode())
+            h.update(claves[ref[0] if isinstance(ref, tuple) else ref].encode())
+        return h.hexdigest()[:32]
+
+    def _cache_path(self, stage, key):
+        return os.path.join(self.ruta_cache, f"{stage.name}-{key}.pkl")
+
+    def _load_cached(self, path):
+        """Entrada de caché en `path`, o None si no existe o alguno de sus ficheros falta o ha cambiado."""
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as file:
+            entrada = pickle.load(file)
+        for fichero, digest in entrada["files"].items():
+            if not os.path.exists(fichero) or file_digest(fichero) != digest:
+                return None
+        return entrada
+
+    def _execute(self, stage, key, resultados, use_cache, profiler=None):
+        path = self._cache_path(stage, key)
+        entrada = self._load_cached(path) if use_cache else None
+        if entrada is not None:
+            return entrada["output"], "cache", 0.0
+        argumentos = [_defensive_copy(self._resolve(ref, resultados)) for ref in stage.inputs]
+        inicio = time.perf_counter()
+        if profiler is not None:
+            with profiler.stage(stage.name, argumentos[0] if argumentos else None) as frame:
+                salida = stage.func(*argumentos, **stage.params)
+                frame["output"] = salida
+        else:
+            salida = stage.func(*argumentos, **stage.params)
+        segundos = time.perf_counter() - inicio
+        rutas = sorted({os.path.abspath(fichero) for patron in stage.outputs for fichero in glob.glob(patron)})
+        ficheros = {ruta: file_digest(ruta) for ruta in rutas}
+        os.makedirs(self.ruta_cache, exist_ok=True)
+        temporal = f"{path}.{os.getpid()}.tmp"
+        with open(temporal, "wb") as file:
+            pickle.dump({"output": salida, "files": ficheros}, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, path)
+        return salida, "run", segundos
+
+    def run(self, sources, targets=None, use_cache=True, profiler=None):
+        """
+        Ejecuta el DAG.
+
+        Args:
+            sources (dict): {nombre: dato} de las entradas externas (p. ej. {"raw": df}).
+            targets (list): Etapas a obtener (por defecto todas); solo se ejecutan sus ancestros.
+            use_cache (bool): Si es False se recalculan todas las etapas (y se actualiza la caché).
+            profiler (profiling.Profiler): Si se indica, mide las etapas que se ejecutan (no las leídas de caché).
+
+        Returns:
+            tuple: ({etapa: salida}, informe) donde el informe lista estado y tiempo por etapa.
+        """
+        necesarias = self._ancestors(targets or list(self.stages), sources)
+        resultados = dict(sources)
+        claves = {nombre: hash_data(dato) for nombre, dato in sources.items()}
+        pendientes = {nombre: set(self.stages[nombre].dependencies) - set(sources) for nombre in necesarias}
+        informe = []
+        en_curso = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pendientes or en_curso:
+                for nombre in [n for n, deps in pendientes.items() if not deps]:
+                    stage = self.stages[nombre]
+                    claves[nombre] = self._key(stage, claves)
+                    en_curso[pool.submit(self._execute, stage, claves[nombre], resultados, use_cache, profiler)] = nombre
+                    del pendientes[nombre]
+                if not en_curso:
+                    raise ValueError(f"Dependencias cíclicas o sin resolver: {sorted(pendientes)}")
+                hechos, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+                for futuro in hechos:
+                    nombre = en_curso.pop(futuro)
+                    salida, estado, segundos = futuro.result()
+                    resultados[nombre] = salida
+                    informe.append({"stage": nombre, "status": estado, "seconds": segundos, "key": claves[nombre]})
+                    print(f"[{estado}] {nombre} ({segundos:.2f} s)")
+                    for deps in pendientes.values():
+                        deps.discard(nombre)
+        return {nombre: resultados[nombre] for nombre in necesarias}, informe
+
+    def _ancestors(self, targets, sources):
+        necesarias, pila = [], list(targets)
+        while pila:
+            nombre = pila.pop()
+            if nombre in sources or nombre in necesarias:
+                continue
+            if nombre not in self.stages:
+                raise KeyError(f"Etapa o fuente desconocida: {nombre}")
+            necesarias.append(nombre)
+            pila.extend(self.stages[nombre].dependencies)
+        return necesarias
+
+
+def _numerical_cols(df, target_column="Outcome"):
+    return df.select_dtypes(include=['number']).columns.difference([target_column])
+
+
+def _sweep(scaling, norm, scal, ks=(7, 8, 9), target_column="Outcome", ruta_json="../data/processed/Json", ruta_modelo="../models/", formato="parquet"):
+    """Adapta las salidas en tupla de las etapas de escalado a `feature_selection_sweep`."""
+    from feature_sweep import feature_selection_sweep
+
+    X_train_con, X_test_con, X_train_sin, X_test_sin, y_train, y_test, _ = scaling
+    nombres = ["con_outliers", "sin_outliers"]
+    train = {f"X_train_{n}": X for n, X in zip(nombres, (X_train_con, X_train_sin))}
+    test = {f"X_train_{n}": X for n, X in zip(nombres, (X_test_con, X_test_sin))}
+    for sufijo, (tr_con, te_con, tr_sin, te_sin) in (("norm", norm), ("scal", scal)):
+        train[f"X_train_con_outliers_{sufijo}"], test[f"X_train_con_outliers_{sufijo}"] = tr_con, te_con
+        train[f"X_train_sin_outliers_{sufijo}"], test[f"X_train_sin_outliers_{sufijo}"] = tr_sin, te_sin
+    return feature_selection_sweep(train, y_train, ks=ks, test_datasets=test, y_test=y_test, target_column=target_column, ruta_json=ruta_json, ruta_modelo=ruta_modelo, formato=formato)
+
+
+def build_auto_eda_pipeline(ruta_guardado="../data/processed/", ruta_modelo="../models/", ruta_json="../data/processed/Json", ruta_cache="../data/interim/pipeline_cache", ks=(7, 8, 9), formato="parquet", max_workers=4, target_column=None, columns_to_drop=None, inferencia=None):
+    """
+    Declara las etapas de `Auto_EDA` como DAG, desde la fuente "raw" hasta la selección de features.
+
+    Ramas: "con outliers" es el DataFrame limpio; "sin outliers" pasa por replace_outliers,
+    handle_missing_values e infer_new_features. Las dos ramas no se solapan (la de "con
+    outliers" no tiene etapas propias y feature_scaling necesita ambas); las únicas etapas que
+    se ejecutan a la vez son normalize_data y scale_min_max_data_1. `target_column`,
+    `columns_to_drop` e `inferencia` se pasan a las etapas como parámetros (por defecto, los
+    globales de `Auto_EDA`).
+    """
+    import Auto_EDA
+
+    target = Auto_EDA._default(target_column, "target_column")
+    config = {
+        "columns_to_drop": list(Auto_EDA._default(columns_to_drop, "columns_to_drop")),
+        "inferencia": list(Auto_EDA._default(inferencia, "inferencia")),
+    }
+    escalado = [("feature_scaling", i) for i in range(4)] + [("feature_scaling", 6)]
+    salida = {"ruta_guardado": ruta_guardado, "formato": formato}
+    stages = [
+        Stage("clean_duplicates", Auto_EDA.clean_duplicates, ["raw"]),
+        Stage("clean_irrelevant_data", Auto_EDA.clean_irrelevant_data, ["clean_duplicates"], params={"columns_to_drop": config["columns_to_drop"]}),
+        Stage("numerical_cols", _numerical_cols, ["clean_irrelevant_data"], params={"target_column": target}),
+        Stage("replace_outliers", Auto_EDA.replace_outliers, ["clean_irrelevant_data", "numerical_cols"], params={"ruta_json": ruta_json},
+              outputs=[os.path.join(ruta_json, "outliers_dict.json")]),
+        Stage("handle_missing_values", Auto_EDA.handle_missing_values, ["replace_outliers"], params={"target_column": target}),
+        Stage("infer_new_features", Auto_EDA.infer_new_features, ["handle_missing_values"], params={"target_column": target, "inferencia": config["inferencia"]}),
+        Stage("feature_scaling", Auto_EDA.feature_scaling, ["clean_irrelevant_data", "infer_new_features"], params={**salida, "target_column": target},
+              outputs=[os.path.join(ruta_guardado, patron) for patron in ("X_*_outliers.*", "y_train.*", "y_test.*")]),
+        Stage("normalize_data", Auto_EDA.normalize_data, escalado, params={**salida, "ruta_modelo": ruta_modelo},
+              outputs=[os.path.join(ruta_guardado, "X_*_outliers_norm.*"), os.path.join(ruta_modelo, "normalizador_*_outliers.pkl")]),
+        Stage("scale_min_max_data_1", Auto_EDA.scale_min_max_data_1, escalado, params={**salida, "ruta_modelo": ruta_modelo},
+              outputs=[os.path.join(ruta_guardado, "X_*_outliers_scal.*"), os.path.join(ruta_modelo, "scaler_*_outliers.pkl")]),
+        Stage("feature_selection", _sweep, ["feature_scaling", "normalize_data", "scale_min_max_data_1"],
+              params={"ks": tuple(ks), "target_column": target, "ruta_json": ruta_json, "ruta_modelo": ruta_modelo, "formato": formato},
+              outputs=[os.path.join(ruta_json, "featureselection_*.json"), os.path.join(ruta_modelo, "x_*_sel_*")]),
+    ]
+    return Pipeline(stages, ruta_cache=ruta_cache, max_workers=max_workers)
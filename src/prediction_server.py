@@ -0,0 +1,279 @@
+"""
+Servidor HTTP local de predicción para el árbol de decisión de diabetes.
+
+Carga el modelo y su preprocesado una sola vez y agrupa las peticiones concurrentes de
+una fila en micro-lotes que se predicen de una vez con `InferenceEngine`.
+
+Uso (desde `src/`):
+    python prediction_server.py --port 8000 --max-batch-size 64 --max-wait-ms 2
+
+Endpoints:
+    POST /predict  {"features": {"Glucose": 120, ...}}  ->  {"prediction": 1, "probability": [...]}
+    GET  /metrics  Histogramas de latencia por petición y de tamaño de lote.
+    GET  /health
+"""
+import argparse
+import asyncio
+import json
+import time
+from bisect import bisect_left
+
+import numpy as np
+
+from tree_engine import InferenceEngine
+
+# Límites (ms) de los buckets de latencia; el último bucket recoge todo lo que los supera
+LATENCY_BUCKETS_MS = [0.25, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000]
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class Histogram:
+    """Histograma acumulativo con buckets fijos (límite superior inclusivo)."""
+
+    def __init__(self, buckets):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q):
+        """Aproxima un cuantil con el límite superior del bucket que lo contiene."""
+        if not self.count:
+            return None
+        objetivo = q * self.count
+        acumulado = 0
+        for limite, n in zip(self.buckets + [float("inf")], self.counts):
+            acumulado += n
+            if acumulado >= objetivo:
+                return limite
+        return float("inf")
+
+    def to_dict(self):
+        etiquetas = [str(limite) for limite in self.buckets] + ["+Inf"]
+        return {
+            "buckets": dict(zip(etiquetas, self.counts)),
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+        }
+
+
+class MicroBatcher:
+    """
+    Agrupa filas individuales en lotes de como máximo `max_batch_size` filas.
+
+    Un lote se cierra cuando se llena o cuando han pasado `max_wait_ms` desde que llegó
+    su primera fila; la predicción se hace fuera del event loop para no bloquear la recepción.
+    """
+
+    def __init__(self, engine, max_batch_size=64, max_wait_ms=2.0):
+        self.engine = engine
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = asyncio.Queue()
+        self.batch_sizes = Histogram(range(1, max_batch_size + 1))
+        self._worker = None
+
+    def start(self):
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, row):
+        """Encola una fila (ya ordenada como `engine.feature_names`) y espera su predicción."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((row, future))
+        return await future
+
+    async def _collect(self):
+        lote = [await self.queue.get()]
+        limite = asyncio.get_running_loop().time() + self.max_wait
+        while len(lote) < self.max_batch_size:
+            # Primero lo que ya está en cola, sin esperar
+            while len(lote) < self.max_batch_size and not self.queue.empty():
+                lote.append(self.queue.get_nowait())
+            restante = limite - asyncio.get_running_loop().time()
+            if len(lote) >= self.max_batch_size or restante <= 0:
+                break
+            try:
+                lote.append(await asyncio.wait_for(self.queue.get(), restante))
+            except asyncio.TimeoutError:
+                break
+        return lote
+
+    def _predict(self, X):
+        # Un solo recorrido del árbol: la clase es la de mayor probabilidad, la misma que da `predict`
+        proba = self.engine.predict_proba(X)
+        return self.engine.tree.classes[np.argmax(proba, axis=1)], proba
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            lote = await self._collect()
+            self.batch_sizes.observe(len(lote))
+            X = np.array([row for row, _ in lote], dtype=np.float64)
+            try:
+                pred, proba = await loop.run_in_executor(None, self._predict, X)
+            except Exception as e:
+                for _, future in lote:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for i, (_, future) in enumerate(lote):
+                if not future.done():
+                    future.set_result((pred[i].item(), proba[i].tolist()))
+
+
+class PredictionServer:
+    """Servidor HTTP/1.1 mínimo (keep-alive) sobre asyncio, sin dependencias externas."""
+
+    def __init__(self, engine, max_batch_size=64, max_wait_ms=2.0):
+        self.engine = engine
+        self.batcher = MicroBatcher(engine, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        self.latency = Histogram(LATENCY_BUCKETS_MS)
+        self.errors = 0
+
+    def parse_row(self, payload):
+        features = payload.get("features") if isinstance(payload, dict) else None
+        if not isinstance(features, dict):
+            raise ValueError('Se esperaba {"features": {columna: valor, ...}}')
+        faltantes = [col for col in self.engine.feature_names if col not in features]
+        if faltantes:
+            raise ValueError(f"Faltan columnas: {faltantes}")
+        return [float(features[col]) for col in self.engine.feature_names]
+
+    def metrics(self):
+        return {
+            "latency_ms": self.latency.to_dict(),
+            "batch_size": self.batcher.batch_sizes.to_dict(),
+            "errors": self.errors,
+            "max_batch_size": self.batcher.max_batch_size,
+            "max_wait_ms": self.batcher.max_wait * 1000,
+        }
+
+    async def route(self, method, path, body):
+        if path == "/predict":
+            if method != "POST":
+                return 405, {"error": "Use POST"}
+            inicio = time.perf_counter()
+            try:
+                row = self.parse_row(json.loads(body or b"null"))
+            except (ValueError, TypeError) as e:
+                return 400, {"error": str(e)}
+            prediction, probability = await self.batcher.submit(row)
+            self.latency.observe((time.perf_counter() - inicio) * 1000)
+            return 200, {"prediction": prediction, "probability": probability}
+        if path == "/metrics" and method == "GET":
+            return 200, self.metrics()
+        if path == "/health" and method == "GET":
+            return 200, {"status": "ok", "features": self.engine.feature_names}
+        return 404, {"error": f"Ruta no encontrada: {path}"}
+
+    @staticmethod
+    async def _respond(writer, status, respuesta, keep_alive):
+        data = json.dumps(respuesta).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data
+        )
+        await writer.drain()
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                linea = await reader.readline()
+                if not linea:
+                    break
+                partes = linea.decode("latin-1").split()
+                headers = {}
+                while True:
+                    cabecera = await reader.readline()
+                    if cabecera in (b"\r\n", b"\n", b""):
+                        break
+                    nombre, _, valor = cabecera.decode("latin-1").partition(":")
+                    headers[nombre.strip().lower()] = valor.strip()
+                try:
+                    method, path, version = partes
+                    longitud = int(headers.get("content-length", 0))
+                    if longitud < 0:
+                        raise ValueError(longitud)
+                except ValueError:
+                    # Sin línea de petición o longitud válidas no se sabe dónde acaba el cuerpo: se responde y se cierra
+                    await self._respond(writer, 400, {"error": f"Petición mal formada (Content-Length: {headers.get('content-length')!r})"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(longitud)
+                try:
+                    status, respuesta = await self.route(method, path, body)
+                except Exception as e:
+                    self.errors += 1
+                    status, respuesta = 500, {"error": str(e)}
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                await self._respond(writer, status, respuesta, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8000):
+        self.batcher.start()
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Servidor de predicción escuchando en http://{host}:{port} (columnas: {self.engine.feature_names})")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local de predicción con micro-lotes.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--ruta-modelo", default="../models/")
+    parser.add_argument("--model-file", default="Decision_tree_model.sav")
+    parser.add_argument("--scaler-file", default=None, help="p. ej. scaler_sin_outliers.pkl")
+    parser.add_argument("--outliers-json", default=None, help="p. ej. ../data/processed/Json/outliers_dict.json")
+    parser.add_argument("--features-json", default=None, help="p. ej. ../data/processed/Json/featureselection_k_8.json")
+    parser.add_argument("--bundle", default=None, help="Bundle de model_bundle.py (p. ej. ../models/model_bundle.bin); sustituye a los pickles")
+    args = parser.parse_args()
+
+    if args.bundle:
+        from model_bundle import ModelBundle
+
+        engine = ModelBundle.open(args.bundle).engine()
+    else:
+        engine = InferenceEngine.from_artifacts(
+            ruta_modelo=args.ruta_modelo,
+            model_file=args.model_file,
+            scaler_file=args.scaler_file,
+            outliers_json=args.outliers_json,
+            features_json=args.features_json,
+        )
+    server = PredictionServer(engine, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
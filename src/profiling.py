@@ -0,0 +1,250 @@
+import csv
+import functools
+import inspect
+import json
+import os
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+CAMPOS = ["stage", "parent", "depth", "wall_s", "cpu_s", "peak_traced_mb", "rss_start_mb", "rss_end_mb", "rss_peak_mb", "rows_in", "cols_in", "rows_out", "cols_out", "memory_partial", "error"]
+
+
+def max_rss_mb(children=False):
+    """
+    Pico de RSS de toda la vida del proceso (o de sus hijos ya terminados, con `children`) en MB
+    según `resource.getrusage`; None donde no existe el módulo `resource` (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    uso = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # ru_maxrss está en bytes en macOS y en KiB en Linux y los demás Unix
+    return uso.ru_maxrss / 2**20 if sys.platform == "darwin" else uso.ru_maxrss / 1024
+
+
+def _rss_mb():
+    """RSS actual del proceso en MB (fuera de Linux, el pico del proceso; None si no se puede medir)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return max_rss_mb()
+
+
+def _rss_peak_mb():
+    """Pico de RSS (VmHWM) desde el último reinicio; fuera de Linux, el pico de toda la vida del proceso."""
+    try:
+        with open("/proc/self/status") as f:
+            for linea in f:
+                if linea.startswith("VmHWM:"):
+                    return int(linea.split()[1]) / 1024
+    except (OSError, ValueError):
+        pass
+    return max_rss_mb()
+
+
+def _reset_rss_peak():
+    """Reinicia VmHWM (Linux >= 4.0); si no se puede, el pico de RSS es el del proceso."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _shape(obj):
+    """(filas, columnas) de un DataFrame/Series/array, o del primero que haya en una tupla o lista."""
+    if isinstance(obj, (tuple, list)):
+        for item in obj:
+            forma = _shape(item)
+            if forma != (None, None):
+                return forma
+        return None, None
+    if isinstance(obj, (pd.DataFrame, np.ndarray)) and obj.ndim == 2:
+        return int(obj.shape[0]), int(obj.shape[1])
+    if isinstance(obj, (pd.Series, np.ndarray)):
+        return int(obj.shape[0]), 1
+    return None, None
+
+
+def environment():
+    """Versiones y máquina, para poder comparar informes entre ejecuciones."""
+    import sklearn
+
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "sklearn": sklearn.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+class Profiler:
+    """
+    Mide cada etapa del pipeline: tiempo real, tiempo de CPU, pico de memoria (tracemalloc y
+    RSS) y filas/columnas de entrada y salida.
+
+    Las etapas pueden anidarse; los picos se acumulan en todas las etapas abiertas. Si varias
+    etapas corren a la vez en hilos (Pipeline), el CPU y la memoria son los del proceso.
+
+    Args:
+        trace_memory (bool): Usa tracemalloc (pico de memoria de Python/numpy por etapa, con
+            sobrecoste); con False solo se mide el RSS.
+        reset_rss_peak (bool): Reinicia el pico de RSS del proceso (escribe en
+            /proc/self/clear_refs) al abrir y cerrar cada etapa, para que `rss_peak_mb` sea el de
+            la etapa. Afecta a todo el proceso, así que solo conviene en procesos dedicados (como
+            el benchmark); sin él, `rss_peak_mb` es el pico del proceso hasta el final de la etapa.
+    """
+
+    def __init__(self, trace_memory=True, reset_rss_peak=False):
+        self.trace_memory = trace_memory
+        self.reset_rss_peak = reset_rss_peak
+        self.records = []
+        self._abiertas = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._propio = False
+
+    def _acumular_picos(self):
+        """Lleva los picos actuales a todas las etapas abiertas y reinicia los contadores."""
+        trazado = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+        rss = _rss_peak_mb()
+        for frame in self._abiertas:
+            if trazado is not None:
+                frame["_peak_traced"] = max(frame["_peak_traced"], trazado)
+            if rss is not None:
+                frame["rss_peak_mb"] = max(frame["rss_peak_mb"], rss)
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        if self.reset_rss_peak:
+            _reset_rss_peak()
+
+    @contextmanager
+    def stage(self, name, data=None):
+        """
+        Mide el bloque como una etapa. Para registrar la forma de la salida, asignar
+        `frame["output"] = resultado` dentro del bloque.
+        """
+        pila = self._local.__dict__.setdefault("pila", [])
+        with self._lock:
+            if self.trace_memory and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._propio = True
+            self._acumular_picos()
+            rows_in, cols_in = _shape(data)
+            frame = {
+                "stage": name,
+                "parent": pila[-1]["stage"] if pila else None,
+                "depth": len(pila),
+                "rows_in": rows_in,
+                "cols_in": cols_in,
+                "rss_start_mb": _rss_mb(),
+                "rss_peak_mb": 0.0,
+                "memory_partial": False,
+                "error": None,
+                "_traced_start": tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None,
+                "_peak_traced": 0,
+            }
+            self._abiertas.append(frame)
+        pila.append(frame)
+        inicio, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield frame
+        except BaseException as e:
+            frame["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            frame["wall_s"] = time.perf_counter() - inicio
+            frame["cpu_s"] = time.process_time() - cpu
+            pila.pop()
+            with self._lock:
+                # Etapas que paran tracemalloc por su cuenta (el pico trazado solo cubre hasta ese momento)
+                if frame["_traced_start"] is not None and not tracemalloc.is_tracing():
+                    frame["memory_partial"] = True
+                self._acumular_picos()
+                self._abiertas.remove(frame)
+                inicio_trazado = frame.pop("_traced_start")
+                pico = frame.pop("_peak_traced")
+                frame["peak_traced_mb"] = None if inicio_trazado is None else max(0, pico - inicio_trazado) / 2**20
+                frame["rss_end_mb"] = _rss_mb()
+                frame["rows_out"], frame["cols_out"] = _shape(frame.pop("output", None))
+                self.records.append(frame)
+                if self._propio:
+                    if not self._abiertas:
+                        if tracemalloc.is_tracing():
+                            tracemalloc.stop()
+                        self._propio = False
+                    elif not tracemalloc.is_tracing():
+                        tracemalloc.start()
+                        for abierta in self._abiertas:
+                            abierta["memory_partial"] = True
+
+    def wrap(self, func, name=None):
+        """Devuelve `func` instrumentada; la forma de entrada es la del primer argumento."""
+
+        @functools.wraps(func)
+        def envoltura(*args, **kwargs):
+            with self.stage(name or func.__name__, args[0] if args else None) as frame:
+                salida = func(*args, **kwargs)
+                frame["output"] = salida
+            return salida
+
+        return envoltura
+
+    @contextmanager
+    def instrument(self, module, names=None):
+        """
+        Sustituye temporalmente las funciones de un módulo (p. ej. `Auto_EDA`) por su versión
+        instrumentada. Por defecto, todas las funciones públicas definidas en el módulo.
+        """
+        if names is None:
+            names = [nombre for nombre, obj in vars(module).items()
+                     if inspect.isfunction(obj) and obj.__module__ == module.__name__ and not nombre.startswith("_")]
+        originales = {nombre: getattr(module, nombre) for nombre in names}
+        try:
+            for nombre, func in originales.items():
+                setattr(module, nombre, self.wrap(func, nombre))
+            yield self
+        finally:
+            for nombre, func in originales.items():
+                setattr(module, nombre, func)
+
+    def to_frame(self):
+        return pd.DataFrame(self.records, columns=CAMPOS)
+
+    def save(self, ruta_salida, nombre="profile", metadata=None):
+        """
+        Guarda el informe como JSON (con el entorno y `metadata`) y como CSV.
+
+        Returns:
+            tuple: Rutas (json, csv).
+        """
+        os.makedirs(ruta_salida, exist_ok=True)
+        ruta_json = os.path.join(ruta_salida, f"{nombre}.json")
+        ruta_csv = os.path.join(ruta_salida, f"{nombre}.csv")
+        with open(ruta_json, "w") as f:
+            json.dump({"environment": environment(), "metadata": metadata or {}, "stages": self.records}, f, indent=2)
+        with open(ruta_csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=CAMPOS)
+            writer.writeheader()
+            writer.writerows(self.records)
+        return ruta_json, ruta_csv
+
+    def summary(self):
+        """Tabla resumida por etapa, ordenada por tiempo."""
+        tabla = self.to_frame()
+        if tabla.empty:
+            return tabla
+        return tabla[["stage", "wall_s", "cpu_s", "peak_traced_mb", "rss_peak_mb", "rows_in", "cols_in"]].sort_values("wall_s", ascending=False)
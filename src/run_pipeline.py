@@ -0,0 +1,291 @@
+"""
+Ejecución sin interacción del pipeline de Auto_EDA a partir de un fichero de configuración.
+
+Toda la configuración (columna objetivo, columnas a eliminar, inferencias, rutas, formato,
+gráficos, modo aproximado, selección de features) se pasa como argumentos a las etapas, sin tocar las
+variables globales de `Auto_EDA`, así que varios datasets pueden ejecutarse en paralelo en
+procesos distintos. matplotlib/seaborn solo se importan si hay etapas de gráficos activas.
+
+Uso (desde `src/`):
+    python run_pipeline.py --config pipeline.yaml
+    python run_pipeline.py --config pipeline.json --workers 4
+    python run_pipeline.py --measure-cold-start
+
+Ejemplo de configuración (JSON; YAML si está instalado PyYAML):
+    {
+        "defaults": {"target_column": "Outcome", "formato": "parquet", "feature_selection": {"ks": [7, 8, 9]}},
+        "runs": [
+            {"name": "diabetes", "data": "../data/raw/diabetes.csv"},
+            {"name": "diabetes_2024", "data": "../data/raw/diabetes_2024.parquet",
+             "paths": {"processed": "../data/processed/2024/", "models": "../models/2024/",
+                       "json": "../data/processed/2024/Json", "plots": "../data/interim/2024/plots"}}
+        ]
+    }
+Un fichero con un único diccionario (sin "runs") es una sola ejecución.
+"""
+import time
+
+_INICIO = time.perf_counter()
+
+import argparse
+import copy
+import inspect
+import json
+import os
+import statistics
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+DEFAULTS = {
+    "name": "auto_eda",
+    "data": None,
+    "read_options": {},
+    "query": None,
+    "db_url": None,
+    "target_column": "Outcome",
+    "columns_to_drop": [],
+    "inferencia": [],
+    "categorical_to_numerical": [],
+    "paths": {
+        "processed": "../data/processed/",
+        "models": "../models/",
+        "json": "../data/processed/Json",
+        "plots": "../data/interim/plots",
+        "reports": "../data/interim/runs",
+    },
+    "formato": "parquet",
+    "exportar_excel": False,
+    "plots": {
+        "enabled": False,
+        "stages": ["univariate_numerical_analysis", "correlation_analysis", "bivariate_numerical_analysis", "pairplot_analysis"],
+    },
+    # Gráficos sobre una muestra estratificada por la columna objetivo, con informe de intervalos de confianza
+    "approximate": {"enabled": False, "sample_size": 100_000, "confidence": 0.95, "seed": 42},
+    # {"ks": [...]} prueba todos los k y variantes; {"k": 7, "dataset": "X_train_..."} reproduce feature_selection
+    "feature_selection": {"ks": [7, 8, 9]},
+}
+# Módulos cuya carga domina el arranque
+MODULOS_PESADOS = ("pandas", "sklearn", "scipy", "matplotlib", "seaborn", "pyarrow")
+
+
+def _merge(base, extra):
+    """Mezcla recursiva de diccionarios (los valores de `extra` tienen prioridad)."""
+    resultado = copy.deepcopy(base)
+    for clave, valor in (extra or {}).items():
+        if isinstance(valor, dict) and isinstance(resultado.get(clave), dict):
+            resultado[clave] = _merge(resultado[clave], valor)
+        else:
+            resultado[clave] = copy.deepcopy(valor)
+    return resultado
+
+
+def load_config(ruta):
+    """
+    Lee un fichero JSON o YAML y devuelve la lista de configuraciones completas, una por ejecución.
+
+    Raises:
+        ValueError: Si dos ejecuciones comparten nombre o rutas de salida.
+    """
+    with open(ruta) as f:
+        if ruta.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError as e:
+                raise ImportError("Para leer configuraciones YAML hace falta PyYAML (pip install pyyaml); también se acepta JSON.") from e
+            contenido = yaml.safe_load(f)
+        else:
+            contenido = json.load(f)
+    if "runs" in contenido:
+        base = _merge(DEFAULTS, contenido.get("defaults"))
+        configs = [_merge(base, run) for run in contenido["runs"]]
+    else:
+        configs = [_merge(DEFAULTS, contenido)]
+    nombres = [config["name"] for config in configs]
+    if len(set(nombres)) != len(nombres):
+        raise ValueError(f"Nombres de ejecución repetidos: {nombres}")
+    if len(configs) > 1:
+        for clave in ("processed", "models", "json", "plots"):
+            rutas = [os.path.normpath(config["paths"][clave]) for config in configs]
+            if len(set(rutas)) != len(rutas):
+                raise ValueError(f"Las ejecuciones en paralelo necesitan rutas '{clave}' distintas: {rutas}")
+    return configs
+
+
+def load_data(config):
+    """Carga el dataset de la configuración (CSV/Parquet/Feather/XLSX, URL o consulta SQL)."""
+    import pandas as pd
+
+    if config["query"]:
+        from utils import db_connect, read_sql_arrow
+        return read_sql_arrow(config["query"], db_connect(config["db_url"])).to_pandas()
+    ruta, opciones = config["data"], config["read_options"]
+    if ruta is None:
+        raise ValueError("La configuración necesita 'data' o 'query'.")
+    lectores = {".parquet": pd.read_parquet, ".feather": pd.read_feather, ".xlsx": pd.read_excel}
+    return lectores.get(os.path.splitext(ruta)[1].lower(), pd.read_csv)(ruta, **opciones)
+
+
+def _run_plots(Auto_EDA, df, config, target_column, profiler):
+    """Etapas de gráficos: se guardan como PNG (backend Agg) en paths.plots; devuelve la columna objetivo."""
+    import matplotlib
+    matplotlib.use("Agg")
+
+    argumentos = {
+        "target_column": target_column,
+        "categorical_to_numerical": config["categorical_to_numerical"],
+        "ruta_json": config["paths"]["json"],
+        "ruta_salida": config["paths"]["plots"],
+        "headless": True,
+    }
+    for nombre in config["plots"]["stages"]:
+        funcion = getattr(Auto_EDA, nombre)
+        parametros = inspect.signature(funcion).parameters
+        argumentos["target_column"] = target_column
+        salida = profiler.wrap(funcion, nombre)(df, **{clave: valor for clave, valor in argumentos.items() if clave in parametros})
+        if nombre == "univariate_numerical_analysis":
+            target_column = salida
+    return target_column
+
+
+def _run_approximate_plots(Auto_EDA, df, config, target_column, profiler):
+    """
+    Etapas de gráficos sobre una muestra estratificada (ver `approx_eda`); guarda el informe con
+    los intervalos en paths.reports. Los encoders que los análisis ajustan en la muestra se
+    completan con las categorías de `df` que la muestra no vio (conservando los códigos de la
+    muestra) y se reescriben sus reglas antes de codificar `df`.
+    """
+    from approx_eda import confidence_report, print_report, save_report, stratified_sample
+    from encoders import REGISTRO, CategoryEncoder, EncoderRegistry
+
+    opciones = config["approximate"]
+    reservorio = profiler.wrap(stratified_sample, "stratified_sample")(df, target_column, size=opciones["sample_size"], seed=opciones["seed"])
+    muestra, estratos = reservorio.sample()
+    informe = profiler.wrap(confidence_report, "confidence_report")(reservorio, muestra, estratos, opciones["confidence"])
+    print_report(informe, opciones["confidence"])
+    save_report(informe, os.path.join(config["paths"]["reports"], f"{config['name']}_approximate.json"))
+    columnas, objetivo = set(muestra.columns), target_column
+    target_column = _run_plots(Auto_EDA, muestra, config, target_column, profiler)
+    ruta_registro = os.path.join(config["paths"]["json"], REGISTRO)
+    registro = EncoderRegistry.load(ruta_registro, missing_ok=True)
+    for col, encoder in list(registro.encoders.items()):
+        if encoder.name not in muestra.columns or encoder.name in columnas or col not in df.columns:
+            continue
+        completo = CategoryEncoder.fit(df[col])
+        categorias = encoder.categories.append(completo.categories.difference(encoder.categories, sort=False))
+        encoder = registro.encoders[col] = CategoryEncoder(categorias, name=encoder.name, unseen=encoder.unseen, missing=completo.missing)
+        # Mismos nombres de reglas que Auto_EDA: la del objetivo por su columna, las demás por la de códigos
+        encoder.save_rules(os.path.join(config["paths"]["json"], f"{col if col == objetivo else encoder.name}_transformation_rules.json"))
+        df[encoder.name] = encoder.transform(df[col], dtype="int64")
+    registro.save(ruta_registro)
+    return target_column
+
+
+def run(config):
+    """
+    Ejecuta el pipeline completo para una configuración y guarda el informe por etapa.
+
+    Returns:
+        dict: Nombre, tiempos de arranque (imports) y total, y rutas del informe.
+    """
+    inicio = time.perf_counter()
+    import Auto_EDA
+    from profiling import Profiler
+    imports_s = time.perf_counter() - inicio
+
+    paths = config["paths"]
+    for clave in ("processed", "models", "json", "reports"):
+        os.makedirs(paths[clave], exist_ok=True)
+    profiler = Profiler(trace_memory=False)
+    paso = profiler.wrap
+    target_column = config["target_column"]
+    salida = {"formato": config["formato"], "exportar_excel": config["exportar_excel"]}
+
+    df = paso(load_data)(config)
+    df = paso(Auto_EDA.clean_duplicates)(df)
+    df = paso(Auto_EDA.clean_irrelevant_data)(df, columns_to_drop=config["columns_to_drop"])
+    if config["plots"]["enabled"] and config["approximate"]["enabled"]:
+        target_column = _run_approximate_plots(Auto_EDA, df, config, target_column, profiler)
+    elif config["plots"]["enabled"]:
+        target_column = _run_plots(Auto_EDA, df, config, target_column, profiler)
+    numerical_cols = df.select_dtypes(include=['number']).columns.difference([target_column])
+    df_sin_outliers = paso(Auto_EDA.replace_outliers)(df.copy(), numerical_cols, ruta_json=paths["json"])
+    df_sin_outliers = paso(Auto_EDA.handle_missing_values)(df_sin_outliers, target_column=target_column)
+    df_sin_outliers = paso(Auto_EDA.infer_new_features)(df_sin_outliers, target_column=target_column, inferencia=config["inferencia"])
+    *splits, y_train, y_test, numerical_cols = paso(Auto_EDA.feature_scaling)(df, df_sin_outliers, ruta_guardado=paths["processed"], target_column=target_column, **salida)
+    norm = paso(Auto_EDA.normalize_data)(*splits, numerical_cols, ruta_guardado=paths["processed"], ruta_modelo=paths["models"], **salida)
+    scal = paso(Auto_EDA.scale_min_max_data_1)(*splits, numerical_cols, ruta_guardado=paths["processed"], ruta_modelo=paths["models"], **salida)
+
+    seleccion = config["feature_selection"]
+    if "k" in seleccion:
+        paso(Auto_EDA.feature_selection)(*splits, *norm, *scal, y_train, y_test, target_column, ruta_modelo=paths["models"], k=seleccion["k"], dataset_name=seleccion["dataset"], ruta_json=paths["json"], **salida)
+    else:
+        from feature_sweep import feature_selection_sweep
+
+        X_train_con, X_test_con, X_train_sin, X_test_sin = splits
+        nombres = ["X_train_con_outliers", "X_train_sin_outliers", "X_train_con_outliers_norm", "X_train_sin_outliers_norm", "X_train_con_outliers_scal", "X_train_sin_outliers_scal"]
+        train = dict(zip(nombres, (X_train_con, X_train_sin, norm[0], norm[2], scal[0], scal[2])))
+        test = dict(zip(nombres, (X_test_con, X_test_sin, norm[1], norm[3], scal[1], scal[3])))
+        paso(feature_selection_sweep, "feature_selection_sweep")(train, y_train, ks=seleccion["ks"], test_datasets=test, y_test=y_test, target_column=target_column, ruta_json=paths["json"], ruta_modelo=paths["models"], formato=config["formato"], max_workers=1)
+
+    informe = {
+        "name": config["name"],
+        "pid": os.getpid(),
+        "imports_s": imports_s,
+        "total_s": time.perf_counter() - inicio,
+        "heavy_modules_loaded": [modulo for modulo in MODULOS_PESADOS if modulo in sys.modules],
+    }
+    informe["report"] = profiler.save(paths["reports"], nombre=config["name"], metadata={**informe, "config": config})
+    print(f"[{config['name']}] terminado en {informe['total_s']:.2f} s (imports {imports_s:.2f} s)")
+    return informe
+
+
+def measure_cold_start(repeticiones=5):
+    """
+    Arranque en frío de un worker: mediana de `python -c "import ..."` en procesos nuevos, sin y con
+    las librerías de gráficos.
+    """
+    casos = {
+        "import Auto_EDA": "import Auto_EDA",
+        "import Auto_EDA + pipeline": "import Auto_EDA, feature_sweep, profiling, sklearn.preprocessing, sklearn.feature_selection",
+        "import Auto_EDA + plots": "import Auto_EDA; Auto_EDA._plotting()",
+    }
+    resultados = {}
+    for nombre, codigo in casos.items():
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            subprocess.run([sys.executable, "-c", codigo], check=True)
+            tiempos.append(time.perf_counter() - inicio)
+        resultados[nombre] = statistics.median(tiempos)
+        print(f"{nombre:<30} mediana: {resultados[nombre]:.3f} s")
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ejecuta el pipeline de Auto_EDA desde un fichero de configuración.")
+    parser.add_argument("--config", help="Fichero JSON o YAML")
+    parser.add_argument("--workers", type=int, default=1, help="Procesos en paralelo (una ejecución por proceso)")
+    parser.add_argument("--measure-cold-start", action="store_true", help="Mide el arranque en frío de los imports y termina")
+    args = parser.parse_args()
+
+    if args.measure_cold_start:
+        measure_cold_start()
+        return
+    if not args.config:
+        parser.error("Falta --config")
+    configs = load_config(args.config)
+    print(f"Arranque: {time.perf_counter() - _INICIO:.3f} s hasta leer la configuración")
+    if args.workers > 1 and len(configs) > 1:
+        # spawn: cada ejecución arranca en un proceso limpio, sin heredar estado del padre
+        with ProcessPoolExecutor(max_workers=args.workers, mp_context=get_context("spawn")) as pool:
+            informes = list(pool.map(run, configs))
+    else:
+        informes = [run(config) for config in configs]
+    for informe in informes:
+        print(f"{informe['name']}: {informe['total_s']:.2f} s, imports {informe['imports_s']:.2f} s, módulos cargados {informe['heavy_modules_loaded']}")
+
+
+if __name__ == "__main__":
+    main()
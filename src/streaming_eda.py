@@ -0,0 +1,353 @@
+import math
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import column, literal_column, select, text
+from sqlalchemy import table as sa_table
+
+from outliers import OutlierClipper
+
+
+class KLLSketch:
+    """
+    Sketch KLL de cuantiles aproximados con memoria acotada (~3·k valores) y fusionable.
+
+    Cada nivel h guarda valores con peso 2^h; cuando un nivel supera su capacidad se ordena
+    y la mitad de sus elementos (pares o impares, al azar) sube al nivel siguiente. El error
+    de rango es del orden de 1/k. Con la semilla fija por defecto (la misma que `approx_eda`)
+    dos ejecuciones sobre los mismos datos dan los mismos cuantiles.
+    """
+
+    def __init__(self, k=200, seed=42):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, h):
+        profundidad = len(self.levels) - h - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** profundidad)))
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            if len(self.levels[h]) > self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                buffer = np.sort(self.levels[h])
+                # Con longitud impar un elemento se queda en este nivel
+                resto = buffer[-1:] if len(buffer) % 2 else buffer[:0]
+                pares = buffer[: len(buffer) - len(resto)]
+                promovidos = pares[self._rng.integers(2)::2]
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promovidos])
+                self.levels[h] = resto
+            h += 1
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not values.size:
+            return self
+        self.n += values.size
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        if other.k != self.k:
+            raise ValueError("Solo se pueden fusionar sketches con el mismo k.")
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, nivel in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], nivel])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantiles(self, qs):
+        """Cuantiles aproximados (interpolación lineal sobre los rangos ponderados)."""
+        qs = np.atleast_1d(np.asarray(qs, dtype=np.float64))
+        if not self.n:
+            return np.full(qs.shape, np.nan)
+        valores = np.concatenate(self.levels)
+        pesos = np.concatenate([np.full(len(nivel), 2.0 ** h) for h, nivel in enumerate(self.levels)])
+        orden = np.argsort(valores, kind="mergesort")
+        valores, pesos = valores[orden], pesos[orden]
+        # Posición (0..n-1) del centro de cada elemento, como en el cuantil lineal de pandas
+        rangos = np.cumsum(pesos) - (pesos + 1) / 2
+        total = pesos.sum()
+        return np.interp(qs * (total - 1), rangos, valores)
+
+    def quantile(self, q):
+        return float(self.quantiles([q])[0])
+
+    def to_dict(self):
+        return {"k": self.k, "n": self.n, "levels": [nivel.tolist() for nivel in self.levels]}
+
+    @classmethod
+    def from_dict(cls, data, seed=42):
+        sketch = cls(k=data["k"], seed=seed)
+        sketch.n = data["n"]
+        sketch.levels = [np.asarray(nivel, dtype=np.float64) for nivel in data["levels"]]
+        return sketch
+
+
+class NumericAccumulator:
+    """Conteos, nulos, media/varianza (Chan et al.), mínimo, máximo y cuantiles de una columna numérica."""
+
+    def __init__(self, k=200):
+        self.count = 0
+        self.missing = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.sketch = KLLSketch(k=k)
+
+    def _merge_moments(self, n_b, mean_b, m2_b):
+        n_a = self.count
+        n = n_a + n_b
+        if not n_b:
+            return
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta**2 * n_a * n_b / n
+        self.count = n
+
+    def update(self, serie):
+        valores = pd.to_numeric(serie, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+        nulos = np.isnan(valores)
+        self.missing += int(nulos.sum())
+        valores = valores[~nulos]
+        if not valores.size:
+            return self
+        media = valores.mean()
+        self._merge_moments(valores.size, media, float(((valores - media) ** 2).sum()))
+        self.min = min(self.min, float(valores.min()))
+        self.max = max(self.max, float(valores.max()))
+        self.sketch.update(valores)
+        return self
+
+    def merge(self, other):
+        self.missing += other.missing
+        self._merge_moments(other.count, other.mean, other.m2)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+        return self
+
+    @property
+    def variance(self):
+        """Varianza muestral (ddof=1), la misma que `DataFrame.describe`."""
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    def summary(self):
+        q25, q50, q75 = self.sketch.quantiles([0.25, 0.5, 0.75])
+        return {
+            "count": self.count,
+            "missing": self.missing,
+            "mean": self.mean if self.count else np.nan,
+            "std": math.sqrt(self.variance) if self.count > 1 else np.nan,
+            "min": self.min if self.count else np.nan,
+            "25%": q25,
+            "50%": q50,
+            "75%": q75,
+            "max": self.max if self.count else np.nan,
+        }
+
+
+class CategoricalAccumulator:
+    """Conteos por categoría (para la moda) y nulos de una columna no numérica."""
+
+    def __init__(self):
+        self.count = 0
+        self.missing = 0
+        self.frequencies = Counter()
+
+    def update(self, serie):
+        nulos = serie.isna()
+        self.missing += int(nulos.sum())
+        self.count += int((~nulos).sum())
+        self.frequencies.update(serie[~nulos].value_counts().to_dict())
+        return self
+
+    def merge(self, other):
+        self.count += other.count
+        self.missing += other.missing
+        self.frequencies.update(other.frequencies)
+        return self
+
+    @property
+    def mode(self):
+        return self.frequencies.most_common(1)[0][0] if self.frequencies else None
+
+    def summary(self):
+        return {"count": self.count, "missing": self.missing, "unique": len(self.frequencies), "top": self.mode}
+
+
+class PendingAccumulator:
+    """Columna de la que de momento solo se han visto nulos; su tipo se decide en un bloque posterior."""
+
+    def __init__(self):
+        self.count = 0
+        self.missing = 0
+
+    def update(self, serie):
+        self.missing += len(serie)
+        return self
+
+
+def _new_accumulator(serie, k):
+    return NumericAccumulator(k) if pd.api.types.is_numeric_dtype(serie) else CategoricalAccumulator()
+
+
+class StreamingProfile:
+    """Perfil fusionable de una tabla construido bloque a bloque."""
+
+    def __init__(self, k=200):
+        self.k = k
+        self.rows = 0
+        self.columns = {}
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        for col in chunk.columns:
+            serie = chunk[col]
+            acumulador = self.columns.get(col)
+            if acumulador is None or isinstance(acumulador, PendingAccumulator):
+                if serie.isna().all():
+                    self.columns[col] = (acumulador or PendingAccumulator()).update(serie)
+                    continue
+                nuevo = _new_accumulator(serie, self.k)
+                nuevo.missing = acumulador.missing if acumulador is not None else 0
+                self.columns[col] = acumulador = nuevo
+            acumulador.update(serie)
+        return self
+
+    def merge(self, other):
+        self.rows += other.rows
+        for col, acumulador in other.columns.items():
+            propio = self.columns.get(col)
+            if propio is None:
+                self.columns[col] = acumulador
+            elif isinstance(acumulador, PendingAccumulator):
+                propio.missing += acumulador.missing
+            elif isinstance(propio, PendingAccumulator):
+                acumulador.missing += propio.missing
+                self.columns[col] = acumulador
+            else:
+                propio.merge(acumulador)
+        return self
+
+    def numerical_columns(self):
+        return [col for col, acc in self.columns.items() if isinstance(acc, NumericAccumulator)]
+
+    def categorical_columns(self):
+        return [col for col, acc in self.columns.items() if isinstance(acc, CategoricalAccumulator)]
+
+    def missing(self):
+        return pd.Series({col: acc.missing for col, acc in self.columns.items()})
+
+    def describe(self):
+        """Equivalente aproximado de `df.describe()` para las columnas numéricas."""
+        return pd.DataFrame({col: self.columns[col].summary() for col in self.numerical_columns()})
+
+
+def _chunk_query(tabla=None, columns=None, query=None):
+    """Consulta de `read_sql_chunks`: el SELECT de una tabla (con identificadores citados por el dialecto) o `query`."""
+    if (tabla is None) == (query is None):
+        raise ValueError("Indica una tabla o una consulta (query), no ambas")
+    if query is not None:
+        return text(query) if isinstance(query, str) else query
+    esquema, _, nombre = tabla.rpartition(".")
+    origen = sa_table(nombre, *(column(col) for col in columns or []), schema=esquema or None)
+    return select(*origen.c) if columns else select(literal_column("*")).select_from(origen)
+
+
+def read_sql_chunks(engine, tabla=None, chunksize=50_000, columns=None, query=None, params=None):
+    """
+    Lee una tabla o una consulta SQL por bloques usando un cursor de servidor.
+
+    Args:
+        engine: Engine de SQLAlchemy (p. ej. `utils.db_connect()`).
+        tabla (str): Nombre de la tabla ('esquema.tabla' si no está en el esquema por defecto).
+        chunksize (int): Filas por bloque.
+        columns (list): Columnas a leer (solo con `tabla`).
+        query: Consulta completa (texto o `select()` de SQLAlchemy), en lugar de `tabla`.
+        params (dict): Parámetros enlazados de `query` (`:nombre` en una consulta de texto).
+    """
+    consulta = _chunk_query(tabla, columns, query)
+    with engine.connect().execution_options(stream_results=True, max_row_buffer=chunksize) as conn:
+        for chunk in pd.read_sql(consulta, conn, params=params, chunksize=chunksize):
+            yield chunk
+
+
+def profile_table(engine, tabla=None, chunksize=50_000, columns=None, k=200, query=None, params=None):
+    """Recorre la tabla (o consulta) una vez y devuelve su `StreamingProfile`."""
+    perfil = StreamingProfile(k=k)
+    for chunk in read_sql_chunks(engine, tabla, chunksize=chunksize, columns=columns, query=query, params=params):
+        perfil.update(chunk)
+    return perfil
+
+
+def streaming_explore_data(engine, tabla=None, chunksize=50_000, k=200, query=None, params=None):
+    """1. Exploración de Datos, por bloques y con memoria acotada."""
+    perfil = profile_table(engine, tabla, chunksize=chunksize, k=k, query=query, params=params)
+    print("Información general de la tabla:")
+    print(f"Filas: {perfil.rows}, columnas: {len(perfil.columns)}")
+    print("\nValores faltantes por columna:")
+    print(perfil.missing())
+    print("\nEstadísticas descriptivas (cuantiles aproximados):")
+    print(perfil.describe())
+    print((perfil.rows, len(perfil.columns)))
+    return perfil
+
+
+def streaming_fill_values(perfil, target_column="Outcome"):
+    """Valores de imputación de `handle_missing_values`: mediana (aprox.) en numéricas, moda en categóricas."""
+    valores = {}
+    for col in perfil.numerical_columns():
+        if col != target_column:
+            valores[col] = perfil.columns[col].sketch.quantile(0.5)
+    for col in perfil.categorical_columns():
+        valores[col] = perfil.columns[col].mode
+    return valores
+
+
+def streaming_handle_missing_values(engine, tabla=None, target_column="Outcome", chunksize=50_000, perfil=None, query=None, params=None):
+    """
+    5.2 Imputación de faltantes por bloques (generador).
+
+    Primero recorre la tabla para las medianas/modas (salvo que se pase `perfil`) y luego
+    devuelve cada bloque ya imputado.
+    """
+    if perfil is None:
+        perfil = profile_table(engine, tabla, chunksize=chunksize, query=query, params=params)
+    print("Valores faltantes por columna:")
+    print(perfil.missing())
+    valores = streaming_fill_values(perfil, target_column)
+    for chunk in read_sql_chunks(engine, tabla, chunksize=chunksize, query=query, params=params):
+        yield chunk.fillna(value={col: v for col, v in valores.items() if col in chunk.columns})
+
+
+def streaming_outlier_bounds(perfil, numerical_cols=None, target_column="Outcome"):
+    """
+    Límites IQR de `replace_outliers` a partir del perfil (cuartiles aproximados del sketch).
+
+    Returns:
+        OutlierClipper: con los límites en el formato de `outliers_dict.json`.
+    """
+    if numerical_cols is None:
+        numerical_cols = [col for col in perfil.numerical_columns() if col != target_column]
+    bounds = {}
+    for col in numerical_cols:
+        acumulador = perfil.columns[col]
+        q1, q3 = acumulador.sketch.quantiles([0.25, 0.75])
+        iqr = q3 - q1
+        lower_bound = q1 - 1.5 * iqr
+        upper_bound = q3 + 1.5 * iqr
+        if lower_bound < 0:
+            lower_bound = acumulador.min
+        bounds[col] = [float(lower_bound), float(upper_bound)]
+    return OutlierClipper(bounds)
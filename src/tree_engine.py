@@ -0,0 +1,244 @@
+import json
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from outliers import OutlierClipper
+
+TREE_LEAF = -1
+
+
+class CompiledTree:
+    """
+    Árbol de decisión ya entrenado, aplanado a arrays NumPy para predecir en lote.
+
+    Reproduce exactamente el recorrido de sklearn: las muestras se comparan en float32
+    contra umbrales float64 (`x <= threshold` va a la izquierda).
+    """
+
+    def __init__(self, children_left, children_right, feature, threshold, value, classes, missing_go_to_left=None):
+        children_left = np.asarray(children_left, dtype=np.intp)
+        children_right = np.asarray(children_right, dtype=np.intp)
+        hojas = children_left == TREE_LEAF
+        nodos = np.arange(len(children_left), dtype=np.intp)
+        # Las hojas apuntan a sí mismas y nunca se desvían: así todas las filas avanzan
+        # el mismo número de niveles sin máscaras ni compactación
+        self.children_left = np.where(hojas, nodos, children_left)
+        self.children_right = np.where(hojas, nodos, children_right)
+        # Hijos intercalados [izq, der] para elegir el siguiente nodo con un solo `take`
+        self.children = np.stack([self.children_left, self.children_right], axis=1).ravel()
+        self.feature = np.where(hojas, 0, feature).astype(np.intp)
+        self.threshold = np.where(hojas, np.inf, threshold).astype(np.float64)
+        if missing_go_to_left is None:
+            missing_go_to_left = np.zeros(len(nodos), dtype=bool)
+        # Con NaN, una hoja debe quedarse en sí misma: "a la derecha" también apunta a ella
+        self.missing_go_right = ~np.asarray(missing_go_to_left, dtype=bool)
+        self.is_leaf = hojas
+        self.depth = self._max_depth(children_left, children_right)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.classes = np.asarray(classes)
+        self.leaf_class = np.argmax(self.value, axis=1)
+        totales = self.value.sum(axis=1, keepdims=True)
+        self.proba = np.divide(self.value, totales, out=np.zeros_like(self.value), where=totales > 0)
+
+    @staticmethod
+    def _max_depth(children_left, children_right):
+        profundidad, nivel = 0, np.array([0])
+        while True:
+            internos = nivel[children_left[nivel] != TREE_LEAF]
+            if not internos.size:
+                return profundidad
+            nivel = np.concatenate([children_left[internos], children_right[internos]])
+            profundidad += 1
+
+    @classmethod
+    def from_estimator(cls, model):
+        """Compila un `DecisionTreeClassifier` de una sola salida."""
+        tree = model.tree_
+        if tree.n_outputs != 1:
+            raise ValueError("Solo se soportan árboles de una salida.")
+        missing_go_to_left = getattr(tree, "missing_go_to_left", None)
+        return cls(tree.children_left, tree.children_right, tree.feature, tree.threshold, tree.value[:, 0, :], model.classes_, missing_go_to_left)
+
+    # Arrays que usa la predicción (los calcula __init__); `to_arrays`/`from_arrays` los guardan tal cual
+    ARRAYS = ("children_left", "children_right", "children", "feature", "threshold", "missing_go_right", "is_leaf", "value", "classes", "leaf_class", "proba")
+
+    def to_arrays(self):
+        return {nombre: getattr(self, nombre) for nombre in self.ARRAYS}
+
+    @classmethod
+    def from_arrays(cls, arrays, depth):
+        """Reconstruye el árbol sin copiar ni recalcular sus arrays (p. ej. vistas de un fichero mapeado)."""
+        tree = cls.__new__(cls)
+        for nombre in cls.ARRAYS:
+            setattr(tree, nombre, arrays[nombre])
+        tree.depth = depth
+        return tree
+
+    @property
+    def node_count(self):
+        return len(self.children_left)
+
+    def apply(self, X):
+        """Devuelve el índice de hoja de cada fila de `X` (float32, columnas en el orden del modelo)."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n, n_features = X.shape
+        plano = X.ravel()
+        base = np.arange(n, dtype=np.intp) * n_features
+        nodos = np.zeros(n, dtype=np.intp)
+        hay_nan = np.isnan(plano).any()
+        # Un nivel del árbol por iteración; las filas que ya están en una hoja se quedan en ella
+        for _ in range(self.depth):
+            valores = np.take(plano, base + np.take(self.feature, nodos))
+            va_derecha = valores > np.take(self.threshold, nodos)
+            if hay_nan:
+                # Igual que sklearn: los NaN siguen la rama `missing_go_to_left` de cada nodo
+                nan = np.isnan(valores)
+                va_derecha[nan] = np.take(self.missing_go_right, nodos[nan])
+            nodos = np.take(self.children, 2 * nodos + va_derecha)
+        return nodos
+
+    def predict(self, X):
+        return self.classes[self.leaf_class[self.apply(X)]]
+
+    def predict_proba(self, X):
+        return self.proba[self.apply(X)]
+
+
+def _affine_from_scaler(scaler, columns):
+    """
+    Traduce un StandardScaler/MinMaxScaler a ((x - shift) / div) * mul + add por columna.
+
+    Se mantienen las mismas operaciones y en el mismo orden que sklearn para obtener
+    resultados bit a bit idénticos. Las columnas que el scaler no conoce pasan sin cambios.
+    """
+    n = len(columns)
+    shift, div, mul, add = np.zeros(n), np.ones(n), np.ones(n), np.zeros(n)
+    if scaler is None:
+        return shift, div, mul, add
+    nombres = list(getattr(scaler, "feature_names_in_", columns))
+    posicion = {col: i for i, col in enumerate(nombres)}
+    for j, col in enumerate(columns):
+        if col not in posicion:
+            continue
+        i = posicion[col]
+        if hasattr(scaler, "data_range_"):  # MinMaxScaler
+            mul[j], add[j] = scaler.scale_[i], scaler.min_[i]
+        else:  # StandardScaler
+            if getattr(scaler, "with_mean", True) and scaler.mean_ is not None:
+                shift[j] = scaler.mean_[i]
+            if getattr(scaler, "with_std", True) and scaler.scale_ is not None:
+                div[j] = scaler.scale_[i]
+    return shift, div, mul, add
+
+
+class InferenceEngine:
+    """
+    Motor de inferencia que fusiona recorte de outliers, escalado, selección de columnas y árbol.
+
+    Args:
+        tree (CompiledTree): Árbol compilado.
+        feature_names (list): Columnas que espera el árbol, en orden.
+        clipper (OutlierClipper): Límites de `outliers_dict.json` (None si el modelo usa datos con outliers).
+        scaler: StandardScaler/MinMaxScaler entrenado (None si el modelo usa datos sin escalar).
+        chunk_size (int): Filas por bloque, para acotar la memoria temporal.
+    """
+
+    def __init__(self, tree, feature_names, clipper=None, scaler=None, chunk_size=32768):
+        self.tree = tree
+        self.feature_names = list(feature_names)
+        self.chunk_size = chunk_size
+        n = len(self.feature_names)
+        self.lower = np.full(n, -np.inf)
+        self.upper = np.full(n, np.inf)
+        if clipper is not None:
+            for j, col in enumerate(self.feature_names):
+                if col in clipper.bounds:
+                    self.lower[j], self.upper[j] = clipper.bounds[col]
+        self.shift, self.div, self.mul, self.add = _affine_from_scaler(scaler, self.feature_names)
+        self._recorta = bool(np.isfinite(self.lower).any() or np.isfinite(self.upper).any())
+        self._escala = scaler is not None
+
+    @classmethod
+    def from_model(cls, model, feature_names=None, clipper=None, scaler=None, **kwargs):
+        if feature_names is None:
+            feature_names = getattr(model, "feature_names_in_", None)
+            if feature_names is None:
+                raise ValueError("El modelo no guarda los nombres de columnas; indique feature_names.")
+        return cls(CompiledTree.from_estimator(model), feature_names, clipper=clipper, scaler=scaler, **kwargs)
+
+    @classmethod
+    def from_artifacts(cls, ruta_modelo="../models/", model_file="Decision_tree_model.sav", scaler_file=None, outliers_json=None, features_json=None, **kwargs):
+        """
+        Carga el modelo y sus artefactos de preprocesado una sola vez.
+
+        Args:
+            scaler_file (str): p. ej. 'scaler_sin_outliers.pkl' o 'normalizador_con_outliers.pkl'.
+            outliers_json (str): Ruta a `outliers_dict.json`, si el modelo se entrenó sin outliers.
+            features_json (str): Ruta a un `featureselection_k_*.json`; por defecto, las columnas del modelo.
+        """
+        with open(os.path.join(ruta_modelo, model_file), "rb") as file:
+            model = pickle.load(file)
+        scaler = None
+        if scaler_file is not None:
+            with open(os.path.join(ruta_modelo, scaler_file), "rb") as file:
+                scaler = pickle.load(file)
+        clipper = OutlierClipper.from_json(outliers_json) if outliers_json is not None else None
+        feature_names = None
+        if features_json is not None:
+            with open(features_json) as f:
+                feature_names = json.load(f)
+            modelo_cols = getattr(model, "feature_names_in_", None)
+            if modelo_cols is not None and list(modelo_cols) != feature_names:
+                raise ValueError(f"Las columnas de {features_json} no coinciden con las del modelo.")
+        return cls.from_model(model, feature_names=feature_names, clipper=clipper, scaler=scaler, **kwargs)
+
+    def _as_array(self, X, columns=None):
+        """Proyecta las columnas del modelo a un array float64 contiguo nuevo (nunca modifica `X`)."""
+        if isinstance(X, pd.DataFrame):
+            return X[self.feature_names].to_numpy(dtype=np.float64, copy=True)
+        X = np.asarray(X)
+        if columns is not None:
+            posicion = {col: i for i, col in enumerate(columns)}
+            return np.take(X, [posicion[col] for col in self.feature_names], axis=1).astype(np.float64, copy=False)
+        return np.array(X, dtype=np.float64, order="C", copy=True)
+
+    def transform(self, X, columns=None):
+        """Aplica el preprocesado fusionado y devuelve el array float32 que recibe el árbol."""
+        bloque = self._as_array(X, columns)
+        if self._recorta:
+            np.clip(bloque, self.lower, self.upper, out=bloque)
+        if self._escala:
+            bloque -= self.shift
+            bloque /= self.div
+            bloque *= self.mul
+            bloque += self.add
+        return bloque.astype(np.float32)
+
+    def _run(self, X, columns, salida):
+        if not isinstance(X, pd.DataFrame):
+            X = np.asarray(X)
+        n = X.shape[0]
+        partes = []
+        for inicio in range(0, n, self.chunk_size):
+            fin = min(inicio + self.chunk_size, n)
+            chunk = X.iloc[inicio:fin] if isinstance(X, pd.DataFrame) else X[inicio:fin]
+            partes.append(salida(self.transform(chunk, columns)))
+        if not partes:
+            return salida(np.empty((0, len(self.feature_names)), dtype=np.float32))
+        return np.concatenate(partes)
+
+    def predict(self, X, columns=None):
+        """
+        Predice la clase de cada fila.
+
+        Args:
+            X: DataFrame con las columnas del modelo, o array 2-D. Si es un array con más
+                columnas que las del modelo, `columns` indica el nombre de cada una.
+        """
+        return self._run(X, columns, self.tree.predict)
+
+    def predict_proba(self, X, columns=None):
+        return self._run(X, columns, self.tree.predict_proba)
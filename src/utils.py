@@ -1,13 +1,109 @@
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+import os
 import pandas as pd
+import pyarrow as pa
+
+try:  # Opcional: lectura columnar nativa (Rust) para PostgreSQL/MySQL/SQLite
+    import connectorx
+except ImportError:
+    connectorx = None
 
 # load the .env file variables
 load_dotenv()
 
+# Engines cacheados por proceso: (pid, url, tamaño del pool) -> Engine
+_ENGINES = {}
+
+
+def _dispose_engines_after_fork():
+    """En el hijo de un fork, suelta las conexiones heredadas sin cerrarlas (siguen siendo del padre)."""
+    for engine in _ENGINES.values():
+        engine.dispose(close=False)
+    _ENGINES.clear()
+
 
-def db_connect():
-    import os
-    engine = create_engine(os.getenv('DATABASE_URL'))
-    engine.connect()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_engines_after_fork)
+
+
+def db_connect(url=None, pool_size=5, max_overflow=10, pool_recycle=1800):
+    """
+    Devuelve el engine de SQLAlchemy del proceso, creándolo solo la primera vez.
+
+    Args:
+        url (str): URL de la base de datos; por defecto la variable DATABASE_URL del .env.
+        pool_size (int): Conexiones persistentes del pool.
+        max_overflow (int): Conexiones extra permitidas en picos.
+        pool_recycle (int): Segundos tras los que se recicla una conexión.
+    """
+    url = url or os.getenv('DATABASE_URL')
+    key = (os.getpid(), url, pool_size, max_overflow, pool_recycle)
+    engine = _ENGINES.get(key)
+    if engine is None:
+        kwargs = {"pool_pre_ping": True}
+        parsed = make_url(url)
+        # SQLite en memoria usa un pool de una conexión por hilo, sin dimensionado
+        if not (parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")):
+            kwargs.update(pool_size=pool_size, max_overflow=max_overflow, pool_recycle=pool_recycle)
+        engine = create_engine(url, **kwargs)
+        # Comprueba la conexión y la devuelve al pool inmediatamente
+        with engine.connect():
+            pass
+        _ENGINES[key] = engine
     return engine
+
+
+def dispose_engines():
+    """Cierra todos los engines cacheados (p. ej. al terminar un worker)."""
+    for engine in _ENGINES.values():
+        engine.dispose()
+    _ENGINES.clear()
+
+
+def _arrow_table(bloque):
+    """Tabla Arrow de un bloque de `pd.read_sql`, sin los metadatos de pandas (tipos NumPy en `to_pandas`)."""
+    tabla = pa.Table.from_pandas(bloque, preserve_index=False).replace_schema_metadata(None)
+    # pandas tipa como texto una columna sin ningún valor; como null se promueve al tipo de los otros bloques
+    for i, columna in enumerate(tabla.columns):
+        if len(columna) and columna.null_count == len(columna):
+            tabla = tabla.set_column(i, tabla.field(i).name, pa.nulls(len(columna)))
+    return tabla
+
+
+def read_sql_arrow(query, engine=None, params=None, batch_size=65536):
+    """
+    Ejecuta una consulta y devuelve el resultado como `pyarrow.Table`.
+
+    La consulta se lee con `pd.read_sql(..., dtype_backend="pyarrow")` en bloques de
+    `batch_size` filas, así que cada bloque ya tiene columnas Arrow y pasa a la tabla sin copiar.
+    `params` usa el estilo de parámetros del driver (`?` en SQLite, `%s` en psycopg2).
+    Si `connectorx` está instalado y no hay parámetros, la lectura se hace con él,
+    que construye las columnas Arrow directamente en Rust; si no admite la consulta
+    (p. ej. una columna NUMERIC de SQLite con enteros y reales), se vuelve a `pd.read_sql`.
+    """
+    engine = engine or db_connect()
+    # Una base SQLite en memoria solo existe dentro de la conexión de SQLAlchemy
+    en_memoria = engine.url.get_backend_name() == "sqlite" and engine.url.database in (None, "", ":memory:")
+    if connectorx is not None and params is None and not en_memoria:
+        url = engine.url.set(drivername=engine.url.get_backend_name())
+        try:
+            return connectorx.read_sql(url.render_as_string(hide_password=False), query, return_type="arrow")
+        except RuntimeError:
+            # connectorx informa de los tipos o consultas que no soporta con RuntimeError
+            pass
+    # Una consulta en texto se ejecuta con `exec_driver_sql`: sin parámetros no se pasa tupla y
+    # psycopg2/pymysql no interpretan los `%` de la consulta
+    with engine.connect() as conexion:
+        bloques = pd.read_sql(query, conexion, params=params, chunksize=batch_size, dtype_backend="pyarrow")
+        tablas = [_arrow_table(bloque) for bloque in bloques]
+    # Cada bloque infiere sus tipos: una columna toda nula sale como null y una columna NUMERIC
+    # de SQLite puede ser int64 en un bloque y double en otro, así que se promueven los tipos
+    return pa.concat_tables(tablas, promote_options="permissive").combine_chunks()
+
+
+def read_sql_numpy(query, engine=None, params=None, batch_size=65536):
+    """Igual que `read_sql_arrow`, pero devuelve {columna: numpy.ndarray}."""
+    table = read_sql_arrow(query, engine=engine, params=params, batch_size=batch_size)
+    return {nombre: table.column(nombre).to_numpy(zero_copy_only=False) for nombre in table.column_names}
@@ -0,0 +1,165 @@
+from collections import OrderedDict
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+
+from outliers import compute_outlier_bounds
+
+SPLITS = ("train", "test")
+FLAVORS = ("con", "sin")
+# Sufijo -> scaler por sabor, igual que normalize_data ("_norm") y scale_min_max_data_1 ("_scal")
+SCALINGS = {
+    "": {"con": None, "sin": None},
+    "_norm": {"con": StandardScaler, "sin": StandardScaler},
+    "_scal": {"con": MinMaxScaler, "sin": StandardScaler},
+}
+
+
+class VariantRegistry(Mapping):
+    """
+    Registro perezoso de las variantes X_{train,test}_{con,sin}_outliers{,_norm,_scal}.
+
+    Solo se guarda un array base con las columnas numéricas y los índices del split; cada
+    variante es una cadena de transformaciones (filas del split -> recorte de outliers ->
+    imputación por mediana -> scaler) que se materializa al pedirla, con una única reserva
+    de memoria. Las últimas `max_cached` variantes pedidas se mantienen en un LRU.
+
+    Args:
+        df (pd.DataFrame): DataFrame limpio (el `df` "con outliers" de feature_scaling).
+        target_column (str): Columna objetivo.
+        clip_bounds (dict): Límites de `outliers_dict.json`; por defecto se calculan como replace_outliers.
+        dtype: np.float64 o np.float32 (también para el array base).
+        max_cached (int): Variantes materializadas que se conservan en memoria.
+        test_size, random_state: Los mismos de feature_scaling, para obtener los mismos splits.
+    """
+
+    def __init__(self, df, target_column="Outcome", clip_bounds=None, dtype=np.float64, max_cached=4, test_size=0.2, random_state=42):
+        self.numerical_cols = df.select_dtypes(include=['number']).columns.difference([target_column])
+        self.dtype = np.dtype(dtype)
+        self.max_cached = max_cached
+        self.base = np.ascontiguousarray(df[self.numerical_cols].to_numpy(dtype=self.dtype, na_value=np.nan))
+        self.index = df.index
+        posiciones = np.arange(len(df))
+        train_idx, test_idx, y_train, y_test = train_test_split(posiciones, df[target_column], test_size=test_size, random_state=random_state)
+        self.rows = {"train": train_idx, "test": test_idx}
+        self.y_train, self.y_test = y_train, y_test
+        if clip_bounds is None:
+            clip_bounds = self._iqr_bounds()
+        self.lower = np.array([clip_bounds[col][0] for col in self.numerical_cols], dtype=self.dtype)
+        self.upper = np.array([clip_bounds[col][1] for col in self.numerical_cols], dtype=self.dtype)
+        self._medians = None
+        self._scalers = {}
+        self._cache = OrderedDict()
+
+    def _iqr_bounds(self):
+        """Límites de replace_outliers calculados columna a columna sobre el array base (sin copiar el DataFrame)."""
+        bounds = {}
+        for j, col in enumerate(self.numerical_cols):
+            columna = self.base[:, j]
+            bounds[col] = compute_outlier_bounds(pd.DataFrame({col: columna}, copy=False), [col])[col]
+        return bounds
+
+    @staticmethod
+    def variant_name(split, flavor, scaling=""):
+        return f"X_{split}_{flavor}_outliers{scaling}"
+
+    def _parse(self, name):
+        for split in SPLITS:
+            for flavor in FLAVORS:
+                for scaling in SCALINGS:
+                    if name == self.variant_name(split, flavor, scaling):
+                        return split, flavor, scaling
+        raise KeyError(name)
+
+    def __iter__(self):
+        for scaling in SCALINGS:
+            for split in SPLITS:
+                for flavor in FLAVORS:
+                    yield self.variant_name(split, flavor, scaling)
+
+    def __len__(self):
+        return len(SPLITS) * len(FLAVORS) * len(SCALINGS)
+
+    def __contains__(self, name):
+        # `Mapping.__contains__` llamaría a __getitem__ y materializaría la variante
+        try:
+            self._parse(name)
+        except KeyError:
+            return False
+        return True
+
+    def train_variants(self):
+        return [name for name in self if name.startswith("X_train_")]
+
+    def _sin_medians(self):
+        """Medianas de imputación de handle_missing_values (sobre todo el DataFrame ya recortado)."""
+        if self._medians is None:
+            self._medians = np.array([
+                np.nanmedian(np.clip(self.base[:, j], self.lower[j], self.upper[j])) for j in range(self.base.shape[1])
+            ], dtype=self.dtype)
+        return self._medians
+
+    def _raw(self, split, flavor):
+        """Filas del split (nuevo array) con el recorte e imputación del sabor aplicados en el sitio."""
+        datos = self.base[self.rows[split]]
+        if flavor == "sin":
+            np.clip(datos, self.lower, self.upper, out=datos)
+            nulos = np.isnan(datos)
+            if nulos.any():
+                datos[nulos] = np.broadcast_to(self._sin_medians(), datos.shape)[nulos]
+        return datos
+
+    def scaler(self, flavor, scaling):
+        """Scaler ajustado sobre el train del sabor (solo se guardan sus parámetros, no los datos)."""
+        clave = (flavor, scaling)
+        if clave not in self._scalers:
+            # copy=False: al materializar se transforma en el sitio el array recién extraído
+            scaler = SCALINGS[scaling][flavor](copy=False)
+            # En orden de columnas, como los DataFrames de feature_scaling (mismo orden de suma en las medias)
+            scaler.fit(np.asfortranarray(self._raw("train", flavor)))
+            self._scalers[clave] = scaler
+        return self._scalers[clave]
+
+    def materialize(self, name):
+        split, flavor, scaling = self._parse(name)
+        datos = self._raw(split, flavor)
+        if SCALINGS[scaling][flavor] is not None:
+            datos = self.scaler(flavor, scaling).transform(datos).astype(self.dtype, copy=False)
+        return pd.DataFrame(datos, index=self.index[self.rows[split]], columns=self.numerical_cols, copy=False)
+
+    def __getitem__(self, name):
+        if name in self._cache:
+            self._cache.move_to_end(name)
+            return self._cache[name]
+        df = self.materialize(name)
+        if self.max_cached:
+            self._cache[name] = df
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+        return df
+
+    def evict(self, name=None):
+        """Saca una variante (o todas) del LRU."""
+        if name is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(name, None)
+
+    @property
+    def cached_bytes(self):
+        return sum(df.memory_usage(index=False).sum() for df in self._cache.values())
+
+    @property
+    def nbytes(self):
+        """Memoria del array base más las variantes en caché."""
+        return self.base.nbytes + self.cached_bytes
+
+    def save(self, store, names=None):
+        """Escribe las variantes indicadas (por defecto todas, una a una) en un `ArtifactStore`."""
+        for name in names or list(self):
+            store.save_split(name, self.materialize(name))
+        store.save_split("y_train", self.y_train)
+        store.save_split("y_test", self.y_test)
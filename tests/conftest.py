@@ -0,0 +1,44 @@
+import os
+import sys
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+COLUMNAS = ["Pregnancies", "Glucose", "BloodPressure", "SkinThickness", "Insulin", "BMI", "DiabetesPedigreeFunction", "Age"]
+
+
+def diabetes_like(rows=2000, seed=0, missing=0.0):
+    """DataFrame con las columnas del dataset de diabetes, la clase correlacionada con Glucose y BMI."""
+    rng = np.random.default_rng(seed)
+    outcome = (rng.random(rows) < 0.35).astype(np.int64)
+    datos = {
+        "Pregnancies": rng.poisson(3.8, rows).astype(np.float64),
+        "Glucose": np.round(rng.normal(110, 25, rows) + 30 * outcome),
+        "BloodPressure": np.round(rng.normal(70, 12, rows)),
+        "SkinThickness": np.round(np.maximum(rng.normal(20, 15, rows), 0)),
+        "Insulin": np.round(np.maximum(rng.normal(80, 110, rows), 0)),
+        "BMI": np.round(rng.normal(31, 7, rows) + 4 * outcome, 1),
+        "DiabetesPedigreeFunction": np.round(rng.gamma(2, 0.23, rows), 3),
+        "Age": np.round(21 + rng.gamma(2, 6, rows)),
+    }
+    df = pd.DataFrame(datos)
+    if missing:
+        df = df.mask(rng.random(df.shape) < missing)
+    df["Outcome"] = outcome
+    return df
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Directorio de trabajo con la estructura de rutas relativas del repo (src/, ../data, ../models)."""
+    for carpeta in ("src", "models", "data/processed/Json", "data/interim"):
+        (tmp_path / carpeta).mkdir(parents=True, exist_ok=True)
+    monkeypatch.chdir(tmp_path / "src")
+    return tmp_path
@@ -0,0 +1,24 @@
+import numpy as np
+
+from approx_eda import correlation_intervals, stratified_means, stratified_sample
+from conftest import COLUMNAS, diabetes_like
+
+
+def test_intervals_cover_population_values():
+    poblacion = diabetes_like(rows=20000, seed=5, missing=0.05)
+    medias = poblacion[COLUMNAS].mean()
+    correlacion = poblacion[["Glucose", "BMI"]].corr().iloc[0, 1]
+    cubre_media, cubre_correlacion = [], []
+    for semilla in range(120):
+        reservorio = stratified_sample(poblacion, size=600, chunksize=5000, seed=semilla)
+        muestra, estratos = reservorio.sample()
+        assert len(muestra) == sum(reservorio.allocation().values())
+        intervalos = stratified_means(muestra[COLUMNAS], estratos, dict(enumerate(reservorio.counts.values())))
+        cubre_media.append(((intervalos["lower"] <= medias) & (medias <= intervalos["upper"])).to_numpy())
+        fila = correlation_intervals(muestra[["Glucose", "BMI"]]).iloc[0]
+        cubre_correlacion.append(fila["lower"] <= correlacion <= fila["upper"])
+    cobertura = np.mean(cubre_media, axis=0)
+    # Intervalos al 95 %: cobertura global cerca del nominal y ninguna columna muy por debajo
+    assert 0.92 <= cobertura.mean() <= 0.98
+    assert cobertura.min() >= 0.85
+    assert np.mean(cubre_correlacion) >= 0.88
@@ -0,0 +1,66 @@
+import mmap
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from artifact_store import ArtifactStore
+
+
+def test_npy_keeps_missing_values_and_dtypes(tmp_path):
+    df = pd.DataFrame({
+        "texto": pd.Series(["a", None, "nan"], dtype=object),
+        "str": pd.Series(["x", np.nan, "z"]),
+        "categoria": pd.Categorical(["u", None, "v"]),
+        "entero": pd.array([1, None, 3], dtype="Int64"),
+        "entero_completo": pd.array([1, 2, 3], dtype="Int64"),
+        "booleano": pd.array([True, None, False], dtype="boolean"),
+        "real": [1.5, np.nan, 2.0],
+        "fecha": pd.to_datetime(["2020-01-01", None, "2021-01-01"]),
+    })
+    store = ArtifactStore(str(tmp_path), formato="npy")
+    store.save_split("X_train", df)
+    leido = store.load_split("X_train")
+    pd.testing.assert_frame_equal(leido.copy(), df)
+    # El texto 'nan' sigue siendo texto y el faltante sigue siendo faltante
+    assert leido["texto"].tolist()[1:] == [None, "nan"]
+    assert store.load_split("X_train", columns=["entero"])["entero"].isna().tolist() == [False, True, False]
+
+
+@pytest.mark.parametrize("serie", [
+    pd.Series([1, "a", 2.5], dtype=object),
+    pd.Series(pd.Categorical([1, 2, 1])),
+    pd.Series(pd.period_range("2020-01", periods=3, freq="M")),
+])
+def test_npy_rejects_columns_it_cannot_store_exactly(tmp_path, serie):
+    store = ArtifactStore(str(tmp_path), formato="npy")
+    with pytest.raises(TypeError):
+        store.save_split("X", pd.DataFrame({"ok": [1, 2, 3], "col": serie}))
+    assert not os.path.exists(store.path("X"))
+
+
+@pytest.mark.parametrize("formato", ["parquet", "npy"])
+def test_unnamed_series_takes_the_split_name(tmp_path, formato):
+    store = ArtifactStore(str(tmp_path), formato=formato)
+    store.save_split("y_train", pd.Series([0, 1, 1]))
+    leido = store.load_split("y_train")
+    assert list(leido.columns) == ["y_train"] and leido["y_train"].tolist() == [0, 1, 1]
+
+
+def _respaldado_por_mmap(valores):
+    while valores is not None:
+        if isinstance(valores, mmap.mmap):
+            return True
+        valores = getattr(valores, "base", None)
+    return False
+
+
+def test_npy_read_keeps_columns_memory_mapped(tmp_path):
+    df = pd.DataFrame({"a": np.arange(5, dtype=np.float64), "b": np.ones(5), "c": np.arange(5)})
+    store = ArtifactStore(str(tmp_path), formato="npy")
+    store.save_split("X", df)
+    leido = store.load_split("X")
+    pd.testing.assert_frame_equal(leido.copy(), df)
+    # Las columnas del mismo dtype no se consolidan (copiando) en un único bloque
+    assert all(_respaldado_por_mmap(leido[col].to_numpy()) for col in df.columns)
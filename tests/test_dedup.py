@@ -0,0 +1,80 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from conftest import diabetes_like
+from dedup import StreamingDeduplicator, drop_duplicate_rows, duplicated_rows, row_hashes
+
+
+def _runs(ruta):
+    return {f: os.stat(os.path.join(ruta, f)).st_mtime_ns for f in os.listdir(ruta) if f.endswith(".npy")}
+
+
+def test_streaming_runs_are_append_only(tmp_path):
+    ruta = str(tmp_path / "hashes")
+    df = diabetes_like(4000, seed=5)
+    deduplicador = StreamingDeduplicator()
+    deduplicador.filter(df.iloc[:3000])
+    deduplicador.save(ruta)
+    historico = _runs(ruta)
+
+    deduplicador = StreamingDeduplicator.load(ruta)
+    assert len(deduplicador.filter(pd.concat([df.iloc[3000:3200], df.iloc[:100]]))) == 200
+    deduplicador.save(ruta)
+    despues = _runs(ruta)
+    # El tramo del histórico no se reescribe; solo se añade el del lote
+    assert {f: despues[f] for f in historico} == historico
+    assert len(despues) == len(historico) + 1
+
+    for inicio in range(3200, 4000, 100):
+        deduplicador = StreamingDeduplicator.load(ruta)
+        deduplicador.filter(df.iloc[inicio - 50:inicio + 100])
+        deduplicador.save(ruta)
+    deduplicador = StreamingDeduplicator.load(ruta)
+    assert deduplicador.rows_out == 4000
+    assert sum(len(tramo) for tramo in deduplicador._tramos) == 4000
+    assert len(_runs(ruta)) == len(deduplicador._tramos) < 10
+    assert np.array_equal(np.sort(np.concatenate(deduplicador._tramos)), np.unique(np.concatenate(deduplicador._tramos)))
+    assert len(deduplicador.filter(df)) == 0
+
+
+def test_large_integers_are_not_merged():
+    df = pd.DataFrame({"id": np.array([2**60, 2**60 + 1, 2**60, 2**63 - 1, 2**63 - 2], dtype=np.int64), "x": 1.5})
+    assert duplicated_rows(df, verify=False).tolist() == [False, False, True, False, False]
+    deduplicador = StreamingDeduplicator()
+    assert len(deduplicador.filter(df)) == 4
+    sin_signo = pd.DataFrame({"id": np.array([2**64 - 1, 2**64 - 2, 2**63 - 1], dtype=np.uint64)})
+    assert len(StreamingDeduplicator().filter(sin_signo)) == 3
+
+
+def test_numeric_keys_do_not_depend_on_dtype():
+    enteros = pd.DataFrame({"a": np.array([1, 2, 3], dtype=np.int64), "b": ["x", "y", "z"]})
+    # El mismo bloque leído con un NULL: la columna llega como float64
+    flotantes = pd.DataFrame({"a": [1.0, np.nan, 3.5, -0.0], "b": ["x", "y", "z", "w"]})
+    assert np.array_equal(row_hashes(enteros)[[0]], row_hashes(flotantes)[[0]])
+    assert row_hashes(pd.DataFrame({"a": [0]}))[0] == row_hashes(pd.DataFrame({"a": [-0.0]}))[0]
+    assert row_hashes(pd.DataFrame({"a": pd.array([1, None], dtype="Int64")})).tolist() == row_hashes(pd.DataFrame({"a": [1.0, np.nan]})).tolist()
+    # Un float no entero nunca coincide con el entero que comparte sus bits
+    bits = np.array([0.5]).view(np.int64)[0]
+    assert row_hashes(pd.DataFrame({"a": [0.5]}))[0] != row_hashes(pd.DataFrame({"a": [bits]}))[0]
+    deduplicador = StreamingDeduplicator()
+    deduplicador.filter(enteros)
+    assert deduplicador.filter(flotantes)["b"].tolist() == ["y", "z", "w"]
+
+
+def test_dedup_counts_match_pandas():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "a": rng.integers(0, 4, 5000),
+        "b": rng.integers(0, 3, 5000).astype(float),
+        "c": rng.choice(["x", "y", None], 5000),
+    })
+    df.loc[rng.choice(5000, 300, replace=False), "b"] = np.nan
+    esperado = df.duplicated()
+    assert np.array_equal(duplicated_rows(df), esperado.to_numpy())
+    assert np.array_equal(duplicated_rows(df, subset=["a", "c"]), df.duplicated(subset=["a", "c"]).to_numpy())
+    assert drop_duplicate_rows(df.copy(), inplace=True)[1] == int(esperado.sum())
+    deduplicador = StreamingDeduplicator()
+    filas = sum(len(bloque) for bloque in deduplicador(df.iloc[i:i + 700] for i in range(0, len(df), 700)))
+    assert filas == len(df.drop_duplicates()) and deduplicador.removed == int(esperado.sum())
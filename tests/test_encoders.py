@@ -0,0 +1,66 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from encoders import UNSEEN, CategoryEncoder, EncoderRegistry, encode_column
+
+
+@pytest.mark.parametrize("valores, nuevo", [
+    (["sur", "norte", None, "sur", "este"], "oeste"),
+    ([3, 1, 3, 2], 7),
+    ([2.5, None, 1.0, 2.5], 9.5),
+    ([True, False, None, True], None),
+])
+def test_rules_roundtrip_keeps_types(tmp_path, valores, nuevo):
+    serie = pd.Series(valores, dtype=object)
+    encoder = CategoryEncoder.fit(serie, name="x_n")
+    ruta = str(tmp_path / "x_n_transformation_rules.json")
+    encoder.save_rules(ruta)
+    copia = CategoryEncoder.from_rules(ruta, name="x_n")
+
+    assert list(copia.categories) == list(encoder.categories)
+    assert [type(c) for c in copia.categories] == [type(c) for c in encoder.categories]
+    assert copia.missing == encoder.missing
+    lote = pd.Series(list(valores) + [nuevo], dtype=object)
+    np.testing.assert_array_equal(copia.transform(lote), encoder.transform(lote))
+    # Las categorías no vistas y los faltantes reciben UNSEEN
+    codigos = copia.transform(lote)
+    assert codigos[-1] == UNSEEN
+    assert (codigos[serie.isna().to_numpy().nonzero()[0]] == UNSEEN).all()
+
+
+def test_rules_with_text_categories_stay_text(tmp_path):
+    serie = pd.Series(["a", "1", "b"])
+    ruta = str(tmp_path / "reglas.json")
+    CategoryEncoder.fit(serie).save_rules(ruta)
+    assert list(CategoryEncoder.from_rules(ruta).categories) == ["a", "1", "b"]
+
+
+def test_transform_categorical_input_and_inverse():
+    encoder = CategoryEncoder.fit(pd.Series(["b", "a", "b", None]), name="c_n")
+    lote = pd.Series(["a", "z", None, "b"], dtype="category")
+    codigos = encoder.transform(lote)
+    assert codigos.dtype == np.int8
+    assert codigos.tolist() == [1, UNSEEN, UNSEEN, 0]
+    assert encoder.transform(lote.astype(object), dtype=np.int64).tolist() == [1, UNSEEN, UNSEEN, 0]
+    assert encoder.inverse_transform(codigos).tolist() == ["a", None, None, "b"]
+    assert json.dumps(encoder.rules()) == '{"b": 0, "a": 1, "NaN": -1}'
+
+
+def test_registry_and_encode_column_roundtrip(tmp_path):
+    df = pd.DataFrame({"Region": ["norte", "sur", None, "norte"], "Nivel": [2, 1, 2, 3]})
+    ruta_registro = str(tmp_path / "encoders.json")
+    encoder = encode_column(df, "Region", "Region_n", str(tmp_path / "Region_n_transformation_rules.json"), ruta_registro)
+    assert df["Region_n"].tolist() == [0, 1, -1, 0] and df["Region_n"].dtype == np.int64
+    EncoderRegistry().fit(df, {"Nivel": "Nivel_n"}).update(ruta_registro)
+
+    registro = EncoderRegistry.load(ruta_registro)
+    assert set(registro.encoders) == {"Region", "Nivel"}
+    assert list(registro.encoders["Nivel"].categories) == [2, 1, 3]
+    nuevos = pd.DataFrame({"Region": ["sur", "islas"], "Nivel": [3, 4]})
+    codigos = registro.transform(nuevos)
+    assert codigos["Region_n"].tolist() == [1, UNSEEN] and codigos["Nivel_n"].tolist() == [2, UNSEEN]
+    assert list(registro.encoders["Region"].categories) == list(encoder.categories)
+    assert EncoderRegistry.load(str(tmp_path / "no_existe.json"), missing_ok=True).encoders == {}
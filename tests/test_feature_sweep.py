@@ -0,0 +1,48 @@
+import json
+import os
+
+from sklearn.feature_selection import SelectKBest, f_classif
+
+import feature_sweep
+from conftest import COLUMNAS, diabetes_like
+from feature_sweep import anova_scores, feature_selection_sweep
+
+
+def test_sweep_matches_select_k_best_without_missing():
+    df = diabetes_like(1500, seed=5)
+    X, y = df[COLUMNAS], df["Outcome"]
+    resultados = feature_selection_sweep({"X_train_con_outliers": X}, y, ks=(3, 5), guardar=False, max_workers=1)
+    for k in (3, 5):
+        esperado = list(X.columns[SelectKBest(f_classif, k=k).fit(X, y).get_support()])
+        assert resultados["X_train_con_outliers"]["selections"][k] == esperado
+
+
+def test_sweep_scores_columns_with_missing_over_present_rows(workdir):
+    df = diabetes_like(1500, seed=6, missing=0.02)
+    X, y = df[COLUMNAS], df["Outcome"]
+    limpio = X.fillna(X.median())
+    resultados = feature_selection_sweep({"X_train_con_outliers": X, "X_train_sin_outliers": limpio}, y, ks=(7, 8), test_datasets={"X_train_con_outliers": X.iloc[:200], "X_train_sin_outliers": limpio.iloc[:200]}, y_test=y.iloc[:200], ruta_json="../data/processed/Json", ruta_modelo="../models/", max_workers=1)
+
+    scores = resultados["X_train_con_outliers"]["scores"]["score"]
+    for col in COLUMNAS:
+        presentes = X[col].notna().to_numpy()
+        assert scores[col] == f_classif(X.loc[presentes, [col]], y[presentes])[0][0]
+    assert "Glucose" in resultados["X_train_con_outliers"]["selections"][7]
+    assert os.path.exists(os.path.join("../models", "x_test_sel_X_train_con_outliers_k_8.parquet"))
+    with open(os.path.join("../data/processed/Json", "featureselection_sweep.json")) as f:
+        assert all(v is not None for v in json.load(f)["X_train_con_outliers"]["scores"].values())
+
+
+def test_scores_cache_is_keyed_on_content():
+    feature_sweep._SCORES_CACHE.clear()
+    df = diabetes_like(500, seed=7)
+    X, y = df[COLUMNAS], df["Outcome"]
+    primera = anova_scores({"a": X}, y, max_workers=1)["a"]
+    assert anova_scores({"b": X.copy()}, y.copy(), max_workers=1)["b"] is primera
+    assert len(feature_sweep._SCORES_CACHE) == 1
+
+    otro = X.copy()
+    otro.iloc[0, 0] += 1
+    assert anova_scores({"c": otro}, y, max_workers=1)["c"] is not primera
+    assert anova_scores({"e": X.rename(columns={"Age": "Edad"})}, y, max_workers=1)["e"] is not primera
+    assert len(feature_sweep._SCORES_CACHE) == 3
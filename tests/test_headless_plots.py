@@ -0,0 +1,61 @@
+import importlib
+import sys
+import tracemalloc
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import COLUMNAS, diabetes_like
+import headless_plots
+import profiling
+from headless_plots import render_pair_histograms, render_pairplot
+
+
+def test_renders_leave_tracemalloc_as_found(tmp_path):
+    df = diabetes_like(rows=3000)
+    assert not tracemalloc.is_tracing()
+    informe = render_pair_histograms(df, COLUMNAS[:3], ruta_salida=str(tmp_path), bins=20, max_workers=1)
+    assert not tracemalloc.is_tracing()
+    assert informe["panels"] == 3 and informe["peak_memory_mb"] > 0
+
+    tracemalloc.start()
+    try:
+        retenido = bytearray(8 * 2**20)
+        informe = render_pairplot(df, COLUMNAS[:3], ruta_salida=str(tmp_path), bins=20)
+        # El trazado del llamador sigue activo y su memoria no se cuenta como pico del gráfico
+        assert tracemalloc.is_tracing()
+        assert tracemalloc.get_traced_memory()[0] >= len(retenido)
+        assert 0 < informe["peak_memory_mb"] < 8
+    finally:
+        tracemalloc.stop()
+
+
+def test_tracing_stops_when_aggregation_fails(tmp_path, monkeypatch):
+    def falla(*args, **kwargs):
+        raise MemoryError("sin memoria")
+
+    monkeypatch.setattr(headless_plots, "aggregate_columns", falla)
+    with pytest.raises(MemoryError):
+        render_pairplot(diabetes_like(rows=100), COLUMNAS[:3], ruta_salida=str(tmp_path))
+    assert not tracemalloc.is_tracing()
+
+
+def test_budget_report_without_resource_module(tmp_path, monkeypatch):
+    # Sin `resource` (Windows) el módulo se importa y el informe deja el pico de los workers en None
+    try:
+        with monkeypatch.context() as parche:
+            parche.setitem(sys.modules, "resource", None)
+            recargado = importlib.reload(headless_plots)
+            informe = recargado.render_pair_histograms(diabetes_like(rows=200), COLUMNAS[:2], ruta_salida=str(tmp_path), bins=10, max_workers=1)
+        assert informe["workers_max_rss_mb"] is None
+    finally:
+        importlib.reload(headless_plots)
+
+
+def test_max_rss_units_per_platform(monkeypatch):
+    resource = pytest.importorskip("resource")
+    monkeypatch.setattr(resource, "getrusage", lambda quien: SimpleNamespace(ru_maxrss=512 * 2**20))
+    monkeypatch.setattr(sys, "platform", "darwin")
+    assert profiling.max_rss_mb() == 512
+    monkeypatch.setattr(sys, "platform", "linux")
+    assert profiling.max_rss_mb(children=True) == 512 * 1024
@@ -0,0 +1,33 @@
+import math
+
+import pandas as pd
+
+from conftest import COLUMNAS, diabetes_like
+from hyperparam_search import halving_search
+
+REJILLA = {"max_depth": [2, 3, 4, 5, 6, 8, None], "min_samples_leaf": [1, 2, 5, 10, 20], "criterion": ["gini", "entropy"]}
+
+
+def _rondas(resultado):
+    return resultado["results"].groupby("round")["n_resources"].agg(["first", "size"])
+
+
+def test_halving_rounds_are_capped_by_resources():
+    df = diabetes_like(rows=150)
+    datasets = {"con": df[COLUMNAS], "sin": df[COLUMNAS].round()}
+    resultado = halving_search(datasets, df["Outcome"], REJILLA, n_iter=40, cv=3, factor=3, max_workers=1)
+    rondas = _rondas(resultado)
+    n_max = 100
+    minimo = 2 * 3 * 2
+    assert len(rondas) <= 1 + math.floor(math.log(n_max / minimo, 3))
+    assert rondas["first"].iloc[0] >= minimo
+    assert rondas["first"].is_monotonic_increasing and rondas["first"].is_unique
+    assert rondas["first"].iloc[-1] == n_max
+    assert resultado["best_dataset"] in datasets
+
+
+def test_halving_min_resources_floor_scales_with_classes_and_folds():
+    df = diabetes_like(rows=600)
+    df["Outcome"] = pd.qcut(df["Glucose"].rank(method="first"), 4, labels=False)
+    resultado = halving_search({"con": df[COLUMNAS]}, df["Outcome"], REJILLA, n_iter=30, cv=5, factor=2, min_resources=4, max_workers=1)
+    assert _rondas(resultado)["first"].iloc[0] == 2 * 5 * 4
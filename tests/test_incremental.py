@@ -0,0 +1,123 @@
+import json
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_selection import f_classif
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+
+from conftest import COLUMNAS, diabetes_like
+from incremental import SCALERS, ClassMoments, IncrementalState, bootstrap_state, refresh_artifacts
+from outliers import OutlierClipper
+
+
+def _f_por_columna(X, y):
+    """f_classif columna a columna sobre las filas sin faltantes en cada columna."""
+    scores = []
+    for col in X.columns:
+        presentes = X[col].notna().to_numpy()
+        scores.append(f_classif(X.loc[presentes, [col]], y[presentes])[0][0])
+    return np.array(scores)
+
+
+def test_class_moments_ignore_missing_per_column():
+    df = diabetes_like(3000, seed=1, missing=0.05)
+    momentos = ClassMoments(COLUMNAS)
+    for inicio in range(0, len(df), 750):
+        lote = df.iloc[inicio:inicio + 750]
+        momentos.update(lote[COLUMNAS], lote["Outcome"])
+    scores, pvalues = momentos.f_scores()
+    assert np.isfinite(scores).all()
+    np.testing.assert_allclose(scores, _f_por_columna(df[COLUMNAS], df["Outcome"].to_numpy()), rtol=1e-9)
+    assert np.isfinite(pvalues).all()
+
+
+def test_class_moments_roundtrip():
+    df = diabetes_like(500, seed=2, missing=0.05)
+    momentos = ClassMoments(COLUMNAS).update(df[COLUMNAS], df["Outcome"])
+    copia = ClassMoments.from_dict(json.loads(json.dumps(momentos.to_dict())))
+    np.testing.assert_array_equal(copia.f_scores()[0], momentos.f_scores()[0])
+
+
+def _preparar(historico, ruta_json, ruta_modelo):
+    """Artefactos de una ejecución completa: límites exactos, scalers del train y estado incremental."""
+    bootstrap_state(historico, ruta_json=ruta_json)
+    OutlierClipper().fit(historico, COLUMNAS).to_json(os.path.join(ruta_json, "outliers_dict.json"))
+    train_hist, _ = train_test_split(historico, test_size=0.2, random_state=42)
+    for nombre in SCALERS:
+        scaler = StandardScaler() if nombre.startswith("normalizador") else MinMaxScaler()
+        with open(os.path.join(ruta_modelo, nombre), "wb") as file:
+            pickle.dump(scaler.fit(train_hist[sorted(COLUMNAS)]), file)
+    return train_hist
+
+
+def _contenidos(*rutas):
+    return {ruta: open(ruta, "rb").read() for ruta in rutas}
+
+
+def test_refresh_keeps_exact_bounds_and_skips_empty_batches(workdir):
+    ruta_json, ruta_modelo = "../data/processed/Json", "../models/"
+    historico = diabetes_like(2000, seed=3)
+    _preparar(historico, ruta_json, ruta_modelo)
+    ruta_outliers = os.path.join(ruta_json, "outliers_dict.json")
+    exactos = OutlierClipper.from_json(ruta_outliers).bounds
+    artefactos = [ruta_outliers, os.path.join(ruta_json, "incremental_state.json")] + [os.path.join(ruta_modelo, nombre) for nombre in SCALERS]
+    antes = _contenidos(*artefactos)
+
+    # Un lote ya visto (todo duplicado) no reescribe nada
+    informe = refresh_artifacts(historico.iloc[:100], ruta_json=ruta_json, ruta_modelo=ruta_modelo)
+    assert informe["new_rows"] == 0 and set(informe["bounds_shift"].values()) == {0.0}
+    assert _contenidos(*artefactos) == antes
+
+    # Un lote nuevo mueve los límites exactos lo que se mueve el sketch, y el informe lo mide contra el fichero
+    informe = refresh_artifacts(diabetes_like(300, seed=9), ruta_json=ruta_json, ruta_modelo=ruta_modelo)
+    nuevos = OutlierClipper.from_json(ruta_outliers).bounds
+    for col in COLUMNAS:
+        assert informe["bounds_shift"][col] == pytest.approx(np.max(np.abs(np.subtract(nuevos[col], exactos[col]))))
+        assert np.max(np.abs(np.subtract(nuevos[col], exactos[col]))) < 0.1 * (exactos[col][1] - exactos[col][0])
+
+
+def test_refresh_commits_artifacts_after_the_state(workdir, monkeypatch):
+    ruta_json, ruta_modelo = "../data/processed/Json", "../models/"
+    _preparar(diabetes_like(2000, seed=3), ruta_json, ruta_modelo)
+    existentes = [os.path.join(ruta_json, "outliers_dict.json")] + [os.path.join(ruta_modelo, nombre) for nombre in SCALERS]
+    antes = _contenidos(*existentes)
+
+    def falla(self, ruta_json):
+        raise OSError("disco lleno")
+
+    with monkeypatch.context() as parche:
+        parche.setattr(IncrementalState, "save", falla)
+        with pytest.raises(OSError):
+            refresh_artifacts(diabetes_like(300, seed=9), ruta_json=ruta_json, ruta_modelo=ruta_modelo)
+    # Sin estado guardado, ningún artefacto tiene el lote aplicado y el reintento lo aplica una sola vez
+    assert _contenidos(*existentes) == antes
+    informe = refresh_artifacts(diabetes_like(300, seed=9), ruta_json=ruta_json, ruta_modelo=ruta_modelo)
+    assert informe["new_rows"] == 300
+    with open(os.path.join(ruta_modelo, "normalizador_con_outliers.pkl"), "rb") as file:
+        assert pickle.load(file).n_samples_seen_ == 1600 + 240
+
+
+def test_refresh_matches_full_recompute_with_missing(workdir):
+    ruta_json, ruta_modelo = "../data/processed/Json", "../models/"
+    historico = diabetes_like(2000, seed=3)
+    lote = diabetes_like(600, seed=4, missing=0.05)
+    lote.loc[lote.index[0], "Glucose"] = np.nan
+
+    train_hist = _preparar(historico, ruta_json, ruta_modelo)
+
+    refresh_artifacts(lote, ruta_json=ruta_json, ruta_modelo=ruta_modelo)
+
+    # Mismos repartos que IncrementalState.split: random_state + número de lotes ya incorporados
+    train_lote, _ = train_test_split(lote, test_size=0.2, random_state=43)
+    train = pd.concat([train_hist, train_lote])
+    esperado = _f_por_columna(train[sorted(COLUMNAS)], train["Outcome"].to_numpy())
+    with open(os.path.join(ruta_json, "featureselection_sweep.json")) as f:
+        sweep = json.load(f)
+    scores = sweep["X_train_con_outliers"]["scores"]
+    np.testing.assert_allclose([scores[col] for col in sorted(COLUMNAS)], esperado, rtol=1e-9)
+    with open(os.path.join(ruta_json, "featureselection_X_train_con_outliers_k_7.json")) as f:
+        assert "Glucose" in json.load(f)
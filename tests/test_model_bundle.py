@@ -0,0 +1,110 @@
+import json
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+from conftest import COLUMNAS, diabetes_like
+from model_bundle import _PREFIJO, FORMAT_VERSION, MAGIC, ModelBundle, build_bundle, write_bundle
+from outliers import OutlierClipper
+from tree_engine import CompiledTree
+
+
+@pytest.fixture
+def artefactos(workdir):
+    """Modelo entrenado con datos recortados y normalizados, con sus scalers, límites y selecciones en disco."""
+    train = diabetes_like(2000, seed=21).fillna(0)
+    clipper = OutlierClipper().fit(train, COLUMNAS)
+    clipper.to_json("../data/processed/Json/outliers_dict.json")
+    recortado = clipper.transform(train[COLUMNAS])
+    scalers = {"normalizador_sin_outliers.pkl": StandardScaler().fit(recortado), "scaler_sin_outliers.pkl": MinMaxScaler().fit(recortado)}
+    for nombre, scaler in scalers.items():
+        with open(os.path.join("../models", nombre), "wb") as file:
+            pickle.dump(scaler, file)
+    X = scalers["normalizador_sin_outliers.pkl"].transform(recortado)
+    model = DecisionTreeClassifier(max_depth=7, random_state=0).fit(pd.DataFrame(X, columns=COLUMNAS), train["Outcome"])
+    with open("../models/Decision_tree_model.sav", "wb") as file:
+        pickle.dump(model, file)
+    with open("../data/processed/Json/featureselection_k_5.json", "w") as f:
+        json.dump(COLUMNAS[:5], f)
+    ruta = build_bundle(scaler="normalizador_sin_outliers.pkl", clip=True)
+    return ruta, model, clipper, scalers
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_bundle_roundtrip(artefactos, mmap):
+    ruta, model, clipper, scalers = artefactos
+    bundle = ModelBundle.open(ruta, mmap=mmap)
+    arbol = CompiledTree.from_estimator(model)
+    for nombre, valores in arbol.to_arrays().items():
+        np.testing.assert_array_equal(bundle.tree.to_arrays()[nombre], valores)
+    assert bundle.feature_names == COLUMNAS
+    assert bundle.clipper.bounds == clipper.bounds
+    assert bundle.selections == {"featureselection_k_5": COLUMNAS[:5]}
+    for nombre, scaler in scalers.items():
+        copia = bundle.scalers[os.path.splitext(nombre)[0]]
+        X = diabetes_like(300, seed=22)[COLUMNAS]
+        np.testing.assert_array_equal(copia.transform(X.to_numpy()), scaler.transform(X))
+    if mmap:
+        assert not bundle.arrays["tree/threshold"].flags.writeable
+
+    test = diabetes_like(1000, seed=23).fillna(0)
+    escalado = scalers["normalizador_sin_outliers.pkl"].transform(clipper.transform(test[COLUMNAS]))
+    esperado = model.predict_proba(pd.DataFrame(escalado, columns=COLUMNAS))
+    np.testing.assert_array_equal(bundle.engine().predict_proba(test), esperado)
+
+
+def test_bundle_with_text_classes(tmp_path):
+    df = diabetes_like(500, seed=24)
+    model = DecisionTreeClassifier(max_depth=4, random_state=0).fit(df[COLUMNAS], df["Outcome"].map({0: "no", 1: "si"}))
+    ruta = write_bundle(str(tmp_path / "bundle.bin"), CompiledTree.from_estimator(model), COLUMNAS)
+    bundle = ModelBundle.open(ruta)
+    assert bundle.engine().predict(df[COLUMNAS]).tolist() == model.predict(df[COLUMNAS]).tolist()
+
+
+def _reescribir(ruta, posicion, datos):
+    with open(ruta, "r+b") as f:
+        f.seek(posicion)
+        f.write(datos)
+
+
+def test_bundle_rejects_other_files_and_newer_versions(artefactos, tmp_path):
+    ruta = artefactos[0]
+    with open(ruta, "rb") as f:
+        original = f.read()
+
+    corto = tmp_path / "corto.bin"
+    corto.write_bytes(original[:10])
+    with pytest.raises(ValueError, match="demasiado corto"):
+        ModelBundle.open(str(corto))
+
+    _reescribir(ruta, 0, b"NOBUNDLE")
+    with pytest.raises(ValueError, match="no es un bundle"):
+        ModelBundle.open(ruta)
+
+    _reescribir(ruta, 0, MAGIC + (FORMAT_VERSION + 1).to_bytes(4, "little"))
+    with pytest.raises(ValueError, match=f"versión {FORMAT_VERSION + 1}"):
+        ModelBundle.open(ruta)
+
+
+def test_bundle_detects_corrupted_arrays(artefactos):
+    ruta = artefactos[0]
+    bundle = ModelBundle.open(ruta, mmap=False)
+    with open(ruta, "rb") as f:
+        inicio_datos = _PREFIJO.unpack(f.read(_PREFIJO.size))[3]
+    info = bundle.header["arrays"]["tree/threshold"]
+    posicion = inicio_datos + info["offset"] + 8
+    with open(ruta, "rb") as f:
+        f.seek(posicion)
+        byte = f.read(1)
+    del bundle
+    _reescribir(ruta, posicion, bytes([byte[0] ^ 0xFF]))
+
+    with pytest.raises(ValueError, match="'tree/threshold'.*crc32"):
+        ModelBundle.open(ruta)
+    # Sin verificar se abre (p. ej. para inspeccionarlo), con el array tal como está en disco
+    assert ModelBundle.open(ruta, verify=False).arrays["tree/threshold"].nbytes == info["nbytes"]
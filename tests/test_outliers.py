@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+from conftest import COLUMNAS, diabetes_like
+from outliers import OutlierClipper
+
+
+def test_transform_keeps_int_dtype_when_nothing_is_clipped():
+    df = pd.DataFrame({"a": np.array([1, 2, 3], dtype=np.int64), "b": np.array([2**60 + 1, 2**60, 5], dtype=np.int64), "c": [0.5, 1.0, 2.0]})
+    resultado = OutlierClipper({"a": [0, 10], "b": [0, 2.0**62], "c": [0, 10]}).transform(df)
+    assert resultado.dtypes.to_dict() == df.dtypes.to_dict()
+    # Sin pasar por float64: 2**60 + 1 no se redondea
+    assert resultado["b"].tolist() == df["b"].tolist()
+
+
+def test_transform_clips_like_the_original_loop():
+    df = diabetes_like(rows=500, missing=0.05)
+    df["Age"] = df["Age"].fillna(30).astype(np.int64)
+    clipper = OutlierClipper().fit(df, COLUMNAS)
+    resultado = clipper.transform(df)
+    for col, (lo, hi) in clipper.bounds.items():
+        esperado = df[col].where(df[col] >= lo, lo).where(df[col] <= hi, hi).where(df[col].notna())
+        np.testing.assert_array_equal(resultado[col].to_numpy(dtype=np.float64), esperado.to_numpy(dtype=np.float64))
+    enteros = OutlierClipper({"n": [0, 5]}).transform(pd.DataFrame({"n": pd.array([1, 9, None], dtype="Int64")}))
+    assert str(enteros["n"].dtype) == "Int64" and enteros["n"].tolist()[:2] == [1, 5]
+    decimales = OutlierClipper({"n": [0, 5.5]}).transform(pd.DataFrame({"n": np.array([1, 9], dtype=np.int64)}))
+    assert decimales["n"].tolist() == [1.0, 5.5]
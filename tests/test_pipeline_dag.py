@@ -0,0 +1,63 @@
+import os
+
+from conftest import diabetes_like
+from pipeline_dag import Pipeline, Stage, build_auto_eda_pipeline, code_version
+
+
+def _estados(informe):
+    return {fila["stage"]: fila["status"] for fila in informe}
+
+
+def _escribe(df, ruta):
+    df.to_csv(ruta, index=False)
+    return len(df)
+
+
+def test_cache_miss_when_output_file_is_missing(tmp_path):
+    ruta = str(tmp_path / "salida.csv")
+    pipeline = Pipeline([Stage("escribe", _escribe, ["raw"], params={"ruta": ruta}, outputs=[ruta])], ruta_cache=str(tmp_path / "cache"))
+    datos = {"raw": diabetes_like(rows=50)}
+    assert _estados(pipeline.run(datos)[1]) == {"escribe": "run"}
+    assert _estados(pipeline.run(datos)[1]) == {"escribe": "cache"}
+    os.remove(ruta)
+    assert _estados(pipeline.run(datos)[1]) == {"escribe": "run"}
+    assert os.path.exists(ruta)
+
+
+def test_auto_eda_pipeline_reruns_only_stages_with_missing_files(workdir):
+    datos = {"raw": diabetes_like(rows=300)}
+    pipeline = build_auto_eda_pipeline(ks=(7,), max_workers=2)
+    pipeline.run(datos)
+    assert set(_estados(pipeline.run(datos)[1]).values()) == {"cache"}
+    os.remove(workdir / "models" / "scaler_sin_outliers.pkl")
+    estados = _estados(pipeline.run(datos)[1])
+    assert estados["scale_min_max_data_1"] == "run"
+    assert estados["normalize_data"] == estados["feature_scaling"] == estados["feature_selection"] == "cache"
+    assert (workdir / "models" / "scaler_sin_outliers.pkl").exists()
+
+
+def test_auto_eda_outputs_match_their_data_after_switching_inputs(workdir):
+    a, b = {"raw": diabetes_like(rows=300, seed=1)}, {"raw": diabetes_like(rows=300, seed=2)}
+    pipeline = build_auto_eda_pipeline(ks=(7,), max_workers=2)
+    ruta = workdir / "data" / "processed" / "Json" / "outliers_dict.json"
+    pipeline.run(a)
+    limites_a = ruta.read_text()
+    pipeline.run(b)
+    assert ruta.read_text() != limites_a
+    # Las entradas de A siguen en la caché, pero sus ficheros tienen ahora los valores de B
+    estados = _estados(pipeline.run(a)[1])
+    assert estados["replace_outliers"] == estados["feature_scaling"] == estados["scale_min_max_data_1"] == "run"
+    assert estados["clean_duplicates"] == "cache"
+    assert ruta.read_text() == limites_a
+    assert set(_estados(pipeline.run(a)[1]).values()) == {"cache"}
+
+
+def test_code_version_follows_project_imports(tmp_path, monkeypatch):
+    (tmp_path / "auxiliar.py").write_text("def doble(x):\n    return 2 * x\n")
+    (tmp_path / "etapas.py").write_text("def etapa(x):\n    from auxiliar import doble\n    return doble(x)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    import etapas
+
+    antes = code_version(etapas.etapa)
+    (tmp_path / "auxiliar.py").write_text("def doble(x):\n    return x + x\n")
+    assert code_version(etapas.etapa) != antes
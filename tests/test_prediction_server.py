@@ -0,0 +1,111 @@
+import asyncio
+import json
+
+import pytest
+from sklearn.tree import DecisionTreeClassifier
+
+from conftest import COLUMNAS, diabetes_like
+from prediction_server import MicroBatcher, PredictionServer
+from tree_engine import CompiledTree, InferenceEngine
+
+
+@pytest.fixture(scope="module")
+def modelo():
+    df = diabetes_like(rows=2000, seed=3)
+    model = DecisionTreeClassifier(max_depth=6, random_state=0).fit(df[COLUMNAS], df["Outcome"])
+    return model, diabetes_like(rows=40, seed=4)[COLUMNAS]
+
+
+def _peticion(method, path, body=None, headers=None):
+    data = b"" if body is None else (body if isinstance(body, bytes) else json.dumps(body).encode())
+    cabeceras = {"Host": "localhost", "Content-Length": str(len(data)), **(headers or {})}
+    return f"{method} {path} HTTP/1.1\r\n".encode() + "".join(f"{k}: {v}\r\n" for k, v in cabeceras.items()).encode() + b"\r\n" + data
+
+
+async def _leer_respuesta(reader):
+    estado = int((await reader.readline()).split()[1])
+    headers = {}
+    while (linea := await reader.readline()) not in (b"\r\n", b""):
+        nombre, _, valor = linea.decode().partition(":")
+        headers[nombre.strip().lower()] = valor.strip()
+    return estado, headers, json.loads(await reader.readexactly(int(headers["content-length"])))
+
+
+async def _enviar(port, raw):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(raw)
+        await writer.drain()
+        respuesta = await _leer_respuesta(reader)
+        cerrada = await reader.read() == b"" if respuesta[1]["connection"] == "close" else False
+        return (*respuesta, cerrada)
+    finally:
+        writer.close()
+
+
+def _con_servidor(engine, prueba, **kwargs):
+    async def principal():
+        servidor = PredictionServer(engine, **kwargs)
+        servidor.batcher.start()
+        tcp = await asyncio.start_server(servidor.handle, "127.0.0.1", 0)
+        try:
+            return await prueba(servidor, tcp.sockets[0].getsockname()[1])
+        finally:
+            tcp.close()
+            await tcp.wait_closed()
+            await servidor.batcher.stop()
+
+    return asyncio.run(principal())
+
+
+def test_concurrent_requests_are_micro_batched(modelo):
+    model, X = modelo
+    engine = InferenceEngine.from_model(model, feature_names=COLUMNAS)
+
+    async def prueba(servidor, port):
+        peticiones = [_peticion("POST", "/predict", {"features": fila}) for fila in X.to_dict(orient="records")]
+        respuestas = await asyncio.gather(*(_enviar(port, raw) for raw in peticiones))
+        metricas = await _enviar(port, _peticion("GET", "/metrics"))
+        return respuestas, metricas
+
+    respuestas, (estado, _, metricas, _) = _con_servidor(engine, prueba, max_batch_size=16, max_wait_ms=50)
+    assert all(r[0] == 200 for r in respuestas)
+    assert [r[2]["prediction"] for r in respuestas] == model.predict(X).tolist()
+    assert [r[2]["probability"] for r in respuestas] == model.predict_proba(X).tolist()
+
+    assert estado == 200
+    lotes = metricas["batch_size"]
+    assert lotes["sum"] == len(X) and lotes["count"] < len(X)
+    assert metricas["latency_ms"]["count"] == len(X) and metricas["errors"] == 0
+
+
+def test_batch_prediction_walks_the_tree_once(modelo, monkeypatch):
+    model, X = modelo
+    engine = InferenceEngine.from_model(model, feature_names=COLUMNAS)
+    recorridos = []
+    apply = CompiledTree.apply
+    monkeypatch.setattr(CompiledTree, "apply", lambda self, datos: recorridos.append(len(datos)) or apply(self, datos))
+    pred, proba = MicroBatcher(engine)._predict(X.to_numpy())
+    assert recorridos == [len(X)]
+    assert pred.tolist() == model.predict(X).tolist() and proba.tolist() == model.predict_proba(X).tolist()
+
+
+def test_bad_requests_get_400(modelo):
+    model, X = modelo
+    engine = InferenceEngine.from_model(model, feature_names=COLUMNAS)
+
+    async def prueba(servidor, port):
+        return (
+            await _enviar(port, _peticion("POST", "/predict", b"{no es json")),
+            await _enviar(port, _peticion("POST", "/predict", {"features": {"Glucose": 120}})),
+            await _enviar(port, _peticion("POST", "/predict", b"{}", headers={"Content-Length": "dos"})),
+            await _enviar(port, _peticion("POST", "/predict", b"{}", headers={"Content-Length": "-1"})),
+        )
+
+    json_malo, faltan, longitud_texto, longitud_negativa = _con_servidor(engine, prueba)
+    assert json_malo[0] == 400 and json_malo[1]["connection"] == "keep-alive"
+    assert faltan[0] == 400 and "Faltan columnas" in faltan[2]["error"]
+    # Con un Content-Length no válido se responde 400 y se cierra la conexión
+    for estado, headers, cuerpo, cerrada in (longitud_texto, longitud_negativa):
+        assert estado == 400 and headers["connection"] == "close" and cerrada
+        assert "Content-Length" in cuerpo["error"]
@@ -0,0 +1,84 @@
+import json
+import sys
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import bench_auto_eda
+import bench_db
+import profiling
+import utils
+from conftest import COLUMNAS, diabetes_like
+from outliers import OutlierClipper
+from profiling import CAMPOS, Profiler
+
+
+def test_profiler_records_nested_stages_and_shapes(tmp_path, monkeypatch):
+    reinicios = []
+    monkeypatch.setattr(profiling, "_reset_rss_peak", lambda: reinicios.append(1) or True)
+    profiler = Profiler(trace_memory=True)
+    df = diabetes_like(500)
+
+    with profiler.stage("externa", df) as frame:
+        doble = profiler.wrap(lambda datos: pd.concat([datos, datos]), "doble")(df)
+        frame["output"] = np.zeros((3, 2))
+    with pytest.raises(ValueError):
+        with profiler.stage("falla"):
+            raise ValueError("mal")
+
+    por_etapa = {r["stage"]: r for r in profiler.records}
+    assert list(por_etapa) == ["doble", "externa", "falla"]
+    assert por_etapa["doble"]["parent"] == "externa" and por_etapa["doble"]["depth"] == 1
+    assert (por_etapa["doble"]["rows_in"], por_etapa["doble"]["rows_out"]) == (500, len(doble))
+    assert (por_etapa["externa"]["rows_out"], por_etapa["externa"]["cols_out"]) == (3, 2)
+    assert por_etapa["externa"]["peak_traced_mb"] >= por_etapa["doble"]["peak_traced_mb"] > 0
+    assert por_etapa["falla"]["error"] == "ValueError: mal"
+    # El pico de RSS del proceso solo se reinicia si se pide
+    assert reinicios == []
+
+    ruta_json, ruta_csv = profiler.save(str(tmp_path), nombre="perfil", metadata={"caso": 1})
+    with open(ruta_json) as f:
+        informe = json.load(f)
+    assert informe["metadata"] == {"caso": 1} and len(informe["stages"]) == 3
+    assert list(pd.read_csv(ruta_csv).columns) == CAMPOS
+    assert profiler.summary()["stage"].iloc[0] in por_etapa
+
+
+def test_profiler_resets_rss_peak_when_asked(monkeypatch):
+    reinicios = []
+    monkeypatch.setattr(profiling, "_reset_rss_peak", lambda: reinicios.append(1) or True)
+    profiler = Profiler(trace_memory=False, reset_rss_peak=True)
+    modulo = types.ModuleType("modulo_prueba")
+    exec("def suma(a, b):\n    return a + b\n", modulo.__dict__)
+    with profiler.instrument(modulo):
+        assert modulo.suma(1, 2) == 3
+    assert modulo.suma.__name__ == "suma" and not hasattr(modulo.suma, "__wrapped__")
+    assert [r["stage"] for r in profiler.records] == ["suma"]
+    assert profiler.records[0]["peak_traced_mb"] is None
+    assert len(reinicios) == 2
+
+
+def test_bench_auto_eda_smoke(tmp_path, monkeypatch):
+    ruta_bounds = tmp_path / "outliers_dict.json"
+    OutlierClipper().fit(diabetes_like(1000), COLUMNAS).to_json(str(ruta_bounds))
+    salida = tmp_path / "benchmarks"
+    monkeypatch.setattr(sys, "argv", ["bench_auto_eda.py", "--sizes", "2k", "--widths", "8,12", "--bounds", str(ruta_bounds), "--out", str(salida)])
+    bench_auto_eda.main()
+
+    historial = pd.read_csv(salida / "history.csv")
+    assert set(zip(historial["case_rows"], historial["case_width"])) == {(2000, 8), (2000, 12)}
+    assert {"replace_outliers", "feature_scaling", "feature_selection"} <= set(historial["stage"])
+    assert historial["error"].isna().all()
+    assert len(list(salida.glob("profile_*.json"))) == 2
+
+
+def test_bench_db_smoke(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["bench_db.py", "--url", f"sqlite:///{tmp_path / 'bench.db'}", "--rows", "500", "--connects", "2"])
+    try:
+        bench_db.main()
+    finally:
+        utils.dispose_engines()
+    salida = capsys.readouterr().out
+    assert "500 filas" in salida and "read_sql_numpy" in salida
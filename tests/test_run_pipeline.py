@@ -0,0 +1,83 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from approx_eda import stratified_sample
+from conftest import diabetes_like
+from run_pipeline import DEFAULTS, _merge, load_config, run
+
+
+def _config(ruta_datos, **extra):
+    return _merge(DEFAULTS, {"name": "prueba", "data": ruta_datos, **extra})
+
+
+def test_run_end_to_end_with_missing_values(workdir):
+    diabetes_like(3000, seed=12, missing=0.02).to_csv("../data/raw.csv", index=False)
+    with open("../pipeline.json", "w") as f:
+        json.dump({"defaults": {"data": "../data/raw.csv"}, "runs": [
+            {"name": "barrido"},
+            {"name": "exacto", "feature_selection": {"k": 5, "dataset": "X_train_sin_outliers_norm"},
+             "paths": {"processed": "../data/exacto/", "models": "../models/exacto/", "json": "../data/exacto/Json", "plots": "../data/exacto/plots"}},
+        ]}, f)
+    barrido, exacto = load_config("../pipeline.json")
+
+    informe = run(barrido)
+    assert informe["name"] == "barrido"
+    ruta_json, _ = informe["report"]
+    with open(ruta_json) as f:
+        etapas = json.load(f)["stages"]
+    assert [e["stage"] for e in etapas if e["error"]] == []
+    assert {"replace_outliers", "handle_missing_values", "feature_scaling", "feature_selection_sweep"} <= {e["stage"] for e in etapas}
+    with open("../data/processed/Json/featureselection_sweep.json") as f:
+        sweep = json.load(f)
+    assert len(sweep) == 6 and all(v is not None for v in sweep["X_train_con_outliers"]["scores"].values())
+    for nombre in sweep:
+        for k in (7, 8, 9):
+            with open(f"../data/processed/Json/featureselection_{nombre}_k_{k}.json") as f:
+                columnas = json.load(f)
+            assert len(columnas) == min(k, 8) + 1 and columnas[-1] == "Outcome"
+            seleccion = pd.read_parquet(f"../models/x_train_sel_{nombre}_k_{k}.parquet")
+            assert list(seleccion.columns) == columnas and len(seleccion) == 2400
+    # Las variantes sin outliers quedan imputadas; las que conservan los outliers mantienen los NaN
+    assert not pd.read_parquet("../data/processed/X_train_sin_outliers.parquet").isna().any().any()
+    assert pd.read_parquet("../data/processed/X_train_con_outliers.parquet").isna().any().any()
+
+    run(exacto)
+    seleccion = pd.read_parquet("../models/exacto/x_train_sel.parquet")
+    assert seleccion.shape == (2400, 6) and not seleccion.isna().any().any()
+
+
+def test_load_config_rejects_shared_outputs(tmp_path):
+    ruta = tmp_path / "pipeline.json"
+    ruta.write_text(json.dumps({"runs": [{"name": "a"}, {"name": "b"}]}))
+    with pytest.raises(ValueError, match="rutas"):
+        load_config(str(ruta))
+    ruta.write_text(json.dumps({"runs": [{"name": "a"}, {"name": "a"}]}))
+    with pytest.raises(ValueError, match="repetidos"):
+        load_config(str(ruta))
+
+
+def test_approximate_plots_encode_categories_outside_the_sample(workdir):
+    df = diabetes_like(20_000, seed=11)
+    rng = np.random.default_rng(0)
+    df["Region"] = rng.choice(["norte", "sur"], len(df))
+    df.loc[df.index[rng.choice(len(df), 15, replace=False)], "Region"] = "islas"
+    ruta = "../data/raw.parquet"
+    df.to_parquet(ruta)
+    opciones = {"sample_size": 500, "confidence": 0.95, "seed": 42}
+    muestra, _ = stratified_sample(df, "Outcome", size=opciones["sample_size"], seed=opciones["seed"]).sample()
+    assert "islas" not in set(muestra["Region"])
+
+    config = _config(ruta, approximate={"enabled": True, **opciones}, categorical_to_numerical=[{"categorical_col": "Region"}],
+                     plots={"enabled": True, "stages": ["correlation_analysis"]}, feature_selection={"ks": [7]})
+    run(config)
+
+    with open("../data/processed/Json/Region_n_transformation_rules.json") as f:
+        reglas = json.load(f)
+    assert set(reglas) == {"norte", "sur", "islas"}
+    procesado = pd.read_parquet("../data/processed/X_train_con_outliers.parquet")
+    assert procesado["Region_n"].isin(reglas.values()).all()
+    assert (procesado["Region_n"] >= 0).all()
@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, select, table, column
+
+from conftest import COLUMNAS, diabetes_like
+from outliers import OutlierClipper
+from streaming_eda import (KLLSketch, StreamingProfile, profile_table, read_sql_chunks, streaming_explore_data,
+                           streaming_fill_values, streaming_handle_missing_values, streaming_outlier_bounds)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'eda.db'}")
+    diabetes_like(rows=500).to_sql("diabetes", engine, index=False)
+    # Nombre que no se puede interpolar en una consulta sin citarlo
+    pd.DataFrame({"a b": [1, 2], "x": [3, 4]}).to_sql('raro"; DROP TABLE diabetes; --', engine, index=False)
+    yield engine
+    engine.dispose()
+
+
+def test_read_sql_chunks_table_and_columns(engine):
+    bloques = list(read_sql_chunks(engine, "diabetes", chunksize=120, columns=["Glucose", "Outcome"]))
+    assert [len(b) for b in bloques] == [120, 120, 120, 120, 20]
+    assert list(bloques[0].columns) == ["Glucose", "Outcome"]
+    raro = pd.concat(read_sql_chunks(engine, 'raro"; DROP TABLE diabetes; --', columns=["a b"]))
+    assert raro["a b"].tolist() == [1, 2]
+    assert profile_table(engine, "diabetes").rows == 500
+
+
+def test_read_sql_chunks_explicit_query(engine):
+    consulta = "WITH altos AS (SELECT * FROM diabetes WHERE Glucose > :minimo) SELECT Glucose FROM altos"
+    datos = pd.concat(read_sql_chunks(engine, query=consulta, params={"minimo": 150}, chunksize=50))
+    esperado = diabetes_like(rows=500)
+    assert len(datos) == int((esperado["Glucose"] > 150).sum())
+    diabetes = table("diabetes", column("Outcome"))
+    unos = pd.concat(read_sql_chunks(engine, query=select(diabetes.c.Outcome).where(diabetes.c.Outcome == 1)))
+    assert len(unos) == int(esperado["Outcome"].sum())
+    with pytest.raises(ValueError):
+        next(read_sql_chunks(engine, "diabetes", query=consulta))
+    with pytest.raises(ValueError):
+        next(read_sql_chunks(engine))
+
+
+def _error_de_rango(datos, sketch, qs):
+    """Máxima distancia entre cada cuantil pedido y el intervalo de rangos empíricos (con empates) de su estimación."""
+    ordenados = np.sort(datos)
+    estimados = sketch.quantiles(qs)
+    desde = np.searchsorted(ordenados, estimados, side="left") / len(datos)
+    hasta = np.searchsorted(ordenados, estimados, side="right") / len(datos)
+    return np.max(np.maximum(desde - qs, qs - hasta).clip(min=0))
+
+
+QS = np.linspace(0.01, 0.99, 99)
+
+
+def test_kll_rank_error_and_default_seed():
+    datos = np.random.default_rng(0).lognormal(3, 1, 200_000)
+    sketch = KLLSketch(k=200)
+    for bloque in np.array_split(datos, 37):
+        sketch.update(bloque)
+    assert sketch.n == len(datos)
+    assert sum(len(nivel) for nivel in sketch.levels) < 3 * 200 + 2 * len(sketch.levels)
+    assert _error_de_rango(datos, sketch, QS) < 0.02
+    # Con la semilla por defecto los mismos datos dan los mismos cuantiles
+    otro = KLLSketch(k=200)
+    for bloque in np.array_split(datos, 37):
+        otro.update(bloque)
+    np.testing.assert_array_equal(otro.quantiles(QS), sketch.quantiles(QS))
+    copia = KLLSketch.from_dict(sketch.to_dict())
+    np.testing.assert_array_equal(copia.quantiles(QS), sketch.quantiles(QS))
+
+
+def test_kll_merge_keeps_rank_error():
+    rng = np.random.default_rng(1)
+    partes = [rng.normal(media, 1, 30_000) for media in (0, 3, -2, 5)]
+    sketches = [KLLSketch(k=200, seed=i).update(parte) for i, parte in enumerate(partes)]
+    fusionado = sketches[0]
+    for sketch in sketches[1:]:
+        fusionado.merge(sketch)
+    datos = np.concatenate(partes)
+    assert fusionado.n == len(datos)
+    assert _error_de_rango(datos, fusionado, QS) < 0.02
+    with pytest.raises(ValueError):
+        fusionado.merge(KLLSketch(k=100))
+
+
+def test_accumulators_merge_match_pandas():
+    df = diabetes_like(rows=6000, seed=3, missing=0.05)
+    df["Region"] = np.random.default_rng(3).choice(["norte", "sur", "este"], len(df), p=[0.5, 0.3, 0.2])
+    df.loc[df.index[:50], "Region"] = None
+    perfiles = [StreamingProfile().update(df.iloc[i:i + 1000]) for i in range(0, len(df), 1000)]
+    perfil = perfiles[0]
+    for otro in perfiles[1:]:
+        perfil.merge(otro)
+
+    assert perfil.rows == len(df)
+    pd.testing.assert_series_equal(perfil.missing(), df.isna().sum(), check_names=False)
+    descripcion, esperado = perfil.describe(), df.describe()
+    for col in COLUMNAS:
+        for estadistico in ("count", "mean", "std", "min", "max"):
+            assert descripcion.loc[estadistico, col] == pytest.approx(esperado.loc[estadistico, col], rel=1e-9)
+        presentes = df[col].dropna().to_numpy()
+        assert _error_de_rango(presentes, perfil.columns[col].sketch, np.array([0.25, 0.5, 0.75])) < 0.02
+    region = perfil.columns["Region"]
+    assert dict(region.frequencies) == df["Region"].value_counts().to_dict()
+    assert region.mode == "norte" and region.summary()["unique"] == 3
+
+
+def test_profile_column_with_only_missing_values_in_a_chunk():
+    primero = StreamingProfile().update(pd.DataFrame({"x": [None, None], "c": [None, None]}))
+    segundo = StreamingProfile().update(pd.DataFrame({"x": [1.0, 3.0], "c": ["a", "a"]}))
+    perfil = primero.merge(segundo)
+    assert perfil.numerical_columns() == ["x"] and perfil.categorical_columns() == ["c"]
+    assert perfil.missing().to_dict() == {"x": 2, "c": 2}
+    assert perfil.columns["x"].count == 2 and perfil.columns["x"].mean == 2.0
+
+
+def test_streaming_functions_match_the_exact_stages(tmp_path):
+    df = diabetes_like(rows=4000, seed=5, missing=0.03)
+    engine = create_engine(f"sqlite:///{tmp_path / 'faltantes.db'}")
+    try:
+        df.to_sql("diabetes", engine, index=False)
+        perfil = streaming_explore_data(engine, "diabetes", chunksize=700)
+        assert perfil.rows == len(df)
+
+        valores = streaming_fill_values(perfil)
+        assert "Outcome" not in valores
+        imputado = pd.concat(streaming_handle_missing_values(engine, "diabetes", chunksize=700, perfil=perfil), ignore_index=True)
+        assert not imputado[COLUMNAS].isna().any().any()
+        for col in COLUMNAS:
+            assert (imputado.loc[df[col].isna().to_numpy(), col] == valores[col]).all()
+            presentes = df[col].dropna().to_numpy()
+            assert _error_de_rango(presentes, perfil.columns[col].sketch, np.array([0.5])) < 0.02
+
+        aproximado = streaming_outlier_bounds(perfil).bounds
+        exacto = OutlierClipper().fit(df, COLUMNAS).bounds
+        assert set(aproximado) == set(COLUMNAS)
+        for col in COLUMNAS:
+            anchura = exacto[col][1] - exacto[col][0]
+            assert np.max(np.abs(np.subtract(aproximado[col], exacto[col]))) < 0.05 * anchura
+    finally:
+        engine.dispose()
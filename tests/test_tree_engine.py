@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+from conftest import COLUMNAS, diabetes_like
+from outliers import OutlierClipper
+from tree_engine import CompiledTree, InferenceEngine
+
+
+@pytest.fixture(scope="module")
+def datos():
+    train, test = diabetes_like(rows=3000, seed=1, missing=0.03), diabetes_like(rows=2000, seed=2, missing=0.03)
+    return train, test
+
+
+def test_compiled_tree_matches_sklearn_exactly(datos):
+    train, test = datos
+    model = DecisionTreeClassifier(random_state=0).fit(train[COLUMNAS], train["Outcome"])
+    arbol = CompiledTree.from_estimator(model)
+    X = test[COLUMNAS].to_numpy(dtype=np.float32)
+    assert np.array_equal(arbol.apply(X), model.apply(test[COLUMNAS]))
+    assert np.array_equal(arbol.predict(X), model.predict(test[COLUMNAS]))
+    assert np.array_equal(arbol.predict_proba(X), model.predict_proba(test[COLUMNAS]))
+    # Reconstruido desde sus arrays (el camino del bundle mapeado)
+    copia = CompiledTree.from_arrays(arbol.to_arrays(), arbol.depth)
+    assert np.array_equal(copia.predict_proba(X), arbol.predict_proba(X))
+
+
+@pytest.mark.parametrize("scaler_cls", [StandardScaler, MinMaxScaler])
+def test_inference_engine_matches_sklearn_preprocessing(datos, scaler_cls):
+    train, test = datos
+    train, test = train.fillna(0), test.fillna(0)
+    clipper = OutlierClipper().fit(train, COLUMNAS)
+    scaler = scaler_cls().fit(clipper.transform(train[COLUMNAS]))
+    X_train = scaler.transform(clipper.transform(train[COLUMNAS]))
+    columnas = [COLUMNAS[i] for i in (1, 5, 6, 7, 0)]
+    model = DecisionTreeClassifier(max_depth=8, random_state=0).fit(X_train[:, [COLUMNAS.index(c) for c in columnas]], train["Outcome"])
+    engine = InferenceEngine(CompiledTree.from_estimator(model), columnas, clipper=clipper, scaler=scaler, chunk_size=700)
+    esperado = scaler.transform(clipper.transform(test[COLUMNAS]))[:, [COLUMNAS.index(c) for c in columnas]]
+    assert np.array_equal(engine.transform(test), esperado.astype(np.float32))
+    assert np.array_equal(engine.predict(test), model.predict(esperado))
+    assert np.array_equal(engine.predict_proba(test), model.predict_proba(esperado))
+    # Array con todas las columnas y sus nombres
+    assert np.array_equal(engine.predict(test[COLUMNAS].to_numpy(), columns=COLUMNAS), model.predict(esperado))
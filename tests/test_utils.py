@@ -0,0 +1,67 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine
+
+import utils
+from utils import read_sql_arrow
+
+
+@pytest.fixture
+def numeric_db(tmp_path):
+    ruta = tmp_path / "numeric.db"
+    conexion = sqlite3.connect(ruta)
+    conexion.execute("CREATE TABLE t (x NUMERIC, nombre TEXT)")
+    # NUMERIC guarda 1 como entero y 4.5 como real: los bloques de 3 filas salen con tipos distintos
+    conexion.executemany("INSERT INTO t VALUES (?, ?)", [(1, "a"), (2, "b%"), (3, None), (4.5, "c"), (None, "d"), (6, "e")])
+    conexion.commit()
+    conexion.close()
+    engine = create_engine(f"sqlite:///{ruta}")
+    yield engine
+    engine.dispose()
+
+
+def test_read_sql_arrow_promotes_types_between_batches(numeric_db, monkeypatch):
+    monkeypatch.setattr(utils, "connectorx", None)
+    tabla = read_sql_arrow("SELECT x, nombre FROM t ORDER BY rowid", engine=numeric_db, batch_size=3)
+    assert str(tabla.schema.field("x").type) == "double"
+    assert tabla.column("x").to_pylist() == [1.0, 2.0, 3.0, 4.5, None, 6.0]
+
+
+def test_read_sql_arrow_literal_percent_without_params(numeric_db, monkeypatch):
+    monkeypatch.setattr(utils, "connectorx", None)
+    tabla = read_sql_arrow("SELECT nombre FROM t WHERE nombre LIKE '%\\%%' ESCAPE '\\'", engine=numeric_db)
+    assert tabla.column("nombre").to_pylist() == ["b%"]
+    tabla = read_sql_arrow("SELECT nombre FROM t WHERE x > ?", engine=numeric_db, params=(4,))
+    assert tabla.column("nombre").to_pylist() == ["c", "e"]
+
+
+def test_read_sql_arrow_falls_back_when_connectorx_fails(numeric_db):
+    pytest.importorskip("connectorx")
+    tabla = read_sql_arrow("SELECT x FROM t ORDER BY rowid", engine=numeric_db, batch_size=3)
+    assert tabla.column("x").to_pylist() == [1.0, 2.0, 3.0, 4.5, None, 6.0]
+
+
+def test_read_sql_arrow_promotes_null_batches(numeric_db, monkeypatch):
+    monkeypatch.setattr(utils, "connectorx", None)
+    tabla = read_sql_arrow("SELECT x FROM t WHERE x IS NULL OR x > 4 ORDER BY x IS NOT NULL, x", engine=numeric_db, batch_size=1)
+    assert str(tabla.schema.field("x").type) == "double"
+    assert tabla.column("x").to_pylist() == [None, 4.5, 6.0]
+    vacia = read_sql_arrow("SELECT x, nombre FROM t WHERE x > 100", engine=numeric_db)
+    assert vacia.num_rows == 0 and vacia.column_names == ["x", "nombre"]
+
+
+def test_db_connect_returns_one_cached_engine(tmp_path):
+    url = f"sqlite:///{tmp_path / 'cache.db'}"
+    try:
+        engine = utils.db_connect(url)
+        assert utils.db_connect(url) is engine
+        assert utils.db_connect(url, pool_size=2) is not engine
+        en_memoria = utils.db_connect("sqlite://")
+        assert utils.db_connect("sqlite://") is en_memoria
+        assert read_sql_arrow("SELECT 1 AS uno", engine=en_memoria).column("uno").to_pylist() == [1]
+    finally:
+        utils.dispose_engines()
+    assert utils._ENGINES == {}
+    assert utils.db_connect(url) is not engine
+    utils.dispose_engines()
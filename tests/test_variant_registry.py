@@ -0,0 +1,55 @@
+import pandas as pd
+
+import Auto_EDA
+from conftest import diabetes_like
+from variant_registry import VariantRegistry
+
+
+def _variantes_auto_eda(df):
+    """Las doce variantes que escribe el pipeline exacto (run_pipeline) para `df`."""
+    numerical_cols = df.select_dtypes(include=["number"]).columns.difference(["Outcome"])
+    df_sin = Auto_EDA.replace_outliers(df.copy(), numerical_cols)
+    df_sin = Auto_EDA.handle_missing_values(df_sin, target_column="Outcome")
+    *splits, y_train, y_test, numerical_cols = Auto_EDA.feature_scaling(df, df_sin, target_column="Outcome")
+    norm = Auto_EDA.normalize_data(*splits, numerical_cols)
+    scal = Auto_EDA.scale_min_max_data_1(*splits, numerical_cols)
+    variantes = {}
+    for sufijo, grupo in (("", splits), ("_norm", norm), ("_scal", scal)):
+        for nombre, X in zip(("X_train_con", "X_test_con", "X_train_sin", "X_test_sin"), grupo):
+            variantes[f"{nombre}_outliers{sufijo}"] = X
+    return variantes, y_train, y_test
+
+
+def test_variants_match_auto_eda(workdir):
+    df = diabetes_like(1500, seed=8, missing=0.04)
+    esperadas, y_train, y_test = _variantes_auto_eda(df)
+    registro = VariantRegistry(df, max_cached=0)
+    assert set(registro) == set(esperadas)
+    for nombre, esperado in esperadas.items():
+        pd.testing.assert_frame_equal(registro[nombre], esperado, check_exact=False, rtol=1e-12)
+    pd.testing.assert_series_equal(registro.y_train, y_train)
+    pd.testing.assert_series_equal(registro.y_test, y_test)
+
+
+def test_lru_eviction_and_membership_without_materializing(monkeypatch):
+    registro = VariantRegistry(diabetes_like(500, seed=9), max_cached=2)
+    construidas = []
+    materialize = registro.materialize
+    monkeypatch.setattr(registro, "materialize", lambda nombre: construidas.append(nombre) or materialize(nombre))
+
+    assert "X_train_sin_outliers_norm" in registro and "X_train_otro" not in registro and 3 not in registro
+    assert construidas == []
+
+    a = registro["X_train_con_outliers"]
+    registro["X_test_con_outliers"]
+    assert registro["X_train_con_outliers"] is a
+    registro["X_train_sin_outliers"]
+    # El menos usado recientemente (X_test_con_outliers) sale del LRU
+    assert list(registro._cache) == ["X_train_con_outliers", "X_train_sin_outliers"]
+    registro["X_test_con_outliers"]
+    assert construidas == ["X_train_con_outliers", "X_test_con_outliers", "X_train_sin_outliers", "X_test_con_outliers"]
+    assert registro.cached_bytes == sum(df.memory_usage(index=False).sum() for df in registro._cache.values())
+    registro.evict("X_test_con_outliers")
+    assert list(registro._cache) == ["X_train_sin_outliers"]
+    registro.evict()
+    assert registro.nbytes == registro.base.nbytes